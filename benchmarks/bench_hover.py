@@ -0,0 +1,66 @@
+"""Benchmark the chart tooltip hover latency against the number of points of the curves."""
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backend_bases import MouseEvent
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lut_chart import LutChart
+from lut_core import generateCustomLut
+
+POINT_COUNTS = [100, 1000, 10000, 100000]
+EVENTS = 200
+
+def make_events(chart, lut):
+    """Create mouse events moving along the current curve."""
+    events = []
+    for i in range(EVENTS):
+        index = (i * (len(lut) - 1)) // (EVENTS - 1)
+        x, y = chart.ax.transData.transform((lut.x[index], lut.y[index]))
+        events.append(MouseEvent("motion_notify_event", chart.canvas, x, y))
+    return events
+
+def legacy_lookup(ax, event):
+    """Hit-test every line with Line2D.contains, as the tooltip used to do."""
+    for line in ax.get_lines():
+        if line.get_visible() and line.contains(event)[0]:
+            return line.contains(event)[1]["ind"][0]
+    return None
+
+def time_per_event(function, events):
+    start = time.perf_counter()
+    for event in events:
+        function(event)
+    return (time.perf_counter() - start) / len(events) * 1000
+
+def bench(count):
+    """Get the per-event latency in ms of the legacy and indexed lookups and of the hover redraw."""
+    figure, ax = plt.subplots(figsize=(6, 4))
+    chart = LutChart(figure, ax)
+    lut = generateCustomLut(count, 5.0, 100.0, 3.0)
+    chart.update(lut, 100.0, 5.0, generateCustomLut(count, 0.0, 100.0, 0.0))
+    events = make_events(chart, lut)
+
+    results = (
+        time_per_event(lambda event: legacy_lookup(ax, event), events),
+        time_per_event(chart.find_nearest, events),
+        time_per_event(chart.hover, events),
+        time_per_event(lambda event: figure.canvas.draw(), events[:20])
+    )
+    plt.close(figure)
+    return results
+
+def main():
+    print("Per mouse move latency in ms, two overlaid curves")
+    print(f"{'points':>8} {'contains':>9} {'indexed':>8} {'hover+blit':>11} {'full draw':>10}")
+    for count in POINT_COUNTS:
+        legacy, indexed, hover, full_draw = bench(count)
+        print(f"{count + 1:>8} {legacy:>9.3f} {indexed:>8.3f} {hover:>11.3f} {full_draw:>10.3f}")
+
+if __name__ == "__main__":
+    main()
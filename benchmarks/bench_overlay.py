@@ -0,0 +1,80 @@
+"""Benchmark the chart with many overlaid comparison LUTs against the number of curves and points."""
+import os
+import sys
+import time
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backend_bases import MouseEvent
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lut_chart import LutChart
+from lut_core import generateCustomLut
+
+CASES = [(10, 1000), (50, 1000), (100, 1000), (50, 10000), (200, 10000)]
+EVENTS = 100
+DRAWS = 10
+
+def make_overlays(curves, points):
+    """Create (name, lut) pairs spread over the parameter ranges."""
+    return [(f"preset_{i}.lut", generateCustomLut(points, (i * 7) % 30, 60.0 + (i * 13) % 90, (i % 11) - 0.5 * (i % 2)))
+            for i in range(curves)]
+
+def make_events(chart, lut):
+    """Create mouse events moving along one of the overlay curves."""
+    events = []
+    for i in range(EVENTS):
+        index = (i * (len(lut) - 1)) // (EVENTS - 1)
+        x, y = chart.ax.transData.transform((lut.x[index], lut.y[index]))
+        events.append(MouseEvent("motion_notify_event", chart.canvas, x, y))
+    return events
+
+def time_per_call(function, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments) * 1000
+
+def bench_plot_calls(overlays):
+    """Get the full draw time in ms with one ax.plot call per curve, at full resolution."""
+    warnings.filterwarnings("ignore", "Creating legend with loc=\"best\"")
+    figure, ax = plt.subplots(figsize=(6, 4))
+    chart = LutChart(figure, ax)
+    for _, lut in overlays:
+        ax.plot(lut.x, lut.y, linewidth=1, alpha=0.6)
+    chart.update(generateCustomLut(100, 5.0, 100.0, 3.0), 100.0, 5.0)
+    full_draw = time_per_call(lambda i: figure.canvas.draw(), range(DRAWS))
+    plt.close(figure)
+    return full_draw
+
+def bench(curves, points):
+    """Get the load, full draw, slider update, toggle and hover times in ms of the overlay collection."""
+    overlays = make_overlays(curves, points)
+    figure, ax = plt.subplots(figsize=(6, 4))
+    chart = LutChart(figure, ax)
+    lut = generateCustomLut(100, 5.0, 100.0, 3.0)
+    chart.update(lut, 100.0, 5.0)
+
+    load = time_per_call(lambda i: chart.set_overlays(overlays), range(3))
+    full_draw = time_per_call(lambda i: figure.canvas.draw(), range(DRAWS))
+    update = time_per_call(lambda deadzone: chart.update(generateCustomLut(100, deadzone, 100.0, 3.0), 100.0, deadzone), [0.5 * i for i in range(1, 41)])
+    toggle = time_per_call(lambda i: chart.set_overlay_visibility([j != i for j in range(curves)]), range(DRAWS))
+    chart.set_overlay_visibility([True] * curves)
+    hover = time_per_call(chart.hover, make_events(chart, overlays[curves // 2][1]))
+    drawn = sum(len(segment) for segment in chart.overlay_collection.get_segments())
+    plt.close(figure)
+    return load, full_draw, update, toggle, hover, drawn
+
+def main():
+    print("Overlay timings in ms, one LineCollection downsampled to the axes width vs one ax.plot per curve")
+    print(f"{'curves':>6} {'points':>7} {'drawn':>8} {'load':>8} {'full draw':>10} {'plot calls':>11} {'slider':>8} {'toggle':>8} {'hover':>8}")
+    for curves, points in CASES:
+        load, full_draw, update, toggle, hover, drawn = bench(curves, points)
+        plot_calls = bench_plot_calls(make_overlays(curves, points))
+        print(f"{curves:>6} {points + 1:>7} {drawn:>8} {load:>8.2f} {full_draw:>10.2f} {plot_calls:>11.2f} {update:>8.2f} {toggle:>8.2f} {hover:>8.3f}")
+
+if __name__ == "__main__":
+    main()
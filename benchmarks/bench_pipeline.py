@@ -0,0 +1,187 @@
+"""Benchmark the LUT pipeline end to end and compare the results with a saved baseline.
+
+Covers the LUT generation at several sizes, the LUT text and .lut file formatting, the .lut parsing
+and simplification, the LUT panel update and the chart update, rendered headless with the Agg backend.
+
+    python benchmarks/bench_pipeline.py --save baseline.json
+    python benchmarks/bench_pipeline.py --baseline baseline.json --threshold 0.25
+
+The run fails (exit code 1) when a benchmark is slower than its baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lut_analysis import analyze_lut, analyze_parameters
+from lut_binary import write_lut_binary
+from lut_chart import CHART_DPI, CHART_SIZE, LutChart
+from lut_compare import resample
+from lut_core import format_lut_file, generateCustomLut, LutCache
+from lut_io import parse_lut, read_lut, write_lut
+from lut_model import LutModel
+from lut_panel import LutPanel
+from lut_reduce import reduce_lut
+
+LUT_SIZES = [100, 1000, 10000, 100000]
+
+class HeadlessPanel(LutPanel):
+    """LutPanel without its Tk widgets, formatting the visible rows on render like the real one."""
+
+    def __init__(self, visible_rows=20):
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.compare_y = None
+        self.top_row = 0
+        self.visible_rows = visible_rows
+        self.all_selected = False
+        self.rendered = ""
+
+    def render(self):
+        stop = min(self.top_row + self.visible_rows, self.row_count())
+        self.rendered = "\n".join(self.format_rows(self.top_row, stop))
+
+class Pipeline:
+    """The model, LUT panel and chart of the app wired as the app does, with the chart on an Agg canvas."""
+
+    def __init__(self, compare_lut):
+        self.compare_lut = compare_lut
+        self.model = LutModel(deadzone=5.0, max_output=110.0, power_boost=3.0, lut_cache=LutCache())
+        self.combined_output = HeadlessPanel()
+        self.figure = Figure(figsize=CHART_SIZE, dpi=CHART_DPI)
+        FigureCanvasAgg(self.figure)
+        self.canvas = self.figure.canvas
+        self.chart = LutChart(self.figure, self.figure.add_subplot())
+        self.update_combined_output()
+        self.update_chart()
+        self.canvas.draw()
+
+    def update_combined_output(self):
+        lut = self.model.lut
+        self.combined_output.set_lut(lut, resample(self.compare_lut, lut.x))
+
+    def update_chart(self):
+        model = self.model
+        self.chart.update(model.preview, model.max_output, model.deadzone, self.compare_lut, model.analysis)
+
+def cycle(values):
+    """Get a function returning the next value of a list on each call, forever."""
+    state = {"i": -1}
+
+    def next_value():
+        state["i"] = (state["i"] + 1) % len(values)
+        return values[state["i"]]
+    return next_value
+
+def build_benchmarks(temp_dir):
+    """Get the benchmarks as (name, function) pairs."""
+    benchmarks = []
+    for lut_size in LUT_SIZES:
+        benchmarks.append((f"generate_{lut_size}", lambda lut_size=lut_size: generateCustomLut(lut_size, 5.0, 110.0, 3.0)))
+
+    lut = generateCustomLut(1000, 5.0, 110.0, 3.0)
+    benchmarks.append(("lut_str_1000", lambda: str(lut)))
+    benchmarks.append(("format_lut_file_1000", lambda: format_lut_file(lut)))
+    lut_path = os.path.join(temp_dir, "bench.lut")
+    benchmarks.append(("write_lut_1000", lambda: write_lut(lut_path, lut)))
+
+    for lut_size in (1000, 100000):
+        text = format_lut_file(generateCustomLut(lut_size, 5.0, 110.0, 3.0))
+        benchmarks.append((f"parse_lut_{lut_size}", lambda text=text: parse_lut(text)))
+    write_lut(lut_path, lut)
+    benchmarks.append(("read_lut_1000", lambda: read_lut(lut_path)))
+    binary_path = os.path.join(temp_dir, "bench.lutb")
+    write_lut_binary(binary_path, lut)
+    benchmarks.append(("read_lut_binary_1000", lambda: read_lut(binary_path)))
+    benchmarks.append(("reduce_lut_1000", lambda: reduce_lut(lut)))
+    reduced_path = os.path.join(temp_dir, "reduced.lut")
+    write_lut(reduced_path, reduce_lut(lut)["lut"])
+    benchmarks.append(("read_lut_reduced", lambda: read_lut(reduced_path)))
+    benchmarks.append(("analyze_parameters", lambda: analyze_parameters(5.0, 110.0, 3.0)))
+    benchmarks.append(("analyze_lut_1000", lambda: analyze_lut(lut)))
+
+    pipeline = Pipeline(generateCustomLut(1000, 0.0, 100.0, 0.0))
+    benchmarks.append(("update_combined_output", pipeline.update_combined_output))
+
+    deadzone = cycle(np.arange(0.0, 30.5, 0.5).tolist())
+
+    def update_chart():
+        pipeline.model.set(deadzone=deadzone())
+        pipeline.update_chart()
+    benchmarks.append(("update_chart", update_chart))
+    benchmarks.append(("chart_full_draw", pipeline.canvas.draw))
+    return benchmarks
+
+def measure(function, repeat):
+    """Get the best and median time per call in seconds, over repeat runs of about 0.2 s each."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat, number)]
+    return {"best": min(times), "median": statistics.median(times), "number": number}
+
+def compare(results, baseline, threshold):
+    """Get the names of the benchmarks whose best time regressed beyond the threshold."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference and result["best"] > reference["best"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default: 5)")
+    parser.add_argument("--filter", default=None, help="only run the benchmarks whose name contains this text")
+    parser.add_argument("--save", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare the results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown over the baseline (default: 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        print(f"{'benchmark':<24} {'best (us)':>12} {'median (us)':>12} {'baseline (us)':>14} {'change':>8}")
+        for name, function in build_benchmarks(temp_dir):
+            if args.filter and args.filter not in name:
+                continue
+            result = results[name] = measure(function, args.repeat)
+            reference = baseline.get(name)
+            change = f"{(result['best'] / reference['best'] - 1) * 100:+.1f}%" if reference else "-"
+            reference_text = f"{reference['best'] * 1e6:.1f}" if reference else "-"
+            print(f"{name:<24} {result['best'] * 1e6:>12.1f} {result['median'] * 1e6:>12.1f} {reference_text:>14} {change:>8}")
+
+    if args.save:
+        report = {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "results": results
+        }
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=4)
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
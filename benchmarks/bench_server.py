@@ -0,0 +1,122 @@
+"""Load test the LUT server on loopback: requests per second and latency percentiles with concurrent keep-alive clients.
+
+A server is started in a child process on a free port, unless --url points to a running one.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from urllib.parse import urlsplit
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from lut_core import format_lut_file, generateCustomLut
+
+ENDPOINTS = ("lut", "lut-binary", "fit", "compare", "presets")
+PERCENTILES = (50, 90, 99)
+
+def make_request(endpoint, index, parameter_sets, host):
+    """Get the bytes of the request number index, cycling through parameter_sets parameter combinations."""
+    i = index % parameter_sets
+    deadzone, max_output, power_boost = (i * 7) % 31 * 0.5, 60.0 + (i * 13) % 181 * 0.5, (i * 3) % 21 * 0.5
+    query = f"deadzone={deadzone:g}&max_output={max_output:g}&power_boost={power_boost:g}"
+    body = b""
+    if endpoint == "lut":
+        target = f"/lut?{query}"
+    elif endpoint == "lut-binary":
+        target = f"/lut?{query}&format=binary"
+    elif endpoint == "presets":
+        target = f"/presets?near={deadzone:g},{max_output:g},{power_boost:g}&limit=5"
+    else:
+        body = format_lut_file(generateCustomLut(1000, deadzone, max_output, power_boost)).encode("utf-8")
+        target = "/fit" if endpoint == "fit" else f"/compare?{query}"
+    method = "POST" if body else "GET"
+    return f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+
+async def read_response(reader):
+    """Read one response, returning its status and body."""
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+async def client(host, port, requests, latencies, errors):
+    """Send requests one after the other on a single connection, recording the latencies."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def load_test(host, port, endpoint, total, concurrency, parameter_sets):
+    unique_requests = [make_request(endpoint, i, parameter_sets, host) for i in range(min(total, parameter_sets))]
+    requests = [unique_requests[i % len(unique_requests)] for i in range(total)]
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests[i::concurrency], latencies, errors) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+def start_server(args):
+    """Start a server in a child process on a free port, returning the process and the port."""
+    command = [sys.executable, os.path.join(SRC_DIR, "ffm_cli.py"), "serve", "--port", "0", "--presets-dir", args.presets_dir,
+               "--db", args.db, "--cache-size", str(args.cache_size)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Serving on "):
+        process.kill()
+        raise RuntimeError(f"The server did not start: {line!r}")
+    return process, urlsplit(line.split()[-1]).port
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the LUT server.")
+    parser.add_argument("--url", default=None, help="running server to test, such as http://127.0.0.1:8765 (default: start one)")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, action="append", help="endpoint to test, repeatable (default: lut)")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per endpoint (default: 5000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent connections (default: 16)")
+    parser.add_argument("--parameter-sets", type=int, default=100, help="distinct parameter sets requested (default: 100)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="response cache of the started server, 0 to disable (default: 1024)")
+    parser.add_argument("--presets-dir", default=os.path.join(SRC_DIR, "..", "presets"), help="presets of the started server")
+    parser.add_argument("--db", default=":memory:", help="preset catalog of the started server (default: in memory)")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        process, port = start_server(args)
+        host = "127.0.0.1"
+    try:
+        print(f"{'endpoint':<11} {'requests':>8} {'errors':>6} {'req/s':>9} " + " ".join(f"{'p' + str(p) + ' (ms)':>10}" for p in PERCENTILES) + f" {'max (ms)':>10}")
+        for endpoint in args.endpoint or ["lut"]:
+            latencies, errors, elapsed = asyncio.run(load_test(host, port, endpoint, args.requests, args.concurrency, args.parameter_sets))
+            quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            print(f"{endpoint:<11} {len(latencies):>8} {len(errors):>6} {len(latencies) / elapsed:>9.0f} "
+                  + " ".join(f"{quantiles[p - 1] * 1000:>10.2f}" for p in PERCENTILES) + f" {max(latencies) * 1000:>10.2f}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    sys.exit(main())
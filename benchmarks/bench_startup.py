@@ -0,0 +1,94 @@
+"""Benchmark the startup: import time of each module and time to the first frame of the GUI.
+
+Every measurement runs in a fresh interpreter, so the results do not depend on what is already imported.
+The time to first frame needs a display (the application targets Windows) and is skipped otherwise.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+MODULES = ["lut_core", "lut_io", "lut_batch", "ForceFeedbackManager"]
+HEAVY_MODULES = ["tkinter", "matplotlib", "PIL", "ttkbootstrap", "requests"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+FIRST_FRAME_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+import ttkbootstrap as tb
+import ForceFeedbackManager
+root = tb.Window(themename="superhero")
+app = ForceFeedbackManager.ForceFeedbackManagerApp(root)
+root.update()
+first_frame = time.perf_counter() - start
+while app.chart is None:
+    root.update()
+chart = time.perf_counter() - start
+root.destroy()
+print(json.dumps({{"first_frame": first_frame, "chart": chart}}))
+"""
+
+def run_script(script):
+    """Run a script in a fresh interpreter from the repository root and return its JSON output."""
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit code {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def bench_imports(repeat):
+    results = {}
+    for module in MODULES:
+        runs = [run_script(IMPORT_SCRIPT.format(src=SRC_DIR, module=module, heavy=HEAVY_MODULES)) for _ in range(repeat)]
+        results[module] = {
+            "seconds": statistics.median(run["seconds"] for run in runs),
+            "loaded": runs[0]["loaded"]
+        }
+    return results
+
+def bench_first_frame(repeat):
+    try:
+        runs = [run_script(FIRST_FRAME_SCRIPT.format(src=SRC_DIR)) for _ in range(repeat)]
+    except RuntimeError as e:
+        return {"skipped": str(e)}
+    return {
+        "first_frame": statistics.median(run["first_frame"] for run in runs),
+        "chart": statistics.median(run["chart"] for run in runs)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the median is reported (default: 5)")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {"imports": bench_imports(args.repeat), "first_frame": bench_first_frame(args.repeat)}
+
+    print(f"{'module':<22} {'import (ms)':>12}  heavy modules loaded")
+    for module, result in results["imports"].items():
+        print(f"{module:<22} {result['seconds'] * 1000:>12.1f}  {', '.join(result['loaded']) or '-'}")
+    first_frame = results["first_frame"]
+    if "skipped" in first_frame:
+        print(f"Time to first frame: skipped ({first_frame['skipped']})")
+    else:
+        print(f"Time to first frame: {first_frame['first_frame'] * 1000:.1f} ms, chart ready: {first_frame['chart'] * 1000:.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
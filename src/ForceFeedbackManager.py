@@ -2,34 +2,26 @@ import ctypes
 import json
 import os
 import sys
+import tempfile
 import webbrowser
-import requests
 import tkinter as tk
-import shutil
 
 from tkinter import filedialog
 from tkinter import ttk
 
-import matplotlib.pyplot as plt
-import numpy as np
-import ttkbootstrap as tb
-from ttkbootstrap import Style
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-
-class Lut:
-    """Define a LUT object (or lookup table)."""
-
-    def __init__(self):
-        self.points = []
-
-    def addPoint(self, x, y):
-        """Add a point to the LUT."""
-        self.points.append((x, y))
-
-    def __str__(self):
-        """Get the icon path checking if it exists."""
-        return "\n".join(f"{x:.3f}|{y:.5f}" for x, y in self.points)
+# matplotlib, PIL and ttkbootstrap are imported when first needed, they are the slowest part of the startup
+from lut_chart import CHART_DPI, CHART_SIZE, LutChart
+from lut_compare import resample
+from lut_core import DEADZONE_RANGE, format_ff_post_process_ini, format_lut_file, limit_value, LutCache, MAX_OUTPUT_RANGE, POWER_BOOST_RANGE, read_preset, write_preset
+from lut_deploy import deploy, deploy_file, encode_text, format_deploy_result, get_deploy_files, INI_NAME, write_atomic
+from lut_fit import fit_lut, format_fit
+from lut_io import read_lut, read_lut_or_preset
+from lut_model import LutModel
+from lut_panel import LutPanel
+from lut_reduce import format_reduction, reduce_lut
+from preset_catalog import parse_conditions, PresetCatalog
+from tracing import DEFAULT_TRACE_FILE, traced, tracer
+from update_check import UpdateChecker
 
 def open_link(link):
         import webbrowser
@@ -45,21 +37,6 @@ def get_icon_path():
         print("Error: FFM.ico not found!")
         return
 
-def generateCustomLut(lutSize, deadZone, gain, power_boost):
-    """Generate a custom LUT using the given parameters."""
-    l = lutSize
-    d = deadZone
-    s = gain
-    g = -power_boost/10
-    lut = Lut()
-    for i in range(l + 1):
-        x = i
-        # This was the hardest part of all the application by far. So many time to get to this formula.
-        y = x + (d * ((l - x) / l)) - (l - s) * (x / l) + (((((l / 2) - x) ** 2) / l) - (l / 4)) * ((g * 100) / l) * ((s / 100) - (d / 100))
-        y = min(y, 100) # limit lut value
-        lut.addPoint(round((i * 1.0) / (l * 1.0), 3), round(y * 0.01, 5))
-    return lut
-
 def get_windows_scaling():
     """Get the current Windows scaling factor."""
     # Get the handle to the desktop window
@@ -70,17 +47,20 @@ def get_windows_scaling():
     scaling_factor = dpi / 96
     return scaling_factor
 
-def limit_value(value, min, max):
-    """Force a value to be between min and max."""
-    if value < min:
-        return min
-    elif value > max:
-        return max
-    return value
-
-
 class ForceFeedbackManagerApp:
     SETTING_FILE = "AppSettings.json"
+    UPDATE_CACHE_FILE = "UpdateCache.json"
+    CHART_SIZE = CHART_SIZE
+    CHART_DPI = CHART_DPI
+    CHART_DELAY_MS = 1
+    CHART_FRAME_MS = 16
+    UPDATE_POLL_MS = 100
+    PRESETS_DIR = "./presets"
+    PRESET_CATALOG_FILE = "PresetCatalog.db"
+    PRESET_RESULTS_LIMIT = 500
+    OVERLAY_EXTENSIONS = (".lut", ".lutb", ".json")
+    OVERLAY_LUT_SIZE = 1000
+    DEPLOY_LUT_NAME = "ForceFeedbackManager.lut"
 
     def __init__(self, root):
         """Initialize the application."""
@@ -95,10 +75,22 @@ class ForceFeedbackManagerApp:
         self.lut_path = None
         self.lut_name = None
         self.compare_lut_name = None
+        self.overlay_luts = []
+        self.overlay_folder = None
+        self.deploy_targets = []
+        self.deploy_status = None
         self.initial_deadzone_value = 0.0
         self.initial_max_output_value = 100.0
         self.initial_power_boost_value = 0.0
         self.initial_create_AC_file = True
+        self.initial_simplify_lut = False
+        self.initial_simplify_max_error = 0.05
+        self.lut_cache = LutCache()
+        self.chart = None
+        self.chart_update_id = None
+        self.update_check = None
+        self.update_check_offline = False
+        self.update_check_timeout = 5.0
 
         print(self.title_string)
 
@@ -134,14 +126,17 @@ class ForceFeedbackManagerApp:
         self.max_output_value = tk.DoubleVar(value=self.initial_max_output_value)
         self.power_boost_value = tk.DoubleVar(value=self.initial_power_boost_value)
         self.create_ac_file = tk.BooleanVar(value=self.initial_create_AC_file)
+        self.simplify_lut = tk.BooleanVar(value=self.initial_simplify_lut)
+        self.simplify_max_error = tk.DoubleVar(value=self.initial_simplify_max_error)
+
+        # The model derives the LUTs from the slider values, the views follow its changes
+        self.model = LutModel(self.deadzone_value.get(), self.max_output_value.get(), self.power_boost_value.get(), lut_cache=self.lut_cache)
+        self.model.subscribe(self.on_model_changed)
 
         # Initialize limiters for values
-        self.deadzone_min = 0.0
-        self.deadzone_max = 30.0
-        self.max_output_min = 50.0
-        self.max_output_max = 150.0
-        self.power_boost_min = 0.0
-        self.power_boost_max = 10.0
+        self.deadzone_min, self.deadzone_max = DEADZONE_RANGE
+        self.max_output_min, self.max_output_max = MAX_OUTPUT_RANGE
+        self.power_boost_min, self.power_boost_max = POWER_BOOST_RANGE
         
         # Create sliders for FFB Deadzone, Max Output Force, and Power Boost
         self.create_slider_grid(mainframe, starting_row=row)
@@ -164,6 +159,10 @@ class ForceFeedbackManagerApp:
         load_preset_button = ttk.Button(button_frame, text="Load Preset", command=self.load_preset)
         load_preset_button.pack(side=tk.LEFT, padx=5)
 
+        # Find Preset button
+        find_preset_button = ttk.Button(button_frame, text="Find Preset", command=self.show_preset_catalog_popup)
+        find_preset_button.pack(side=tk.LEFT, padx=5)
+
         # Save Preset button
         save_preset_button = ttk.Button(button_frame, text="Save Preset", command=self.save_preset)
         save_preset_button.pack(side=tk.LEFT, padx=5)
@@ -178,20 +177,15 @@ class ForceFeedbackManagerApp:
         chart_lut_frame.grid(row=row, column=0, columnspan=3, sticky=(tk.W, tk.E))
         row += 1
         
-        # Create chart for visual representation
-        self.figure, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.figure, master=chart_lut_frame)
-        self.canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.update_chart()
+        # Reserve the chart space, the chart itself is created once the window is shown
+        chart_width, chart_height = (int(size * self.CHART_DPI) for size in self.CHART_SIZE)
+        self.chart_frame = ttk.Frame(chart_lut_frame, width=chart_width, height=chart_height)
+        self.chart_frame.pack_propagate(False)
+        self.chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # Text output for LUT with comparison option and related scrollbar
-        self.lut_frame = ttk.Frame(chart_lut_frame)
-        self.lut_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-        self.combined_output = tk.Text(self.lut_frame, height=10, width=20, state=tk.DISABLED)
-        self.combined_output.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.scrollbar = ttk.Scrollbar(self.lut_frame, orient=tk.VERTICAL, command=self.combined_output.yview)
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.combined_output.config(yscrollcommand=self.scrollbar.set)
+        self.combined_output = LutPanel(chart_lut_frame, height=10, width=20)
+        self.combined_output.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
         # Create checkbox for ff_post_process file
         create_ac_checkbox = ttk.Checkbutton(
@@ -199,7 +193,16 @@ class ForceFeedbackManagerApp:
             text='Create and update "ff_post_process.ini" file for "Assetto Corsa" and "Assetto Corsa Competizione"',
             variable=self.create_ac_file
         )
-        create_ac_checkbox.grid(row=row, column=0, columnspan=3, pady=(25,15))
+        create_ac_checkbox.grid(row=row, column=0, columnspan=3, pady=(25,5))
+        row += 1
+
+        # Checkbox and max error for the simplified LUT export
+        simplify_frame = ttk.Frame(mainframe)
+        simplify_frame.grid(row=row, column=0, columnspan=3, pady=(0,15))
+        simplify_checkbox = ttk.Checkbutton(simplify_frame, text="Save a simplified LUT, max error (%):", variable=self.simplify_lut)
+        simplify_checkbox.pack(side=tk.LEFT)
+        simplify_spinbox = ttk.Spinbox(simplify_frame, from_=0.01, to=1.0, increment=0.01, width=6, textvariable=self.simplify_max_error)
+        simplify_spinbox.pack(side=tk.LEFT, padx=5)
         row += 1
 
         # Frame to hold the buttons
@@ -214,10 +217,30 @@ class ForceFeedbackManagerApp:
         clear_compare_button = ttk.Button(final_button_frame, text="Clear Comparison", command=self.clear_comparison)
         clear_compare_button.pack(side=tk.LEFT, padx=5)
 
+        # Overlay Folder button
+        overlay_button = ttk.Button(final_button_frame, text="Overlay Folder", command=self.load_overlay_folder)
+        overlay_button.pack(side=tk.LEFT, padx=5)
+
+        # Overlays button
+        overlays_button = ttk.Button(final_button_frame, text="Overlays", command=self.show_overlay_popup)
+        overlays_button.pack(side=tk.LEFT, padx=5)
+
+        # Fit Comparison button
+        fit_compare_button = ttk.Button(final_button_frame, text="Fit Comparison", command=self.fit_compare_lut)
+        fit_compare_button.pack(side=tk.LEFT, padx=5)
+
         # Save button
         self.save_button = ttk.Button(final_button_frame, text="Save LUT", command=self.save_lut)
         self.save_button.pack(side=tk.LEFT, padx=5)
 
+        # Deploy Targets button
+        deploy_targets_button = ttk.Button(final_button_frame, text="Deploy Targets", command=self.show_deploy_targets_popup)
+        deploy_targets_button.pack(side=tk.LEFT, padx=5)
+
+        # Deploy button
+        deploy_button = ttk.Button(final_button_frame, text="Deploy", command=self.deploy_lut)
+        deploy_button.pack(side=tk.LEFT, padx=5)
+
         # Update window size
         self.root.update_idletasks()
         mainframe.update_idletasks()
@@ -238,9 +261,28 @@ class ForceFeedbackManagerApp:
         print(f"Windows scaling factor: {scaling_factor * 100:.0f}%")
         print("Window resolution: " + str(mainframe_width) + " x " + str(mainframe_height))
 
+        # Create the chart after the first frame
+        self.root.after(self.CHART_DELAY_MS, self.create_chart)
+
         # Update check
         self.root.after(1000, lambda: self.check_version(show_up_to_date=False))
 
+    def create_chart(self):
+        """Create the chart for visual representation."""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.figure = Figure(figsize=self.CHART_SIZE, dpi=self.CHART_DPI)
+        self.ax = self.figure.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.chart_frame)
+        self.chart_frame.pack_propagate(True)
+        self.canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.chart = LutChart(self.figure, self.ax)
+        self.canvas.mpl_connect("motion_notify_event", self.create_tooltip)
+        if self.overlay_luts:
+            self.chart.set_overlays(self.overlay_luts)
+        self.update_chart()
+
     def read_app_settings(self):
         if not os.path.exists(self.SETTING_FILE):
             print("Settings file not found. Using defaults.")
@@ -253,8 +295,13 @@ class ForceFeedbackManagerApp:
                 self.initial_max_output_value = settings.get("max_output")
                 self.initial_power_boost_value = settings.get("power_boost")
                 self.create_ac_file = settings.get("create_ac_file")
+                self.initial_simplify_lut = settings.get("simplify_lut", self.initial_simplify_lut)
+                self.initial_simplify_max_error = settings.get("simplify_max_error", self.initial_simplify_max_error)
                 self.lut_path = settings.get("last_lut_path")
                 self.lut_name = settings.get("last_lut_name")
+                self.deploy_targets = settings.get("deploy_targets", self.deploy_targets)
+                self.update_check_offline = settings.get("update_check_offline", self.update_check_offline)
+                self.update_check_timeout = settings.get("update_check_timeout", self.update_check_timeout)
                 print("App settings loaded.")
         except Exception as e:
             print(f"Error reading settings file: {e}")
@@ -265,8 +312,13 @@ class ForceFeedbackManagerApp:
             "max_output": self.max_output_value.get(),
             "power_boost": self.power_boost_value.get(),
             "create_ac_file": self.create_ac_file.get(),
+            "simplify_lut": self.simplify_lut.get(),
+            "simplify_max_error": self.get_simplify_max_error() or self.initial_simplify_max_error,
             "last_lut_path": self.lut_path,
-            "last_lut_name": self.lut_name
+            "last_lut_name": self.lut_name,
+            "deploy_targets": self.deploy_targets,
+            "update_check_offline": self.update_check_offline,
+            "update_check_timeout": self.update_check_timeout
         }
 
         try:
@@ -277,7 +329,20 @@ class ForceFeedbackManagerApp:
             print(f"Error writing settings file: {e}")
 
     def check_version(self, show_up_to_date=True):
-        latest = self.get_latest_release()
+        """Check the latest version in the background, showing the result once it is available."""
+        if self.update_check is not None and not self.update_check.done():
+            return
+        update_checker = UpdateChecker(cache_path=self.UPDATE_CACHE_FILE, timeout=self.update_check_timeout, offline=self.update_check_offline)
+        # A manual check always revalidates the cached answer
+        self.update_check = update_checker.check_in_background(force=show_up_to_date)
+        self.root.after(self.UPDATE_POLL_MS, lambda: self.show_version_check_result(show_up_to_date))
+
+    def show_version_check_result(self, show_up_to_date):
+        """Show the result of the background version check, polling until it is ready."""
+        if not self.update_check.done():
+            self.root.after(self.UPDATE_POLL_MS, lambda: self.show_version_check_result(show_up_to_date))
+            return
+        latest = None if self.update_check.exception() else self.update_check.result()
         message = None
         new_version = False
         if latest is None:
@@ -291,14 +356,6 @@ class ForceFeedbackManagerApp:
             print(message)
             self.show_update_popup(message, new_version)
 
-    def get_latest_release(self):
-        url = "https://api.github.com/repos/Luke460/force-feedback-manager/releases/latest"
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            return data['tag_name']
-        return None
-
     def show_update_popup(self, message, new_version):
         popup = tk.Toplevel(self.root)
         popup.title("Update Check")
@@ -316,9 +373,24 @@ class ForceFeedbackManagerApp:
 
         self.center_popup(popup)
 
+    def show_error_popup(self, title, message):
+        popup = tk.Toplevel(self.root)
+        popup.title(title)
+        popup.iconbitmap(get_icon_path())
+
+        label = ttk.Label(popup, text=message, wraplength=600, justify=tk.LEFT, font=('TkDefaultFont', 10))
+        label.pack(pady=20, padx=20)
+
+        close_button = ttk.Button(popup, text="Close", command=popup.destroy)
+        close_button.pack(pady=(0,20))
+
+        self.center_popup(popup)
+
     def create_donation_button(self, mainframe, command):
         """Create a frame for the donation button in the top right corner."""
         if self.paypal_image:
+            from ttkbootstrap import Style
+
             style = Style(theme='superhero')
             background_color = style.colors.get('bg')
             style.configure('Transparent.TButton', background=background_color, borderwidth=0, highlightthickness=0, relief='flat', focuscolor='none')
@@ -328,7 +400,7 @@ class ForceFeedbackManagerApp:
         return donate_button
 
     def load_donation_image(self):
-        """Load donation button image."""
+        """Load donation button image, resizing it only the first time for each size."""
         try:
             user32 = ctypes.windll.user32
             user32.SetProcessDPIAware()
@@ -337,12 +409,26 @@ class ForceFeedbackManagerApp:
             new_width = int(100 * scaling_factor)
             new_height = int(30 * scaling_factor)
 
-            original_image = Image.open('ico/donate.png')
-            resized_image = original_image.resize((new_width, new_height), Image.LANCZOS)
-            self.paypal_image = ImageTk.PhotoImage(resized_image)
+            image_path = 'ico/donate.png'
+            cache_path = os.path.join(tempfile.gettempdir(), "ForceFeedbackManager", f"donate_{new_width}x{new_height}_{os.path.getmtime(image_path):.0f}.png")
+            if not os.path.exists(cache_path):
+                import io
+                from PIL import Image
+
+                original_image = Image.open(image_path)
+                resized_image = original_image.resize((new_width, new_height), Image.LANCZOS)
+                image_data = io.BytesIO()
+                resized_image.save(image_data, format="PNG")
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                # Another instance starting at the same time never reads a partial image
+                write_atomic(cache_path, image_data.getvalue())
+            self.paypal_image = tk.PhotoImage(file=cache_path)
         except FileNotFoundError:
             print("Warning: donate.png not found. Using default text button.")
             self.paypal_image = None
+        except (OSError, tk.TclError) as e:
+            print(f"Warning: could not load the donate image ({e}). Using default text button.")
+            self.paypal_image = None
 
     def create_slider_grid(self, mainframe, starting_row):
         slider_frame = ttk.Frame(mainframe)
@@ -365,60 +451,43 @@ class ForceFeedbackManagerApp:
             status_parts.append(f"LUT saved: {self.lut_name}")
         if self.compare_lut_name:
             status_parts.append(f"Comparison LUT loaded: {self.compare_lut_name}")
+        if self.overlay_luts:
+            status_parts.append(f"Overlay: {len(self.overlay_luts)} LUTs from {self.overlay_folder}")
+        if self.deploy_status:
+            status_parts.append(self.deploy_status)
         status_text = " | ".join(status_parts) if status_parts else "Adjust FFB Deadzone, Max Output Force, and Power Boost, then click Apply."
         self.status_label.config(text=status_text)
 
-    def load_compare_lut(self):
-        """Load and display a LUT file for comparison."""
-        file_path = filedialog.askopenfilename(defaultextension=".lut", filetypes=[("LUT files", "*.lut"), ("All files", "*.*")])
-        if file_path:
-            self.compare_lut = Lut()
-            with open(file_path, "r") as file:
-                for line in file:
-                    x, y = map(float, line.strip().split("|"))
-                    self.compare_lut.addPoint(x, y)
-            self.compare_lut_name = os.path.basename(file_path)
-            self.compare_lut_modified = True
-            self.apply_correction()
-
     def clear_comparison(self):
-        """Clear the comparison LUT curve."""
+        """Clear the comparison LUT curve and the overlay curves."""
         self.compare_lut = None
         self.compare_lut_name = None
         self.compare_lut_modified = False
+        if self.overlay_luts:
+            self.overlay_luts = []
+            self.overlay_folder = None
+            if self.chart:
+                self.chart.set_overlays([])
         self.apply_correction()
 
-    def update_combined_output(self):
-        """Update the combined LUT output with both current and comparison LUTs."""
-        self.combined_output.config(state=tk.NORMAL)
-        self.combined_output.delete(1.0, tk.END)
+    def sync_model(self):
+        """Copy the slider values to the model, returning the names of the changed parameters."""
+        return self.model.set(deadzone=self.deadzone_value.get(), max_output=self.max_output_value.get(), power_boost=self.power_boost_value.get())
 
-        lut_points = {x: y for x, y in self.lut.points}
-        compare_points = {x: y for x, y in self.compare_lut.points} if self.compare_lut else None
+    def on_model_changed(self, model, changed):
+        """Follow a change of the LUT parameters on the chart, on the next frame.
 
-        combined_content = []
-        first_compare_y = 0.0
+        The LUT output only changes on Apply, so dragging a slider never builds the full LUT.
+        """
+        self.request_chart_update()
 
-        if compare_points:
-            first_compare_y = compare_points.get(0.0, 0.0)
-            combined_content.append(f"0.000|0.00000 - {first_compare_y:.5f}")
-        else:
-            combined_content.append("0.000|0.00000")
-        
-        previous_compare_y = first_compare_y
-        for x in sorted(lut_points.keys()):
-            if x == 0.000:
-                continue  # Skip the first value
-            current_y = lut_points[x]
-            if compare_points:
-                compare_y = compare_points.get(x, previous_compare_y)
-                previous_compare_y = compare_y
-                combined_content.append(f"{x:.3f}|{current_y:.5f} - {compare_y:.5f}")
-            else:
-                combined_content.append(f"{x:.3f}|{current_y:.5f}")
-        
-        self.combined_output.insert(tk.END, "\n".join(combined_content))
-        self.combined_output.config(state=tk.DISABLED)
+    @traced
+    def update_combined_output(self):
+        """Update the combined LUT output with both current and comparison LUTs."""
+        lut = self.model.lut
+        # Align the comparison LUT on the current grid, whatever its own grid is
+        compare_y = resample(self.compare_lut, lut.x) if self.compare_lut else None
+        self.combined_output.set_lut(lut, compare_y)
 
     def save_preset(self):
         """Save the current slider values to a preset file."""
@@ -433,8 +502,7 @@ class ForceFeedbackManagerApp:
 
         file_path = filedialog.asksaveasfilename(initialdir="./presets", defaultextension=".json", filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
         if file_path:
-            with open(file_path, "w") as file:
-                json.dump(preset, file)
+            write_preset(file_path, preset)
             self.preset_path = file_path
             self.preset_name = os.path.basename(file_path)
             self.update_status_label()
@@ -445,20 +513,103 @@ class ForceFeedbackManagerApp:
         if file_path:
             self.load_preset_file(file_path)
 
+    @traced
     def load_preset_file(self, file_path):
-        with open(file_path, "r") as file:
-            preset = json.load(file)
-            self.deadzone_value.set(preset["deadzone"])
-            self.max_output_value.set(preset["max_output"])
-            self.power_boost_value.set(preset["power_boost"])
-                # Save initial values
-            self.initial_deadzone_value = preset["deadzone"]
-            self.initial_max_output_value = preset["max_output"]
-            self.initial_power_boost_value = preset["power_boost"]
+        preset = read_preset(file_path)
+        self.deadzone_value.set(preset["deadzone"])
+        self.max_output_value.set(preset["max_output"])
+        self.power_boost_value.set(preset["power_boost"])
+        # Save initial values
+        self.initial_deadzone_value = preset["deadzone"]
+        self.initial_max_output_value = preset["max_output"]
+        self.initial_power_boost_value = preset["power_boost"]
         self.preset_path = file_path
         self.preset_name = os.path.basename(file_path)
         self.apply_correction()
 
+    def show_preset_catalog_popup(self):
+        """Search the preset library by name, folder and values, and load the selected preset."""
+        catalog = PresetCatalog(self.PRESETS_DIR, self.PRESET_CATALOG_FILE)
+        counts = catalog.refresh()
+        for file_path, error in counts["errors"]:
+            print(f"Error reading preset {file_path}: {error}")
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Find Preset")
+        popup.iconbitmap(get_icon_path())
+
+        search_frame = ttk.Frame(popup)
+        search_frame.pack(fill=tk.X, padx=20, pady=(20, 10))
+        search_value = tk.StringVar()
+        filter_value = tk.StringVar()
+        ttk.Label(search_frame, text="Name or folder:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
+        search_entry = ttk.Entry(search_frame, textvariable=search_value, width=40)
+        search_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=5, pady=2)
+        ttk.Label(search_frame, text="Values:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Entry(search_frame, textvariable=filter_value, width=40).grid(row=1, column=1, sticky=(tk.W, tk.E), padx=5, pady=2)
+        ttk.Label(search_frame, text="e.g. deadzone >= 5, deadzone <= 10, power boost > 0").grid(row=2, column=1, sticky=tk.W, padx=5)
+        search_frame.columnconfigure(1, weight=1)
+
+        result_frame = ttk.Frame(popup)
+        result_frame.pack(fill=tk.BOTH, expand=True, padx=20)
+        columns = ("folder", "deadzone", "max_output", "power_boost")
+        tree = ttk.Treeview(result_frame, columns=columns, height=15, selectmode=tk.BROWSE)
+        tree.heading("#0", text="Preset")
+        for column, text in zip(columns, ("Folder", "Deadzone", "Max Output", "Power Boost")):
+            tree.heading(column, text=text)
+            tree.column(column, width=90 if column != "folder" else 160, anchor=tk.W if column == "folder" else tk.E)
+        scrollbar = ttk.Scrollbar(result_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        status_label = ttk.Label(popup, text="")
+        status_label.pack(fill=tk.X, padx=20, pady=5)
+
+        def show_rows(rows, description):
+            tree.delete(*tree.get_children())
+            for row in rows:
+                tree.insert("", tk.END, iid=row["path"], text=row["name"],
+                            values=(row["folder"], f"{row['deadzone']:g}", f"{row['max_output']:g}", f"{row['power_boost']:g}"))
+            status_label.config(text=f"{len(rows)} {description} of {catalog.count()} presets")
+
+        def filter_rows(*args):
+            try:
+                conditions = parse_conditions(filter_value.get())
+            except ValueError as e:
+                status_label.config(text=str(e))
+                return
+            show_rows(catalog.query(search_value.get(), conditions=conditions, limit=self.PRESET_RESULTS_LIMIT), "matching")
+
+        def show_similar():
+            rows = catalog.nearest(self.deadzone_value.get(), self.max_output_value.get(), self.power_boost_value.get(), count=20)
+            show_rows(rows, "closest to the current values")
+
+        def load_selected(event=None):
+            selection = tree.selection()
+            if selection:
+                self.load_preset_file(catalog.get_path(selection[0]))
+
+        def close():
+            catalog.close()
+            popup.destroy()
+
+        search_value.trace_add("write", filter_rows)
+        filter_value.trace_add("write", filter_rows)
+        tree.bind("<Double-1>", load_selected)
+        tree.bind("<Return>", load_selected)
+
+        button_frame = ttk.Frame(popup)
+        button_frame.pack(pady=(5, 20))
+        ttk.Button(button_frame, text="Load", command=load_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Similar to Current", command=show_similar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=close).pack(side=tk.LEFT, padx=5)
+        popup.protocol("WM_DELETE_WINDOW", close)
+
+        filter_rows()
+        search_entry.focus_set()
+        self.center_popup(popup)
+
     def center_popup(self, popup):
         """Center the given popup window on the root window."""
         root_width = self.root.winfo_width()
@@ -570,120 +721,64 @@ class ForceFeedbackManagerApp:
             variable.set(100.0)
         elif variable == self.power_boost_value:
             variable.set(0.0)
+        self.sync_model()
         self.update_chart()
 
     def update_value(self, value, variable, increment):
         """Update the slider value to the nearest increment and update the chart."""
         rounded_value = round(float(value) / increment) * increment
         variable.set(rounded_value)
-        self.update_chart()
+        self.sync_model()
 
+    @traced
     def apply_correction(self, event=None):
         """Apply the deadzone and max output values to generate the LUT."""
-        lut_size = 1000
         self.deadzone_value.set(limit_value(self.deadzone_value.get(), self.deadzone_min, self.deadzone_max))
         self.max_output_value.set(limit_value(self.max_output_value.get(), self.max_output_min, self.max_output_max))
         self.power_boost_value.set(limit_value(self.power_boost_value.get(), self.power_boost_min, self.power_boost_max))
-        deadzone = self.deadzone_value.get()
-        max_output = self.max_output_value.get()
-        power_boost = self.power_boost_value.get()
-        self.lut = generateCustomLut(lut_size, deadzone, max_output, power_boost)
+        self.sync_model()
         self.update_combined_output()
         self.update_chart()
 
     def create_tooltip(self, event):
         """Create a tooltip showing the LUT values at the cursor position."""
-        if event.inaxes == self.ax:
-            for line in self.ax.get_lines():
-                if line.contains(event)[0]:
-                    xdata, ydata = line.get_data()
-                    ind = line.contains(event)[1]["ind"][0]
-                    x, y = xdata[ind], ydata[ind]
-                    self.tooltip.set_text(f"{x:.3f}|{y:.3f}")
-                    self.tooltip.xy = (event.xdata, event.ydata)
-                    self.tooltip.set_visible(True)
-                    self.canvas.draw_idle()
-                    return
-        self.tooltip.set_visible(False)
-        self.canvas.draw_idle()
-        
+        self.chart.hover(event)
+
+    def request_chart_update(self):
+        """Schedule a chart update, coalescing bursts of slider events into one redraw per frame."""
+        if self.chart_update_id is None:
+            self.chart_update_id = self.root.after(self.CHART_FRAME_MS, self.update_chart)
+
+    @traced
     def update_chart(self, compare_lut=None):
         """Update the chart with the current settings, optionally comparing with another LUT."""
-        self.ax.clear()
+        if self.chart_update_id is not None:
+            self.root.after_cancel(self.chart_update_id)
+            self.chart_update_id = None
+        if self.chart is None:
+            return
 
-        # Add default lut line
-        self.ax.plot([0, 100], [0, 100], color='gray', linewidth=0.5, dashes=(2, 2))
-
-        lut_size = 100
-        deadzone = self.deadzone_value.get()
-        max_output = self.max_output_value.get()
-        power_boost = self.power_boost_value.get()
-        
-        lut = generateCustomLut(lut_size, deadzone, max_output, power_boost)
-        x_vals = [x for x, y in lut.points]
-        y_vals = [y for x, y in lut.points]
-        
-        self.ax.plot(x_vals, y_vals, label='Current LUT', color='blue', linewidth=2)
-        
-        # Find the intersection point of the LUT curve with the y-axis
-        intersection_y = next((y for x, y in lut.points if x == 0), 0)
+        model = self.model
 
         # Ensure the comparison LUT is always plotted if it exists
-        if self.compare_lut_modified and hasattr(self, 'compare_lut') and self.compare_lut:
-            compare_x_vals = [x for x, y in self.compare_lut.points]
-            compare_y_vals = [y for x, y in self.compare_lut.points]
-            self.ax.plot(compare_x_vals, compare_y_vals, label='Comparison LUT', color='orange', linewidth=2)
-        
-        # Find the maximum y value of the LUT curve
-        max_y = max(y_vals)
-        
-        # Add horizontal line for max output force if less than 100
-        if max_output < 100.0:
-            self.ax.axhline(max_y, color='forestgreen', linestyle='--', label='Max Output Force')
-        
-        # Add vertical line for clipping if max_output >= 100.0
-        if max_output > 100.0:
-            clipping_point = next((x for x, y in lut.points if y >= 1.0), 1.0)
-            self.ax.axvline(clipping_point, color='red', linestyle='--', label='Clipping')
-
-        # Add horizontal line for deadzone
-        if deadzone > 0.0:
-            self.ax.axhline(intersection_y, color='dimgrey', linestyle='--', label='Deadzone')
-
-        self.ax.set_ylim(0, 1)
-        self.ax.set_xlim(0, 1)
-        self.ax.set_xlabel('Input (%)')
-        self.ax.set_ylabel('Output (%)')
-        self.ax.legend()
-        self.ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-        self.ax.set_xticks(np.linspace(0, 1, 11))
-        self.ax.set_yticks(np.linspace(0, 1, 11))
-        self.ax.set_xticklabels([f'{int(i*100)}%' for i in np.linspace(0, 1, 11)])
-        self.ax.set_yticklabels([f'{int(i*100)}%' for i in np.linspace(0, 1, 11)])
-        
-        # Create tooltip
-        self.tooltip = self.ax.annotate("", xy=(0,0), xytext=(-20,20),
-                                        textcoords="offset points",
-                                        bbox=dict(boxstyle="round", fc="w"),
-                                        arrowprops=dict(arrowstyle="->"))
-        self.tooltip.set_visible(False)
-        
-        self.canvas.mpl_connect("motion_notify_event", self.create_tooltip)
-        self.canvas.draw()
+        if self.compare_lut_modified and self.compare_lut:
+            compare_lut = self.compare_lut
+
+        self.chart.update(model.preview, model.max_output, model.deadzone, compare_lut, model.analysis)
 
         self.update_status_label()
         
+    @traced
     def save_lut(self):
         """Save the LUT to a file."""
         self.apply_correction()
-        
-        lut_content = ["0.000|0.00000"]  # First value
-        lut_content += [f"{x:.3f}|{y:.5f}" for x, y in self.lut.points if x != 0.000]
 
         file_path = filedialog.asksaveasfilename(initialdir=self.lut_path, initialfile=self.lut_name, defaultextension=".lut", filetypes=[("LUT files", "*.lut"), ("All files", "*.*")])
         if file_path:
-            with open(file_path, "w") as file:
-                file.write("\n".join(lut_content))
+            lut_text = self.get_saved_lut_text("Save LUT", os.path.basename(file_path))
+            if lut_text is None:
+                return
+            write_atomic(file_path, encode_text(lut_text))
             self.lut_path = os.path.dirname(file_path)
             self.lut_name = os.path.basename(file_path)
             self.update_ff_post_process_ini()
@@ -691,50 +786,195 @@ class ForceFeedbackManagerApp:
             self.show_donation_popup()
             self.update_app_settings()
 
+    def get_saved_lut_text(self, title, lut_name):
+        """Get the content of the saved .lut file, simplified if requested, or None if the max error is invalid."""
+        if not self.simplify_lut.get():
+            return self.model.text
+        max_error = self.get_simplify_max_error()
+        if max_error is None or max_error < 0:
+            self.show_error_popup(title, "The max error of the simplified LUT must be zero or more.")
+            return None
+        reduction = reduce_lut(self.model.lut, max_error / 100)
+        print(format_reduction(lut_name, reduction))
+        return format_lut_file(reduction["lut"])
+
+    def get_simplify_max_error(self):
+        """Get the max error of the simplified LUT in percent, or None if the field is not a number."""
+        try:
+            return self.simplify_max_error.get()
+        except tk.TclError:
+            return None
+
+    @traced
     def update_ff_post_process_ini(self):
-        ini_content = f"""[HEADER]
-VERSION=1
-TYPE=LUT
-ENABLED=1
+        ini_content = encode_text(format_ff_post_process_ini(self.lut_name))
+        ini_path = os.path.join(self.lut_path, INI_NAME)
+
+        # The replaced file joins the backup history, and an unchanged file is left alone
+        status, backup_path = deploy_file(self.lut_path, INI_NAME, ini_content)
+        if backup_path:
+            print(f"Backup created at: {backup_path}")
+        if status == "unchanged":
+            print(f"INI file already up to date: {ini_path}")
+        else:
+            print(f"INI file created at: {ini_path}")
 
-[GAMMA]
-VALUE=1
+    def deploy_lut(self):
+        """Write the LUT, and its ff_post_process.ini file if enabled, to every deploy target folder."""
+        if not self.deploy_targets:
+            self.show_error_popup("Deploy", "Add the game folders to deploy to with Deploy Targets first.")
+            return
+        self.apply_correction()
+        lut_name = self.lut_name or self.DEPLOY_LUT_NAME
+        lut_text = self.get_saved_lut_text("Deploy", lut_name)
+        if lut_text is None:
+            return
 
-[LUT]
-CURVE={self.lut_name}
-"""
+        results = deploy(self.deploy_targets, get_deploy_files(lut_name, lut_text, ini=self.create_ac_file.get()))
+        for result in results:
+            print(format_deploy_result(result))
+        errors = [format_deploy_result(result) for result in results if result["error"]]
+        written = sum(1 for result in results if result["written"])
+        self.deploy_status = f"{lut_name} deployed to {len(results) - len(errors)} of {len(results)} folders ({written} updated)"
+        self.update_status_label()
+        if errors:
+            self.show_error_popup("Deploy", "\n".join(errors))
 
-        ini_path = os.path.join(self.lut_path, "ff_post_process.ini")
-        backup_path = os.path.join(self.lut_path, "ff_post_process_backup.ini")
+    def show_deploy_targets_popup(self):
+        """Edit the list of folders the Deploy button writes to."""
+        popup = tk.Toplevel(self.root)
+        popup.title("Deploy Targets")
+        popup.iconbitmap(get_icon_path())
 
-        # create a backup file
-        if not os.path.exists(backup_path) and os.path.exists(ini_path):
-            try:
-                shutil.copyfile(ini_path, backup_path)
-                print(f"Backup created at: {backup_path}")
-            except Exception as e:
-                print(f"Error creating backup: {e}")
-        else:
-            print("Backup already exists. No action taken.")
+        list_frame = ttk.Frame(popup)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(20, 10))
+        listbox = tk.Listbox(list_frame, selectmode=tk.EXTENDED, width=80, height=10, exportselection=False)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=listbox.yview)
+        listbox.configure(yscrollcommand=scrollbar.set)
+        listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        for target in self.deploy_targets:
+            listbox.insert(tk.END, target)
+
+        def add_target():
+            folder = filedialog.askdirectory(parent=popup, initialdir=self.lut_path, mustexist=True)
+            if folder and folder not in self.deploy_targets:
+                self.deploy_targets.append(folder)
+                listbox.insert(tk.END, folder)
+                self.update_app_settings()
+
+        def remove_targets():
+            for i in reversed(listbox.curselection()):
+                del self.deploy_targets[i]
+                listbox.delete(i)
+            self.update_app_settings()
 
-        # update the .ini file
-        with open(ini_path, "w") as f:
-            f.write(ini_content)
-        print(f"INI file created at: {ini_path}")
+        button_frame = ttk.Frame(popup)
+        button_frame.pack(pady=(5, 20))
+        ttk.Button(button_frame, text="Add Folder", command=add_target).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Remove", command=remove_targets).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=popup.destroy).pack(side=tk.LEFT, padx=5)
+        self.center_popup(popup)
 
     def load_compare_lut(self):
         """Load and display a LUT file for comparison."""
-        file_path = filedialog.askopenfilename(initialdir=self.lut_path, initialfile=self.lut_name, defaultextension=".lut", filetypes=[("LUT files", "*.lut"), ("All files", "*.*")])
+        file_path = filedialog.askopenfilename(initialdir=self.lut_path, initialfile=self.lut_name, defaultextension=".lut", filetypes=[("LUT files", "*.lut *.lutb"), ("All files", "*.*")])
         if file_path:
-            self.compare_lut = Lut()
-            with open(file_path, "r") as file:
-                for line in file:
-                    x, y = map(float, line.strip().split("|"))
-                    self.compare_lut.addPoint(x, y)
+            try:
+                self.compare_lut = read_lut(file_path)
+            except (OSError, ValueError) as e:
+                # LutParseError and BinaryLutError are ValueErrors, as well as any other unreadable content
+                print(f"Error loading LUT file: {e}")
+                self.show_error_popup("Compare LUT", str(e))
+                return
             self.compare_lut_name = os.path.basename(file_path)
             self.compare_lut_modified = True
             self.apply_correction()
 
+    def load_overlay_folder(self):
+        """Overlay every LUT and preset of a folder and its sub-folders on the chart."""
+        folder = filedialog.askdirectory(initialdir=self.PRESETS_DIR, mustexist=True)
+        if not folder:
+            return
+        overlay_luts = []
+        for parent, _, file_names in os.walk(folder):
+            for file_name in sorted(file_names):
+                if not file_name.lower().endswith(self.OVERLAY_EXTENSIONS):
+                    continue
+                file_path = os.path.join(parent, file_name)
+                try:
+                    lut = read_lut_or_preset(file_path, self.OVERLAY_LUT_SIZE)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Error loading {file_path}: {e}")
+                    continue
+                overlay_luts.append((os.path.relpath(file_path, folder), lut))
+        if not overlay_luts:
+            self.show_error_popup("Overlay Folder", "No LUT or preset found in this folder.")
+            return
+        print(f"Overlaying {len(overlay_luts)} LUTs from {folder}")
+        self.overlay_luts = sorted(overlay_luts, key=lambda item: item[0])
+        self.overlay_folder = os.path.basename(os.path.normpath(folder))
+        if self.chart:
+            self.chart.set_overlays(self.overlay_luts)
+        self.update_status_label()
+
+    def show_overlay_popup(self):
+        """Show or hide each overlay curve."""
+        from matplotlib.colors import to_hex
+
+        if not self.overlay_luts or self.chart is None:
+            self.show_error_popup("Overlays", "Load a folder with Overlay Folder first.")
+            return
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Overlays")
+        popup.iconbitmap(get_icon_path())
+
+        list_frame = ttk.Frame(popup)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(20, 10))
+        listbox = tk.Listbox(list_frame, selectmode=tk.MULTIPLE, width=50, height=20, exportselection=False)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=listbox.yview)
+        listbox.configure(yscrollcommand=scrollbar.set)
+        listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        for i, overlay in enumerate(self.chart.overlays):
+            listbox.insert(tk.END, overlay.name)
+            listbox.itemconfig(i, foreground=to_hex(overlay.color))
+            if overlay.visible:
+                listbox.selection_set(i)
+
+        def apply_selection(event=None):
+            selected = set(listbox.curselection())
+            self.chart.set_overlay_visibility([i in selected for i in range(len(self.chart.overlays))])
+
+        def select_all(visible):
+            if visible:
+                listbox.selection_set(0, tk.END)
+            else:
+                listbox.selection_clear(0, tk.END)
+            apply_selection()
+
+        listbox.bind("<<ListboxSelect>>", apply_selection)
+
+        button_frame = ttk.Frame(popup)
+        button_frame.pack(pady=(5, 20))
+        ttk.Button(button_frame, text="Show All", command=lambda: select_all(True)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Hide All", command=lambda: select_all(False)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=popup.destroy).pack(side=tk.LEFT, padx=5)
+        self.center_popup(popup)
+
+    def fit_compare_lut(self):
+        """Set the sliders to the values that best reproduce the comparison LUT."""
+        if not self.compare_lut:
+            self.show_error_popup("Fit Comparison", "Load a LUT with Compare LUT first.")
+            return
+        fit = fit_lut(self.compare_lut)
+        print(format_fit(self.compare_lut_name, fit))
+        self.deadzone_value.set(fit["preset"]["deadzone"])
+        self.max_output_value.set(fit["preset"]["max_output"])
+        self.power_boost_value.set(fit["preset"]["power_boost"])
+        self.apply_correction()
+
     def is_preset_modified(self):
         """Check if the current preset values have been modified."""
         return (self.preset_name and (
@@ -765,6 +1005,15 @@ CURVE={self.lut_name}
         sys.exit()
 
 if __name__ == "__main__":
+    import argparse
+    import ttkbootstrap as tb
+
+    parser = argparse.ArgumentParser(description="Force Feedback Manager")
+    parser.add_argument("--trace", nargs="?", const=DEFAULT_TRACE_FILE, default=None, help=f"time the hot paths and write a Chrome trace file (default: {DEFAULT_TRACE_FILE})")
+    args = parser.parse_args()
+    if args.trace:
+        tracer.enable(args.trace)
+
     root = tb.Window(themename="superhero")
     app = ForceFeedbackManagerApp(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
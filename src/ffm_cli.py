@@ -0,0 +1,464 @@
+"""Command line tools for Force Feedback Manager that run without a display."""
+import argparse
+import os
+import sys
+
+from tracing import DEFAULT_TRACE_FILE, tracer
+from update_check import RELEASES_URL
+
+def run_batch(args):
+    """Generate the LUTs of a presets tree."""
+    import lut_batch
+
+    max_error = args.max_error / 100 if args.max_error is not None else None
+    summary = lut_batch.generate_presets(args.presets_dir, args.output_dir, lut_size=args.lut_size, jobs=args.jobs, max_error=max_error)
+    for preset_path, error in summary["errors"]:
+        print(f"Error processing {preset_path}: {error}")
+    for preset_path, problem in summary["problems"]:
+        print(f"Warning {preset_path}: {problem}")
+    print(lut_batch.format_summary(summary))
+    return 1 if summary["errors"] or (args.strict and summary["problems"]) else 0
+
+def find_curve_files(paths, extensions=(".lut", ".json")):
+    """Get the .lut and preset .json files given directly or found in the given folders."""
+    file_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, _, file_names in os.walk(path):
+                file_paths += [os.path.join(folder, file_name) for file_name in file_names if file_name.lower().endswith(extensions)]
+        else:
+            file_paths.append(path)
+    return sorted(file_paths)
+
+def find_output_paths(paths, extensions, output_dir, get_extension):
+    """Get the (file path, output path, error) of the curve files found in paths.
+
+    The files found in a folder keep their position in its tree under output_dir, and are written
+    next to themselves without it. error is set when the output path is one of the inputs or the
+    output of an earlier file, which must not be overwritten.
+    """
+    found = []
+    for path in paths:
+        root = path if os.path.isdir(path) else os.path.dirname(path) or "."
+        for file_path in find_curve_files([path], extensions=extensions):
+            relative_path = os.path.splitext(os.path.relpath(file_path, root))[0] + get_extension(file_path)
+            found.append((file_path, os.path.join(output_dir or root, relative_path)))
+
+    def get_key(file_path):
+        return os.path.normcase(os.path.abspath(file_path))
+
+    inputs = {get_key(file_path) for file_path, _ in found}
+    sources = {}
+    results = []
+    for file_path, output_path in found:
+        key = get_key(output_path)
+        error = None
+        if key in inputs:
+            error = f"{output_path} is one of the input files"
+        elif key in sources:
+            error = f"{output_path} is already the output of {sources[key]}"
+        else:
+            sources[key] = file_path
+        results.append((file_path, output_path, error))
+    return results
+
+def run_compare(args):
+    """Compare LUTs or presets with a master curve."""
+    from lut_compare import compare_luts, format_metrics
+    from lut_io import read_lut_or_preset
+
+    master = read_lut_or_preset(args.master, args.lut_size)
+    names = []
+    references = []
+    failed = False
+    for file_path in find_curve_files(args.references):
+        try:
+            references.append(read_lut_or_preset(file_path, args.lut_size))
+            names.append(file_path)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            failed = True
+    if not references:
+        return 1
+
+    comparison = compare_luts(master, references)
+    for name, metrics in zip(names, comparison["metrics"]):
+        status = ""
+        if args.max_error is not None and metrics["max_abs_error"] * 100 > args.max_error:
+            status = " [FAIL]"
+            failed = True
+        print(format_metrics(name, metrics) + status)
+    return 1 if failed else 0
+
+def run_fit(args):
+    """Find the preset of each LUT, optionally writing the preset files."""
+    from lut_core import write_preset
+    from lut_fit import fit_lut, format_fit
+    from lut_io import read_lut
+
+    failed = False
+    for file_path in find_curve_files(args.luts, extensions=(".lut",)):
+        try:
+            fit = fit_lut(read_lut(file_path), increment=None if args.exact else 0.5)
+        except Exception as e:
+            print(f"Error fitting {file_path}: {e}")
+            failed = True
+            continue
+        print(format_fit(file_path, fit))
+        if args.presets_dir:
+            os.makedirs(args.presets_dir, exist_ok=True)
+            name = os.path.splitext(os.path.basename(file_path))[0] + ".json"
+            write_preset(os.path.join(args.presets_dir, name), fit["preset"])
+    return 1 if failed else 0
+
+def run_sweep(args):
+    """Generate the LUTs of a parameter grid into a compressed array file."""
+    from lut_sweep import format_sweep_summary, parameter_axis, write_sweep, write_sweep_luts
+
+    axes = [parameter_axis(*args.deadzone), parameter_axis(*args.max_output), parameter_axis(*args.power_boost)]
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    summary = write_sweep(args.output, args.lut_size, *axes, dtype=args.dtype, compresslevel=args.compress_level)
+    print(format_sweep_summary(summary))
+    if args.lut:
+        lut_dir = args.lut_dir or os.path.dirname(os.path.abspath(args.output))
+        for file_path in write_sweep_luts(lut_dir, args.lut_size, args.lut, *axes):
+            print(f"LUT written: {file_path}")
+    return 0
+
+def run_watch(args):
+    """Keep the outputs of preset trees up to date."""
+    from lut_watch import PresetSync, report_cycle, watch
+
+    preset_sync = PresetSync(args.presets_dirs, args.output_dir, lut_size=args.lut_size)
+    if args.once:
+        summary = preset_sync.sync()
+        report_cycle(summary)
+        return 1 if summary["errors"] else 0
+    try:
+        watch(preset_sync, interval=args.interval, use_inotify=False if args.poll else None)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def run_presets(args):
+    """Search the preset library."""
+    from preset_catalog import format_preset_row, parse_conditions, PresetCatalog
+
+    try:
+        conditions = [condition for text in args.where for condition in parse_conditions(text)]
+    except ValueError as e:
+        print(e)
+        return 2
+    catalog = PresetCatalog(args.presets_dir, args.db)
+    try:
+        counts = catalog.refresh()
+        for file_path, error in counts["errors"]:
+            print(f"Error reading {file_path}: {error}")
+        if args.near:
+            rows = catalog.nearest(*args.near, count=args.limit or 5)
+        else:
+            rows = catalog.query(args.search, args.folder, conditions, args.limit)
+        for row in rows:
+            print(format_preset_row(row))
+        print(f"{len(rows)} of {catalog.count()} presets")
+    finally:
+        catalog.close()
+    return 0
+
+def run_convert(args):
+    """Convert .lut files to the binary format and back."""
+    from lut_binary import BINARY_EXTENSION, is_binary_lut
+    from lut_io import convert_lut_file
+
+    failed = False
+    get_extension = lambda file_path: ".lut" if is_binary_lut(file_path) else BINARY_EXTENSION
+    for file_path, output_path, error in find_output_paths(args.luts, (".lut", BINARY_EXTENSION), args.output_dir, get_extension):
+        try:
+            if error:
+                raise ValueError(error)
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            output_path, changes = convert_lut_file(file_path, output_path, dtype=args.dtype, overwrite=args.force)
+            print(f"{file_path} -> {output_path}")
+            for change in changes:
+                print(f"Warning {output_path}: written as Save LUT does, {change}")
+        except FileExistsError as e:
+            print(f"Error converting {file_path}: {e}, use --force to replace it")
+            failed = True
+        except Exception as e:
+            print(f"Error converting {file_path}: {e}")
+            failed = True
+    return 1 if failed else 0
+
+def run_reduce(args):
+    """Write simplified copies of LUTs or presets, within a maximum interpolation error."""
+    from lut_binary import BINARY_EXTENSION
+    from lut_io import read_lut_or_preset, write_lut
+    from lut_reduce import format_reduction, reduce_lut
+
+    failed = False
+    for file_path, output_path, error in find_output_paths(args.luts, (".lut", BINARY_EXTENSION, ".json"), args.output_dir, lambda file_path: ".lut"):
+        try:
+            if error:
+                raise ValueError(error)
+            reduction = reduce_lut(read_lut_or_preset(file_path, args.lut_size), args.max_error / 100)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            write_lut(output_path, reduction["lut"])
+            print(format_reduction(output_path, reduction))
+        except Exception as e:
+            print(f"Error reducing {file_path}: {e}")
+            failed = True
+    return 1 if failed else 0
+
+def run_gallery(args):
+    """Render the chart of every preset to an image."""
+    import lut_gallery
+
+    summary = lut_gallery.render_gallery(args.presets_dir, args.output_dir, image_format=args.format, lut_size=args.lut_size,
+                                         jobs=args.jobs, dpi=args.dpi, title=not args.no_title)
+    for preset_path, error in summary["errors"]:
+        print(f"Error rendering {preset_path}: {error}")
+    print(lut_gallery.format_gallery_summary(summary))
+    return 1 if summary["errors"] else 0
+
+def run_deploy(args):
+    """Write a LUT and its ff_post_process.ini file to many game folders at once."""
+    from lut_core import format_lut_file
+    from lut_deploy import deploy, format_deploy_result, get_deploy_files
+    from lut_io import read_lut_or_preset
+
+    try:
+        if args.lut.lower().endswith(".lut"):
+            with open(args.lut, "r") as f:
+                lut_text = f.read()
+        else:
+            lut_text = format_lut_file(read_lut_or_preset(args.lut, args.lut_size))
+    except Exception as e:
+        print(f"Error reading {args.lut}: {e}")
+        return 1
+    lut_name = args.name or os.path.splitext(os.path.basename(args.lut))[0] + ".lut"
+
+    results = deploy(args.targets, get_deploy_files(lut_name, lut_text, ini=not args.no_ini), history=args.history, jobs=args.jobs)
+    for result in results:
+        print(format_deploy_result(result))
+    return 1 if any(result["error"] for result in results) else 0
+
+def run_analyze(args):
+    """Print the clipping point, deadzone intercept, slopes and monotonicity of LUTs or presets."""
+    from lut_analysis import analyze_lut, analyze_parameters, find_problems, format_analysis
+    from lut_binary import BINARY_EXTENSION
+    from lut_core import read_preset
+    from lut_io import read_lut
+
+    failed = False
+    for file_path in find_curve_files(args.luts, extensions=(".lut", BINARY_EXTENSION, ".json")):
+        try:
+            if file_path.lower().endswith(".json"):
+                # Presets are analyzed exactly from their parameters
+                preset = read_preset(file_path)
+                analysis = analyze_parameters(preset["deadzone"], preset["max_output"], preset["power_boost"])
+            else:
+                analysis = analyze_lut(read_lut(file_path))
+            print(format_analysis(file_path, analysis))
+            if find_problems(analysis):
+                failed = True
+        except Exception as e:
+            print(f"Error analyzing {file_path}: {e}")
+            failed = True
+    return 1 if failed else 0
+
+def run_replay(args):
+    """Replay a recorded force feedback signal through LUTs or presets and print what each does to it."""
+    import json
+    from lut_binary import BINARY_EXTENSION
+    from lut_io import read_lut_or_preset
+    from lut_replay import format_replay, read_signal_chunks, replay
+
+    named_luts = []
+    failed = False
+    for file_path in find_curve_files(args.luts, extensions=(".lut", BINARY_EXTENSION, ".json")):
+        try:
+            named_luts.append((os.path.splitext(os.path.basename(file_path))[0], read_lut_or_preset(file_path, args.lut_size)))
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            failed = True
+    if not named_luts:
+        print("No LUT to replay")
+        return 1
+
+    column = int(args.column) if args.column.isdigit() else args.column
+    scale = args.scale if args.scale is not None else (32767.0 if args.dtype == "int16" else 1.0)
+    try:
+        chunks = read_signal_chunks(args.signal, column=column, delimiter=args.delimiter, dtype=args.dtype,
+                                    channels=args.channels, channel=args.channel)
+        report = replay(chunks, named_luts, scale=scale, sample_rate=args.sample_rate)
+    except Exception as e:
+        print(f"Error replaying {args.signal}: {e}")
+        return 1
+    for line in format_replay(report):
+        print(line)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=4)
+    return 1 if failed else 0
+
+def run_serve(args):
+    """Serve LUT generation, fitting, comparison and preset searches over HTTP."""
+    import asyncio
+    import lut_server
+
+    try:
+        asyncio.run(lut_server.serve(args.host, args.port, presets_dir=args.presets_dir, db_path=args.db, cache_size=args.cache_size, jobs=args.jobs))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def run_update_check(args):
+    """Print the latest released version."""
+    from update_check import UpdateChecker
+
+    update_checker = UpdateChecker(url=args.url, cache_path=args.cache, timeout=args.timeout, offline=args.offline)
+    latest = update_checker.check(force=args.force)
+    if latest is None:
+        print("Unable to check the latest version")
+        return 1
+    print(latest)
+    return 0
+
+def build_parser():
+    """Build the argument parser with one sub-command per tool."""
+    parser = argparse.ArgumentParser(prog="ffm_cli", description="Force Feedback Manager command line tools.")
+    parser.add_argument("--trace", nargs="?", const=DEFAULT_TRACE_FILE, default=None, help=f"time the hot paths and write a Chrome trace file (default: {DEFAULT_TRACE_FILE})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help="generate .lut and ff_post_process.ini files for a presets tree")
+    batch_parser.add_argument("presets_dir", help="folder containing the preset .json files (searched recursively)")
+    batch_parser.add_argument("output_dir", help="folder where one sub-folder per preset is written")
+    batch_parser.add_argument("--lut-size", type=int, default=1000, help="number of LUT intervals (default: 1000)")
+    batch_parser.add_argument("--jobs", type=int, default=None, help="number of worker processes (default: CPU count)")
+    batch_parser.add_argument("--max-error", type=float, default=None, help="simplify the LUTs within this max interpolation error, in percent")
+    batch_parser.add_argument("--strict", action="store_true", help="fail when a preset curve has problems, such as a falling output")
+    batch_parser.set_defaults(func=run_batch)
+
+    compare_parser = subparsers.add_parser("compare", help="compare LUTs or presets with a master curve")
+    compare_parser.add_argument("master", help="master .lut or preset .json file")
+    compare_parser.add_argument("references", nargs="+", help=".lut or preset .json files, or folders containing them")
+    compare_parser.add_argument("--lut-size", type=int, default=1000, help="number of LUT intervals used for presets (default: 1000)")
+    compare_parser.add_argument("--max-error", type=float, default=None, help="fail when the max absolute error exceeds this percentage")
+    compare_parser.set_defaults(func=run_compare)
+
+    fit_parser = subparsers.add_parser("fit", help="find the preset that reproduces existing LUTs")
+    fit_parser.add_argument("luts", nargs="+", help=".lut files, or folders containing them")
+    fit_parser.add_argument("--presets-dir", default=None, help="write one preset .json file per LUT in this folder")
+    fit_parser.add_argument("--exact", action="store_true", help="do not snap the values to the slider steps")
+    fit_parser.set_defaults(func=run_fit)
+
+    sweep_parser = subparsers.add_parser("sweep", help="generate the LUTs of a whole parameter grid into a compressed .npz file")
+    sweep_parser.add_argument("output", help="output .npz file")
+    sweep_parser.add_argument("--lut-size", type=int, default=1000, help="number of LUT intervals (default: 1000)")
+    sweep_parser.add_argument("--deadzone", type=float, nargs=3, default=[0.0, 30.0, 0.5], metavar=("START", "STOP", "STEP"), help="deadzone values (default: 0 30 0.5)")
+    sweep_parser.add_argument("--max-output", type=float, nargs=3, default=[50.0, 150.0, 0.5], metavar=("START", "STOP", "STEP"), help="max output values (default: 50 150 0.5)")
+    sweep_parser.add_argument("--power-boost", type=float, nargs=3, default=[0.0, 10.0, 0.5], metavar=("START", "STOP", "STEP"), help="power boost values (default: 0 10 0.5)")
+    sweep_parser.add_argument("--dtype", choices=["float32", "float64"], default="float32", help="stored output type (default: float32)")
+    sweep_parser.add_argument("--compress-level", type=int, default=1, choices=range(10), help="deflate level, 0 to store uncompressed (default: 1)")
+    sweep_parser.add_argument("--lut", type=float, nargs=3, action="append", metavar=("DEADZONE", "MAX_OUTPUT", "POWER_BOOST"), help="also write the .lut file of this grid point (repeatable)")
+    sweep_parser.add_argument("--lut-dir", default=None, help="folder of the --lut files (default: next to the output file)")
+    sweep_parser.set_defaults(func=run_sweep)
+
+    watch_parser = subparsers.add_parser("watch", help="regenerate the outputs of changed presets as they change")
+    watch_parser.add_argument("presets_dirs", nargs="+", help="folders containing the preset .json files (searched recursively)")
+    watch_parser.add_argument("--output-dir", required=True, help="folder where one sub-folder per preset is written")
+    watch_parser.add_argument("--lut-size", type=int, default=1000, help="number of LUT intervals (default: 1000)")
+    watch_parser.add_argument("--interval", type=float, default=1.0, help="polling interval in seconds when inotify is not used (default: 1)")
+    watch_parser.add_argument("--poll", action="store_true", help="poll the file modification times instead of using inotify")
+    watch_parser.add_argument("--once", action="store_true", help="sync once and exit")
+    watch_parser.set_defaults(func=run_watch)
+
+    presets_parser = subparsers.add_parser("presets", help="search the preset library")
+    presets_parser.add_argument("presets_dir", nargs="?", default="presets", help="folder containing the preset .json files (default: presets)")
+    presets_parser.add_argument("--db", default="PresetCatalog.db", help="catalog database (default: PresetCatalog.db)")
+    presets_parser.add_argument("--search", default=None, help="text contained in the preset name or folder")
+    presets_parser.add_argument("--folder", default=None, help="only the presets of this folder and its sub-folders")
+    presets_parser.add_argument("--where", action="append", default=[], help='parameter conditions, such as "deadzone >= 5, power boost > 0" (repeatable)')
+    presets_parser.add_argument("--near", type=float, nargs=3, metavar=("DEADZONE", "MAX_OUTPUT", "POWER_BOOST"), help="list the presets closest to these values instead")
+    presets_parser.add_argument("--limit", type=int, default=None, help="maximum number of presets listed")
+    presets_parser.set_defaults(func=run_presets)
+
+    convert_parser = subparsers.add_parser("convert", help="convert .lut files to the binary .lutb format, and .lutb files back to .lut")
+    convert_parser.add_argument("luts", nargs="+", help=".lut or .lutb files, or folders containing them")
+    convert_parser.add_argument("--output-dir", default=None, help="folder of the converted files, mirroring the input folders (default: next to each file)")
+    convert_parser.add_argument("--force", action="store_true", help="replace the existing output files")
+    convert_parser.add_argument("--dtype", choices=["float32", "float64"], default="float64", help="binary value type, float32 only if it keeps the text unchanged (default: float64)")
+    convert_parser.set_defaults(func=run_convert)
+
+    reduce_parser = subparsers.add_parser("reduce", help="simplify LUTs to the fewest points within a max interpolation error")
+    reduce_parser.add_argument("luts", nargs="+", help=".lut, .lutb or preset .json files, or folders containing them")
+    reduce_parser.add_argument("--output-dir", required=True, help="folder of the simplified .lut files, mirroring the input folders")
+    reduce_parser.add_argument("--max-error", type=float, default=0.05, help="max interpolation error against the full curve, in percent (default: 0.05)")
+    reduce_parser.add_argument("--lut-size", type=int, default=1000, help="number of LUT intervals used for presets (default: 1000)")
+    reduce_parser.set_defaults(func=run_reduce)
+
+    gallery_parser = subparsers.add_parser("gallery", help="render the chart of every preset to PNG or SVG images")
+    gallery_parser.add_argument("presets_dir", help="folder containing the preset .json files (searched recursively)")
+    gallery_parser.add_argument("output_dir", help="folder of the images, mirroring the presets tree")
+    gallery_parser.add_argument("--format", choices=["png", "svg"], default="png", help="image format (default: png)")
+    gallery_parser.add_argument("--lut-size", type=int, default=100, help="number of LUT intervals drawn, as in the app (default: 100)")
+    gallery_parser.add_argument("--dpi", type=float, default=None, help="image resolution (default: the app chart resolution)")
+    gallery_parser.add_argument("--no-title", action="store_true", help="do not write the preset name above the chart")
+    gallery_parser.add_argument("--jobs", type=int, default=None, help="number of worker processes (default: CPU count)")
+    gallery_parser.set_defaults(func=run_gallery)
+
+    deploy_parser = subparsers.add_parser("deploy", help="write a LUT and its ff_post_process.ini file to many game folders, skipping unchanged files")
+    deploy_parser.add_argument("lut", help=".lut, .lutb or preset .json file")
+    deploy_parser.add_argument("targets", nargs="+", help="game folders receiving the files")
+    deploy_parser.add_argument("--name", default=None, help="name of the deployed .lut file (default: the input name)")
+    deploy_parser.add_argument("--no-ini", action="store_true", help="do not write the ff_post_process.ini file")
+    deploy_parser.add_argument("--history", type=int, default=10, help="backups kept per replaced file, 0 to keep none (default: 10)")
+    deploy_parser.add_argument("--lut-size", type=int, default=1000, help="number of LUT intervals used for presets (default: 1000)")
+    deploy_parser.add_argument("--jobs", type=int, default=None, help="number of folders written at the same time (default: all)")
+    deploy_parser.set_defaults(func=run_deploy)
+
+    analyze_parser = subparsers.add_parser("analyze", help="check the clipping point, deadzone intercept, slopes and monotonicity of LUTs or presets")
+    analyze_parser.add_argument("luts", nargs="+", help=".lut, .lutb or preset .json files, or folders containing them")
+    analyze_parser.set_defaults(func=run_analyze)
+
+    replay_parser = subparsers.add_parser("replay", help="replay a recorded force feedback signal through LUTs and report the output load")
+    replay_parser.add_argument("signal", help="recorded signal, a .csv file or a raw binary sample file")
+    replay_parser.add_argument("luts", nargs="+", help=".lut, .lutb or preset .json files, or folders containing them")
+    replay_parser.add_argument("--column", default="0", help="CSV column of the force, an index or a header name (default: 0)")
+    replay_parser.add_argument("--delimiter", default=",", help="CSV delimiter (default: ,)")
+    replay_parser.add_argument("--dtype", choices=["float32", "float64", "int16"], default="float32", help="binary sample type (default: float32)")
+    replay_parser.add_argument("--channels", type=int, default=1, help="interleaved channels of the binary file (default: 1)")
+    replay_parser.add_argument("--channel", type=int, default=0, help="binary channel of the force (default: 0)")
+    replay_parser.add_argument("--scale", type=float, default=None, help="signal value of the full force (default: 1, 32767 for int16)")
+    replay_parser.add_argument("--sample-rate", type=float, default=1000.0, help="samples per second (default: 1000)")
+    replay_parser.add_argument("--lut-size", type=int, default=1000, help="number of LUT intervals used for presets (default: 1000)")
+    replay_parser.add_argument("--json", default=None, help="also write the full report, with the histograms, to this .json file")
+    replay_parser.set_defaults(func=run_replay)
+
+    serve_parser = subparsers.add_parser("serve", help="serve LUT generation, fitting, comparison and preset searches as a local HTTP/JSON service")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="listening address (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="listening port, 0 for any free port (default: 8765)")
+    serve_parser.add_argument("--presets-dir", default="presets", help="folder of the presets listed by /presets (default: presets)")
+    serve_parser.add_argument("--db", default="PresetCatalog.db", help="preset catalog database (default: PresetCatalog.db)")
+    serve_parser.add_argument("--cache-size", type=int, default=1024, help="responses kept in memory, 0 to disable the cache (default: 1024)")
+    serve_parser.add_argument("--jobs", type=int, default=None, help="worker threads computing the responses (default: Python's default)")
+    serve_parser.set_defaults(func=run_serve)
+
+    update_parser = subparsers.add_parser("update-check", help="print the latest released version")
+    update_parser.add_argument("--url", default=RELEASES_URL, help="releases API url")
+    update_parser.add_argument("--cache", default="UpdateCache.json", help="cache file (default: UpdateCache.json)")
+    update_parser.add_argument("--timeout", type=float, default=5.0, help="request timeout in seconds (default: 5)")
+    update_parser.add_argument("--offline", action="store_true", help="only use the cached answer")
+    update_parser.add_argument("--force", action="store_true", help="ignore the cache TTL and revalidate the cached answer")
+    update_parser.set_defaults(func=run_update_check)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        tracer.enable(args.trace)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Analyze LUT curves: clipping point, deadzone intercept, extrema, slopes and monotonicity.
+
+Generated LUTs are analyzed exactly from their formula, loaded LUTs from their points.
+"""
+import math
+
+import numpy as np
+
+from lut_compare import get_clipping_point
+
+# Drops smaller than this are rounding noise of the stored values, not a falling curve
+LUT_TOLERANCE = 1e-9
+# Outputs this close to 100% are at the limit, such as a max output of exactly 100%
+OUTPUT_TOLERANCE = 1e-9
+
+def get_coefficients(deadzone, max_output, power_boost):
+    """Get the coefficients (a, b, c) of the output, in percent, as a*u**2 + b*u + c of the input u (0 to 1).
+
+    The generateCustomLutArrays formula, before the limit at 100%, simplifies to
+    d + (s - d) * (u + g * (u**2 - u)) with g = -power_boost / 10, whatever the LUT size.
+    """
+    span = max_output - deadzone
+    g = -power_boost / 10
+    return span * g, span * (1 - g), float(deadzone)
+
+def _roots(a, b, c, value):
+    """Get the sorted inputs u in [0, 1] at which a*u**2 + b*u + c equals value."""
+    c = c - value
+    if a == 0:
+        roots = [-c / b] if b != 0 else []
+    else:
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return []
+        # Stable form of the quadratic roots, no cancellation when a is tiny
+        q = -0.5 * (b + math.copysign(math.sqrt(discriminant), b))
+        roots = [q / a, c / q] if q != 0 else [0.0]
+    # Rounding puts the roots of the endpoints, such as a max output of exactly 100%, just beside them
+    roots = [1.0 if abs(root - 1.0) <= OUTPUT_TOLERANCE else 0.0 if abs(root) <= OUTPUT_TOLERANCE else root for root in roots]
+    return sorted(root for root in roots if 0.0 <= root <= 1.0)
+
+def analyze_parameters(deadzone, max_output, power_boost):
+    """Analyze the LUT of a preset exactly, from its formula, without sampling it.
+
+    Return a dict of output fractions (0 to 1) with the "deadzone_intercept" (output just after
+    0), the "clipping_point" (first input at 100% output, None if it never clips), the
+    "max_output" and the first "peak_input" reaching it, the "min_slope" and "max_slope",
+    "monotonic" (whether the output never falls) and the "decreasing_range" (start and end inputs
+    of the fall, or None). Everything applies to the output limited at 100%, as written to the LUT.
+    """
+    a, b, c = get_coefficients(deadzone, max_output, power_boost)
+
+    def output(u):
+        return a * u * u + b * u + c
+
+    def slope(u):
+        return 2 * a * u + b
+
+    # The output is limited between the crossings of 100%, and the slope is linear in u
+    bounds = [0.0] + _roots(a, b, c, 100.0) + [1.0]
+    free = [(start, end) for start, end in zip(bounds, bounds[1:]) if output((start + end) / 2) < 100.0 - OUTPUT_TOLERANCE]
+    clipped = sum(end - start for start, end in free) < 1.0 - OUTPUT_TOLERANCE
+    slopes = [slope(u) for interval in free for u in interval] + ([0.0] if clipped else [])
+    if not free or free[0][0] > 0.0:
+        clipping_point = 0.0
+    elif free[0][1] < 1.0 or output(1.0) >= 100.0 - OUTPUT_TOLERANCE:
+        clipping_point = free[0][1]
+    else:
+        clipping_point = None
+
+    candidates = [0.0, 1.0]
+    if a != 0 and 0.0 < -b / (2 * a) < 1.0:
+        candidates.insert(1, -b / (2 * a))
+    peak = max(min(output(u), 100.0) for u in candidates)
+    peak_input = clipping_point if clipping_point is not None else next(u for u in candidates if output(u) >= peak)
+
+    # The falling part of the limited output, where the slope is negative below 100%
+    falling = []
+    for start, end in free:
+        if slope(start) < 0 or slope(end) < 0:
+            vertex = -b / (2 * a) if a != 0 else start
+            falling.append((start if slope(start) < 0 else max(start, vertex), end if slope(end) < 0 else min(end, vertex)))
+    falling = [(start, end) for start, end in falling if end - start > 1e-12]
+    decreasing_range = (falling[0][0], falling[-1][1]) if falling else None
+
+    return {
+        "deadzone_intercept": min(c, 100.0) * 0.01,
+        "clipping_point": clipping_point,
+        "max_output": peak * 0.01,
+        "peak_input": peak_input,
+        "min_slope": min(slopes) * 0.01 if slopes else 0.0,
+        "max_slope": max(slopes) * 0.01 if slopes else 0.0,
+        "monotonic": decreasing_range is None,
+        "decreasing_range": decreasing_range
+    }
+
+def get_deadzone_intercept(x, y):
+    """Get the output just after 0 of a LUT, extrapolated from its first points when it starts at 0|0 as saved."""
+    if len(x) == 0:
+        return 0.0
+    if x[0] == 0 and y[0] > 0:
+        return float(y[0])
+    positive = np.flatnonzero(x > 0)
+    if len(positive) == 0:
+        return 0.0
+    first = positive[0]
+    if len(positive) == 1 or x[positive[1]] == x[first]:
+        return float(y[first]) if x[0] > 0 else 0.0
+    second = positive[1]
+    intercept = y[first] - x[first] * (y[second] - y[first]) / (x[second] - x[first])
+    return float(round(min(max(intercept, 0.0), y[first]), 5))
+
+def analyze_lut(lut):
+    """Analyze the points of any LUT, with the same keys as analyze_parameters.
+
+    Every check runs on whole arrays. Vertical steps (repeated inputs) have no slope, and
+    "decreasing_range" spans every falling segment.
+    """
+    x = lut.x
+    y = lut.y
+    if len(x) == 0:
+        raise ValueError("The LUT has no points.")
+    deadzone_intercept = get_deadzone_intercept(x, y)
+    # The jump from 0|0 to the deadzone of saved LUTs is not part of the slope
+    start = 1 if x[0] == 0 and y[0] < deadzone_intercept else 0
+    dx = np.diff(x[start:])
+    dy = np.diff(y[start:])
+    slopes = dy[dx > 0] / dx[dx > 0]
+    falling = np.flatnonzero(dy < -LUT_TOLERANCE)
+    decreasing_range = (float(x[start + falling[0]]), float(x[start + falling[-1] + 1])) if falling.size else None
+    peak = int(np.argmax(y))
+
+    return {
+        "deadzone_intercept": deadzone_intercept,
+        "clipping_point": get_clipping_point(x, y),
+        "max_output": float(y[peak]),
+        "peak_input": float(x[peak]),
+        "min_slope": float(slopes.min()) if slopes.size else 0.0,
+        "max_slope": float(slopes.max()) if slopes.size else 0.0,
+        "monotonic": not falling.size,
+        "decreasing_range": decreasing_range
+    }
+
+def find_problems(analysis):
+    """Get the problems of an analyzed curve, as messages, an empty list if it is fine."""
+    problems = []
+    if not analysis["monotonic"]:
+        start, end = analysis["decreasing_range"]
+        problems.append(f"the output falls between {start * 100:.1f}% and {end * 100:.1f}% input")
+    if analysis["max_slope"] <= 0:
+        problems.append("the output never rises, the max output is not above the deadzone")
+    if analysis["deadzone_intercept"] >= 1.0:
+        problems.append("the deadzone reaches 100% output")
+    return problems
+
+def validate_preset(preset):
+    """Get the problems of the LUT of a preset dict, see find_problems."""
+    return find_problems(analyze_parameters(preset["deadzone"], preset["max_output"], preset["power_boost"]))
+
+def format_analysis(name, analysis):
+    """Get a one line summary of an analysis."""
+    # Reaching 100% output only at full input loses nothing
+    clipping_point = analysis["clipping_point"]
+    clipping = f"clips at {clipping_point * 100:.2f}%" if clipping_point is not None and clipping_point < 1.0 - OUTPUT_TOLERANCE else "no clipping"
+    problems = find_problems(analysis)
+    return (f"{name}: deadzone intercept {analysis['deadzone_intercept'] * 100:.2f}%, {clipping}, "
+            f"max output {analysis['max_output'] * 100:.2f}% at {analysis['peak_input'] * 100:.1f}%, "
+            f"slope {analysis['min_slope']:.3f} to {analysis['max_slope']:.3f}, "
+            + ("; ".join(problems) if problems else "monotonic"))
@@ -0,0 +1,106 @@
+"""Generate .lut and ff_post_process.ini files for a whole tree of presets without the GUI."""
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from lut_analysis import validate_preset
+from lut_core import format_ff_post_process_ini, generateCustomLut, read_preset
+from lut_io import write_lut
+from lut_reduce import reduce_lut
+from tracing import tracer
+
+def find_presets(presets_dir):
+    """Get the sorted list of preset files found in a directory tree."""
+    preset_paths = []
+    for folder, _, file_names in os.walk(presets_dir):
+        for file_name in file_names:
+            if file_name.lower().endswith(".json"):
+                preset_paths.append(os.path.join(folder, file_name))
+    return sorted(preset_paths)
+
+def find_preset_stats(presets_dir):
+    """Get the stat result of every preset file found in a directory tree, keyed by path."""
+    stats = {}
+    pending = [presets_dir]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                elif entry.name.lower().endswith(".json"):
+                    stats[os.path.abspath(entry.path)] = entry.stat()
+    return stats
+
+def get_output_folder(preset_path, presets_dir, output_dir):
+    """Get the output folder of a preset, mirroring its position in the presets tree."""
+    relative_path = os.path.relpath(preset_path, presets_dir)
+    return os.path.join(output_dir, os.path.splitext(relative_path)[0])
+
+def write_preset_outputs(preset_path, output_folder, lut_size=1000, max_error=None):
+    """Write the .lut file and the ff_post_process.ini file of a preset, returning the bytes written,
+    the number of LUT points written and the problems of its curve (see lut_analysis.validate_preset).
+
+    With max_error, the LUT is simplified within that interpolation error (output units, 0 to 1).
+    """
+    preset = read_preset(preset_path)
+    problems = validate_preset(preset)
+    lut = generateCustomLut(lut_size, preset["deadzone"], preset["max_output"], preset["power_boost"])
+    if max_error is not None:
+        lut = reduce_lut(lut, max_error)["lut"]
+    lut_name = os.path.splitext(os.path.basename(preset_path))[0] + ".lut"
+    ini_content = format_ff_post_process_ini(lut_name)
+
+    os.makedirs(output_folder, exist_ok=True)
+    lut_path = os.path.join(output_folder, lut_name)
+    ini_path = os.path.join(output_folder, "ff_post_process.ini")
+    write_lut(lut_path, lut)
+    with open(ini_path, "w") as file:
+        file.write(ini_content)
+    return os.path.getsize(lut_path) + os.path.getsize(ini_path), len(lut), problems
+
+def _process_preset(task):
+    """Process a single preset inside a worker, reporting errors instead of raising them."""
+    preset_path, output_folder, lut_size, max_error = task
+    try:
+        return (preset_path,) + write_preset_outputs(preset_path, output_folder, lut_size, max_error) + (None,)
+    except Exception as e:
+        return preset_path, 0, 0, [], str(e)
+
+def generate_presets(presets_dir, output_dir, lut_size=1000, jobs=None, max_error=None):
+    """Generate the outputs of every preset in presets_dir, spreading the work across processes."""
+    preset_paths = find_presets(presets_dir)
+    tasks = [(preset_path, get_output_folder(preset_path, presets_dir, output_dir), lut_size, max_error) for preset_path in preset_paths]
+    jobs = jobs or os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+
+    start_time = time.perf_counter()
+    if jobs == 1:
+        results = [_process_preset(task) for task in tasks]
+    else:
+        chunk_size = max(1, len(tasks) // (jobs * 4))
+        initializer, initargs = tracer.get_worker_initializer()
+        with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as executor:
+            results = list(executor.map(_process_preset, tasks, chunksize=chunk_size))
+    elapsed = time.perf_counter() - start_time
+
+    errors = [(preset_path, error) for preset_path, _, _, _, error in results if error]
+    return {
+        "presets": len(results),
+        "generated": len(results) - len(errors),
+        "errors": errors,
+        "problems": [(preset_path, problem) for preset_path, _, _, problems, _ in results for problem in problems],
+        "bytes_written": sum(size for _, size, _, _, _ in results),
+        "points": sum(points for _, _, points, _, _ in results),
+        "elapsed": elapsed,
+        "jobs": jobs
+    }
+
+def format_summary(summary):
+    """Get a human readable throughput summary of a batch run."""
+    elapsed = max(summary["elapsed"], 1e-9)
+    return (f"Generated {summary['generated']} of {summary['presets']} presets "
+            f"in {summary['elapsed']:.3f} s using {summary['jobs']} worker(s): "
+            f"{summary['generated'] / elapsed:.1f} presets/s, "
+            f"{summary['points'] / elapsed:,.0f} points/s, "
+            f"{summary['bytes_written'] / elapsed / 1e6:.2f} MB/s written")
@@ -0,0 +1,96 @@
+"""Binary LUT container: a 32 byte header followed by the x and y arrays, loadable without copy."""
+import os
+import struct
+
+import numpy as np
+
+from lut_core import Lut, round_half_even
+from tracing import traced
+
+MAGIC = b"FFMLUTB\x00"
+VERSION = 1
+# magic, version, item size (4 or 8), reserved, number of points, padding to keep the arrays aligned
+HEADER = struct.Struct("<8sHHIQ8x")
+BINARY_EXTENSION = ".lutb"
+
+class BinaryLutError(ValueError):
+    """Raised when a binary LUT file is malformed."""
+
+def is_binary_lut(file_path):
+    """Check whether a file starts with the binary LUT header."""
+    with open(file_path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+def check_float32(lut):
+    """Check that storing the LUT as float32 does not change its .lut text."""
+    x32 = lut.x.astype(np.float32).astype(np.float64)
+    y32 = lut.y.astype(np.float32).astype(np.float64)
+    # The text holds x with 3 decimals and y with 5, formatted like round() rounds
+    return (np.array_equal(round_half_even(x32, 3), round_half_even(lut.x, 3))
+            and np.array_equal(round_half_even(y32, 5), round_half_even(lut.y, 5)))
+
+def pack_lut_binary(lut, dtype=np.float64):
+    """Get the content of the binary file of a LUT, as float64 or, when it does not change its text, float32."""
+    dtype = np.dtype(dtype)
+    if dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError(f"Unsupported binary LUT type: {dtype}")
+    if dtype == np.float32 and not check_float32(lut):
+        raise ValueError("The LUT values need float64 to be stored without changing the .lut text.")
+    return b"".join((HEADER.pack(MAGIC, VERSION, dtype.itemsize, 0, len(lut)),
+                     lut.x.astype(dtype.newbyteorder("<"), copy=False).tobytes(),
+                     lut.y.astype(dtype.newbyteorder("<"), copy=False).tobytes()))
+
+@traced
+def write_lut_binary(file_path, lut, dtype=np.float64):
+    """Write a LUT to a binary file, see pack_lut_binary."""
+    data = pack_lut_binary(lut, dtype)
+    with open(file_path, "wb") as file:
+        file.write(data)
+
+def _read_header(header, source, size):
+    """Check a binary LUT header against the total size, returning the value type and the number of points."""
+    if len(header) < HEADER.size:
+        raise BinaryLutError(f"Invalid binary LUT {source}: truncated header")
+    magic, version, item_size, _, count = HEADER.unpack(header[:HEADER.size])
+    if magic != MAGIC:
+        raise BinaryLutError(f"Invalid binary LUT {source}: bad magic number")
+    if version != VERSION:
+        raise BinaryLutError(f"Invalid binary LUT {source}: unsupported version {version}")
+    if item_size not in (4, 8):
+        raise BinaryLutError(f"Invalid binary LUT {source}: unsupported item size {item_size}")
+    expected_size = HEADER.size + 2 * count * item_size
+    if size != expected_size:
+        raise BinaryLutError(f"Invalid binary LUT {source}: expected {expected_size} bytes for {count} points")
+    return np.dtype(f"<f{item_size}"), count
+
+def _check_order(x, source):
+    if np.any(x[1:] < x[:-1]):
+        raise BinaryLutError(f"Invalid binary LUT {source}: x values are decreasing")
+
+@traced
+def read_lut_binary(file_path, use_mmap=True):
+    """Read a binary LUT file into a Lut.
+
+    With use_mmap, float64 files are mapped and used in place, read-only, without any copy.
+    """
+    with open(file_path, "rb") as file:
+        header = file.read(HEADER.size)
+    dtype, count = _read_header(header, file_path, os.path.getsize(file_path))
+    if count == 0:
+        return Lut(np.empty(0), np.empty(0))
+    if use_mmap:
+        arrays = np.memmap(file_path, dtype=dtype, mode="r", offset=HEADER.size, shape=(2, count))
+    else:
+        arrays = np.fromfile(file_path, dtype=dtype, offset=HEADER.size).reshape(2, count)
+    x, y = arrays
+    _check_order(x, file_path)
+    return Lut(x, y)
+
+def parse_lut_binary(data, source="<bytes>"):
+    """Read a Lut from the content of a binary LUT file, such as a request body."""
+    dtype, count = _read_header(data, source, len(data))
+    if count == 0:
+        return Lut(np.empty(0), np.empty(0))
+    x, y = np.frombuffer(data, dtype=dtype, offset=HEADER.size).reshape(2, count)
+    _check_order(x, source)
+    return Lut(x, y)
@@ -0,0 +1,321 @@
+"""LUT chart drawn once and then updated in place, redrawing only the artists that change.
+
+matplotlib is imported only when a chart is built, so the chart constants are cheap to import.
+"""
+import numpy as np
+
+from lut_analysis import analyze_lut
+from tracing import traced, tracer
+
+CHART_SIZE = (6, 4)
+CHART_DPI = 100
+PERCENT_TICKS = np.linspace(0, 1, 11)
+OVERLAY_COLORMAP = "viridis"
+OVERLAY_PICK_RADIUS = 5.0
+
+def downsample_minmax(x, y, buckets):
+    """Get the indices of the points to draw so that the curve looks the same at the given width.
+
+    In each of the buckets splitting the x range, only the first, last, lowest and highest points
+    are kept, which preserves the shape of the curve down to one pixel column per bucket.
+    """
+    count = len(x)
+    if count <= 4 or x[-1] <= x[0]:
+        return np.arange(count)
+    bucket = np.minimum(((x - x[0]) / (x[-1] - x[0]) * buckets).astype(np.intp), buckets - 1)
+    starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+    ends = np.append(starts[1:], count) - 1
+    # Within each bucket, sort the indices by y to find the lowest and highest points
+    order = np.lexsort((y, bucket))
+    return np.unique(np.concatenate((starts, ends, order[starts], order[ends])))
+
+class Overlay:
+    """A comparison curve of the overlay collection."""
+
+    __slots__ = ("name", "index", "color", "visible", "segment")
+
+    def __init__(self, name, index, color):
+        self.name = name
+        self.index = index
+        self.color = color
+        self.visible = True
+        self.segment = None
+
+class CurveIndex:
+    """Sorted x index of a plotted curve, used to find the sample under the cursor in O(log n)."""
+
+    __slots__ = ("line", "x", "y", "__weakref__")
+
+    def __init__(self, line, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if x.size > 1 and np.any(x[1:] < x[:-1]):
+            order = np.argsort(x, kind="stable")
+            x = x[order]
+            y = y[order]
+        self.line = line
+        self.x = x
+        self.y = y
+
+    def hit(self, transform, xdata, position, radius):
+        """Get the pixel distance from the curve and the nearest sample index, or None if farther than radius."""
+        count = self.x.size
+        if count == 0:
+            return None
+        i = int(np.searchsorted(self.x, xdata))
+        # Only the segments around the insertion point can be the closest ones
+        start = max(i - 2, 0)
+        stop = min(i + 2, count)
+        points = transform.transform(np.column_stack((self.x[start:stop], self.y[start:stop])))
+        if len(points) == 1:
+            distance = np.hypot(*(points[0] - position))
+        else:
+            a = points[:-1]
+            ab = points[1:] - a
+            length = np.einsum("ij,ij->i", ab, ab)
+            t = np.clip(np.einsum("ij,ij->i", position - a, ab) / np.where(length > 0, length, 1.0), 0.0, 1.0)
+            distance = np.hypot(*(a + t[:, None] * ab - position).T).min()
+        if distance > radius:
+            return None
+        if i == count or (i > 0 and xdata - self.x[i - 1] <= self.x[i] - xdata):
+            i -= 1
+        return distance, i
+
+class LutChart:
+    """Draw the LUT curves and markers on a matplotlib axes using blitting."""
+
+    def __init__(self, figure, ax, use_blit=None):
+        self.figure = figure
+        self.ax = ax
+        self.canvas = figure.canvas
+        # Blitting draws the changing artists outside of canvas.draw(), so images saved with savefig need it off
+        self.use_blit = self.canvas.supports_blit if use_blit is None else use_blit
+        self.background = None
+        self.scene = None
+        self.legend_state = None
+        self.curves = {}
+        self.overlays = []
+        self.build()
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.mpl_connect("resize_event", lambda event: self.update_overlay_segments())
+
+    def build(self):
+        """Create the static scene and the artists updated on every change."""
+        from matplotlib.collections import LineCollection
+
+        ax = self.ax
+        ax.clear()
+        animated = self.use_blit
+
+        # Add default lut line
+        ax.plot([0, 100], [0, 100], color='gray', linewidth=0.5, dashes=(2, 2))
+
+        self.current_line, = ax.plot([], [], label='Current LUT', color='blue', linewidth=2, animated=animated)
+        self.compare_line, = ax.plot([], [], label='Comparison LUT', color='orange', linewidth=2, animated=animated)
+        self.max_output_line = ax.axhline(1.0, color='forestgreen', linestyle='--', label='Max Output Force', animated=animated)
+        self.clipping_line = ax.axvline(1.0, color='red', linestyle='--', label='Clipping', animated=animated)
+        self.deadzone_line = ax.axhline(0.0, color='dimgrey', linestyle='--', label='Deadzone', animated=animated)
+        self.optional_artists = [self.compare_line, self.max_output_line, self.clipping_line, self.deadzone_line]
+
+        # Every overlay curve is drawn by one collection, part of the static background
+        self.overlay_collection = LineCollection([], linewidths=1, alpha=0.6, label='Overlay LUTs')
+        ax.add_collection(self.overlay_collection, autolim=False)
+        self.highlight_line, = ax.plot([], [], color='crimson', linewidth=2.5, animated=animated, visible=False)
+
+        ax.set_ylim(0, 1)
+        ax.set_xlim(0, 1)
+        ax.set_xlabel('Input (%)')
+        ax.set_ylabel('Output (%)')
+        ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+        ax.set_xticks(PERCENT_TICKS)
+        ax.set_yticks(PERCENT_TICKS)
+        ax.set_xticklabels([f'{int(i*100)}%' for i in PERCENT_TICKS])
+        ax.set_yticklabels([f'{int(i*100)}%' for i in PERCENT_TICKS])
+
+        # Create tooltip
+        self.tooltip = ax.annotate("", xy=(0,0), xytext=(-20,20),
+                                   textcoords="offset points",
+                                   bbox=dict(boxstyle="round", fc="w"),
+                                   arrowprops=dict(arrowstyle="->"),
+                                   animated=animated)
+        self.tooltip.set_visible(False)
+
+        self.dynamic_artists = [self.current_line] + self.optional_artists
+        self.hover_artists = [self.highlight_line, self.tooltip]
+        self.legend_state = None
+
+    def update(self, lut, max_output, deadzone, compare_lut=None, stats=None):
+        """Update the curves and markers for the given LUT, optionally comparing with another LUT.
+
+        stats are the LUT statistics from lut_analysis, computed from its points when not given.
+        """
+        if self.set_lut(lut, max_output, deadzone, compare_lut, stats):
+            self.redraw()
+        else:
+            self.blit()
+
+    def set_lut(self, lut, max_output, deadzone, compare_lut=None, stats=None):
+        """Set the curves and markers without drawing them, returning whether the legend needs an update."""
+        self.set_curve(self.current_line, lut.x, lut.y)
+        if compare_lut is not None:
+            self.set_curve(self.compare_line, compare_lut.x, compare_lut.y)
+        else:
+            self.curves.pop(self.compare_line, None)
+
+        if stats is None:
+            stats = analyze_lut(lut)
+        max_y = stats["max_output"]
+        self.max_output_line.set_ydata([max_y, max_y])
+        # The clipping line is hidden when the LUT does not clip
+        clipping_point = stats["clipping_point"] if stats["clipping_point"] is not None else 1.0
+        self.clipping_line.set_xdata([clipping_point, clipping_point])
+        intersection_y = stats["deadzone_intercept"]
+        self.deadzone_line.set_ydata([intersection_y, intersection_y])
+
+        legend_state = (compare_lut is not None, max_output < 100.0, max_output > 100.0, deadzone > 0.0)
+        for artist, visible in zip(self.optional_artists, legend_state):
+            artist.set_visible(visible)
+
+        if legend_state == self.legend_state:
+            return False
+        self.legend_state = legend_state
+        return True
+
+    def redraw(self):
+        """Redraw everything, including the static background holding the legend and the overlay curves."""
+        self.update_legend()
+        with tracer.span("canvas.draw"):
+            self.canvas.draw()
+
+    def update_legend(self):
+        handles = [self.current_line] + [artist for artist in self.optional_artists if artist.get_visible()]
+        if any(overlay.visible for overlay in self.overlays):
+            # Finding the best place among thousands of overlay points is slow, the curves rarely cross the lower right
+            handles.append(self.overlay_collection)
+            self.ax.legend(handles=handles, loc="lower right")
+        else:
+            self.ax.legend(handles=handles)
+
+    def set_overlays(self, named_luts):
+        """Overlay many comparison LUTs, given as (name, lut) pairs, all visible."""
+        import matplotlib
+
+        colormap = matplotlib.colormaps[OVERLAY_COLORMAP]
+        count = len(named_luts)
+        self.overlays = [Overlay(name, CurveIndex(None, lut.x, lut.y), colormap(i / max(count - 1, 1)))
+                         for i, (name, lut) in enumerate(named_luts)]
+        self.highlight_line.set_visible(False)
+        self.update_overlay_segments()
+        self.redraw()
+
+    def set_overlay_visibility(self, visible):
+        """Show only the overlay curves whose flag is set in visible."""
+        for overlay, overlay_visible in zip(self.overlays, visible):
+            overlay.visible = bool(overlay_visible)
+        self.highlight_line.set_visible(False)
+        self.update_overlay_segments()
+        self.redraw()
+
+    @traced
+    def update_overlay_segments(self):
+        """Set the downsampled visible overlay curves, at about one point per pixel column and extreme."""
+        buckets = max(int(self.ax.bbox.width), 1)
+        segments = []
+        colors = []
+        for overlay in self.overlays:
+            if overlay.visible:
+                x = overlay.index.x
+                y = overlay.index.y
+                kept = downsample_minmax(x, y, buckets)
+                overlay.segment = np.column_stack((x[kept], y[kept]))
+                segments.append(overlay.segment)
+                colors.append(overlay.color)
+        self.overlay_collection.set_segments(segments)
+        self.overlay_collection.set_color(colors)
+
+    def set_curve(self, line, x, y):
+        """Set the data of a curve line and index it for the tooltip."""
+        line.set_data(x, y)
+        self.curves[line] = CurveIndex(line, x, y)
+
+    def find_nearest(self, event):
+        """Get the curve passing closest to the cursor and its nearest sample index, or None.
+
+        The curve is a CurveIndex for the main curves, or an Overlay for the overlay curves.
+        """
+        nearest = None
+        if event.inaxes == self.ax and event.xdata is not None:
+            position = np.array([event.x, event.y], dtype=np.float64)
+            # Resolve the data to pixel transform once for all the curves
+            transform = self.ax.transData.frozen()
+            candidates = [(curve, curve, curve.line.get_pickradius()) for curve in self.curves.values() if curve.line.get_visible()]
+            candidates += [(overlay, overlay.index, OVERLAY_PICK_RADIUS) for overlay in self.overlays if overlay.visible]
+            for curve, index, radius in candidates:
+                hit = index.hit(transform, event.xdata, position, radius)
+                if hit is not None and (nearest is None or hit[0] < nearest[0]):
+                    nearest = (hit[0], curve, hit[1])
+        return nearest[1:] if nearest else None
+
+    def hover(self, event):
+        """Show a tooltip with the curve sample nearest to the cursor, highlighting overlay curves."""
+        nearest = self.find_nearest(event)
+        if nearest is not None:
+            curve, i = nearest
+            if isinstance(curve, Overlay):
+                self.tooltip.set_text(f"{curve.name}\n{curve.index.x[i]:.3f}|{curve.index.y[i]:.3f}")
+                self.highlight_line.set_data(curve.segment[:, 0], curve.segment[:, 1])
+                self.highlight_line.set_visible(True)
+            else:
+                self.tooltip.set_text(f"{curve.x[i]:.3f}|{curve.y[i]:.3f}")
+                self.highlight_line.set_visible(False)
+            self.tooltip.xy = (event.xdata, event.ydata)
+            self.tooltip.set_visible(True)
+        elif self.tooltip.get_visible():
+            self.tooltip.set_visible(False)
+            self.highlight_line.set_visible(False)
+        else:
+            return False
+        self.blit_tooltip()
+        return nearest is not None
+
+    def on_draw(self, event):
+        """Capture the static background after a full redraw and draw the dynamic artists over it."""
+        if not self.use_blit:
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_dynamic_artists()
+
+    def draw_dynamic_artists(self):
+        """Draw the curves and markers, keep a copy of the scene and draw the tooltip over it."""
+        for artist in self.dynamic_artists:
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+        self.scene = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_hover_artists()
+
+    def draw_hover_artists(self):
+        for artist in self.hover_artists:
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+
+    @traced
+    def blit(self):
+        """Redraw only the dynamic artists over the saved background."""
+        if not self.use_blit:
+            self.canvas.draw_idle()
+            return
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_dynamic_artists()
+        self.canvas.blit(self.figure.bbox)
+
+    def blit_tooltip(self):
+        """Redraw only the tooltip and the highlighted curve over the saved scene."""
+        if not self.use_blit or self.scene is None:
+            self.blit()
+            return
+        self.canvas.restore_region(self.scene)
+        self.draw_hover_artists()
+        self.canvas.blit(self.figure.bbox)
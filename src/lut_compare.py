@@ -0,0 +1,59 @@
+"""Compare LUTs on a common grid and measure how much they differ."""
+import numpy as np
+
+from lut_core import Lut
+
+def resample(lut, x):
+    """Get the output values of a LUT at the given inputs, interpolating linearly between its points."""
+    return np.interp(x, lut.x, lut.y)
+
+def get_clipping_point(x, y):
+    """Get the first input at which the output reaches 100%, or None if it never clips."""
+    clipped = np.flatnonzero(y >= 1.0)
+    return float(x[clipped[0]]) if clipped.size else None
+
+def compare_luts(lut, references):
+    """Compare one or many reference LUTs with a LUT, resampling them on its grid in one step each.
+
+    Return a dict with the common grid "x", the LUT values "y", the resampled reference values
+    "reference_y" and the "deltas" (reference - LUT), one row per reference, and a list of "metrics".
+    """
+    if isinstance(references, Lut):
+        references = [references]
+    x = lut.x
+    y = lut.y
+    reference_y = np.empty((len(references), len(x)))
+    for row, reference in enumerate(references):
+        reference_y[row] = resample(reference, x)
+    deltas = reference_y - y
+
+    abs_deltas = np.abs(deltas)
+    # Trapezoidal integration of |delta|, in output units times input units
+    areas = ((abs_deltas[:, 1:] + abs_deltas[:, :-1]) * 0.5 * np.diff(x)).sum(axis=1)
+    max_output = y.max()
+    clipping_point = get_clipping_point(x, y)
+
+    metrics = []
+    for row in range(len(references)):
+        reference_clipping_point = get_clipping_point(x, reference_y[row])
+        worst = int(abs_deltas[row].argmax())
+        metrics.append({
+            "max_abs_error": float(abs_deltas[row, worst]),
+            "max_abs_error_at": float(x[worst]),
+            "rms_error": float(np.sqrt(np.mean(deltas[row] ** 2))),
+            "area_between_curves": float(areas[row]),
+            "max_output_difference": float(reference_y[row].max() - max_output),
+            "clipping_point": clipping_point,
+            "reference_clipping_point": reference_clipping_point,
+            "clipping_difference": None if clipping_point is None or reference_clipping_point is None else reference_clipping_point - clipping_point
+        })
+    return {"x": x, "y": y, "reference_y": reference_y, "deltas": deltas, "metrics": metrics}
+
+def format_metrics(name, metrics):
+    """Get a one line summary of the comparison metrics of a reference LUT."""
+    def clipping(value):
+        return "none" if value is None else f"{value * 100:.1f}%"
+    return (f"{name}: max error {metrics['max_abs_error'] * 100:.3f}% at {metrics['max_abs_error_at'] * 100:.1f}%, "
+            f"RMS {metrics['rms_error'] * 100:.3f}%, area {metrics['area_between_curves']:.5f}, "
+            f"max output {metrics['max_output_difference'] * 100:+.2f}%, "
+            f"clipping {clipping(metrics['clipping_point'])} -> {clipping(metrics['reference_clipping_point'])}")
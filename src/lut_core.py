@@ -0,0 +1,198 @@
+"""LUT math, formatting and preset I/O shared by the GUI and the headless tools."""
+import json
+
+from collections import OrderedDict
+
+import numpy as np
+
+from tracing import traced
+
+# Ranges of the deadzone, max output and power boost sliders, shared by the GUI and the headless tools
+DEADZONE_RANGE = (0.0, 30.0)
+MAX_OUTPUT_RANGE = (50.0, 150.0)
+POWER_BOOST_RANGE = (0.0, 10.0)
+
+class Lut:
+    """Define a LUT object (or lookup table) backed by two contiguous float arrays."""
+
+    __slots__ = ("_x", "_y", "_size")
+
+    def __init__(self, x=None, y=None):
+        if x is None:
+            self._x = np.empty(16)
+            self._y = np.empty(16)
+            self._size = 0
+        else:
+            self._x = np.ascontiguousarray(x, dtype=np.float64)
+            self._y = np.ascontiguousarray(y, dtype=np.float64)
+            if self._x.shape != self._y.shape or self._x.ndim != 1:
+                raise ValueError("LUT x and y arrays must be one-dimensional and of the same length.")
+            self._size = len(self._x)
+
+    @property
+    def x(self):
+        """Get the input values of the LUT."""
+        return self._x[:self._size]
+
+    @property
+    def y(self):
+        """Get the output values of the LUT."""
+        return self._y[:self._size]
+
+    @property
+    def points(self):
+        """Get the LUT as a list of (x, y) tuples."""
+        return list(zip(self.x.tolist(), self.y.tolist()))
+
+    @classmethod
+    def from_file(cls, file_path):
+        """Read a LUT from a .lut file or a binary LUT file."""
+        from lut_io import read_lut
+        return read_lut(file_path)
+
+    def __len__(self):
+        return self._size
+
+    def copy(self):
+        """Get a modifiable copy of the LUT."""
+        return Lut(self.x.copy(), self.y.copy())
+
+    def addPoint(self, x, y):
+        """Add a point to the LUT."""
+        # Growing would reallocate the arrays and hide the change from the other holders of a shared LUT
+        if not self._x.flags.writeable:
+            raise ValueError("The LUT is read-only, such as a cached or memory-mapped LUT, add points to a copy() of it.")
+        if self._size == len(self._x):
+            capacity = max(16, 2 * self._size)
+            self._x = np.resize(self._x, capacity)
+            self._y = np.resize(self._y, capacity)
+        self._x[self._size] = x
+        self._y[self._size] = y
+        self._size += 1
+
+    def __str__(self):
+        """Get the LUT in the "x|y" text format."""
+        return "\n".join(map("{:.3f}|{:.5f}".format, self.x.tolist(), self.y.tolist()))
+
+def round_half_even(values, decimals):
+    """Round an array exactly like the built-in round() does on each float."""
+    rounded = np.round(values, decimals)
+    # np.round scales before rounding, so values sitting on a decimal tie may go the other way
+    scaled = values * 10.0 ** decimals
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(value, decimals) for value in values[ties].tolist()]
+    return rounded
+
+@traced
+def generateCustomLutArrays(lutSize, deadZone, gain, power_boost):
+    """Generate the x and y arrays of a custom LUT in a single vectorized pass.
+
+    The parameters may also be arrays of shape (n, 1), giving one row of y per parameter set.
+    """
+    l = lutSize
+    d = deadZone
+    s = gain
+    g = -power_boost/10
+    x = np.arange(l + 1, dtype=np.float64)
+    # This was the hardest part of all the application by far. So many time to get to this formula.
+    y = x + (d * ((l - x) / l)) - (l - s) * (x / l) + (((((l / 2) - x) ** 2) / l) - (l / 4)) * ((g * 100) / l) * ((s / 100) - (d / 100))
+    y = np.minimum(y, 100) # limit lut value
+    return round_half_even(x / l, 3), round_half_even(y * 0.01, 5)
+
+def generateCustomLut(lutSize, deadZone, gain, power_boost):
+    """Generate a custom LUT using the given parameters."""
+    return Lut(*generateCustomLutArrays(lutSize, deadZone, gain, power_boost))
+
+def snap_value(value, increment=0.5):
+    """Snap a value to the nearest slider increment when it only differs by floating point noise."""
+    snapped = round(value / increment) * increment
+    return snapped if abs(snapped - value) < 1e-9 else value
+
+class LutCache:
+    """Keep the most recently generated LUTs, keyed on their size and slider values."""
+
+    def __init__(self, maxsize=256, increment=0.5):
+        self.maxsize = maxsize
+        self.increment = increment
+        self.hits = 0
+        self.misses = 0
+        self._luts = OrderedDict()
+
+    def __len__(self):
+        return len(self._luts)
+
+    def get(self, lut_size, deadzone, max_output, power_boost):
+        """Get the LUT for the given parameters, generating it only on a cache miss."""
+        key = (lut_size,) + tuple(snap_value(float(value), self.increment) for value in (deadzone, max_output, power_boost))
+        lut = self._luts.get(key)
+        if lut is not None:
+            self._luts.move_to_end(key)
+            self.hits += 1
+            return lut
+        self.misses += 1
+        x, y = generateCustomLutArrays(*key)
+        # cached LUTs are shared between callers, so they must not be modified in place
+        x.setflags(write=False)
+        y.setflags(write=False)
+        lut = Lut(x, y)
+        self._luts[key] = lut
+        if len(self._luts) > self.maxsize:
+            self._luts.popitem(last=False)
+        return lut
+
+    def clear(self):
+        """Remove all the cached LUTs and reset the counters."""
+        self._luts.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Get the cache statistics."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._luts), "maxsize": self.maxsize}
+
+def limit_value(value, min, max):
+    """Force a value to be between min and max."""
+    if value < min:
+        return min
+    elif value > max:
+        return max
+    return value
+
+def format_lut_file(lut):
+    """Get the content of a .lut file for the given LUT, as written by Save LUT."""
+    lut_content = ["0.000|0.00000"]  # First value
+    non_zero = lut.x != 0.000
+    lut_content.append(str(Lut(lut.x[non_zero], lut.y[non_zero])))
+    return "\n".join(lut_content)
+
+def format_ff_post_process_ini(lut_name):
+    """Get the content of the ff_post_process.ini file pointing to the given LUT."""
+    return f"""[HEADER]
+VERSION=1
+TYPE=LUT
+ENABLED=1
+
+[GAMMA]
+VALUE=1
+
+[LUT]
+CURVE={lut_name}
+"""
+
+@traced
+def read_preset(file_path):
+    """Read a preset file and return its deadzone, max_output and power_boost values."""
+    with open(file_path, "r") as file:
+        preset = json.load(file)
+    return {
+        "deadzone": float(preset["deadzone"]),
+        "max_output": float(preset["max_output"]),
+        "power_boost": float(preset["power_boost"])
+    }
+
+@traced
+def write_preset(file_path, preset):
+    """Write the deadzone, max_output and power_boost values of a preset file."""
+    with open(file_path, "w") as file:
+        json.dump({key: preset[key] for key in ("deadzone", "max_output", "power_boost")}, file)
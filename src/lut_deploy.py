@@ -0,0 +1,188 @@
+"""Deploy a LUT and its ff_post_process.ini file to many game folders at once, safely.
+
+Every file is replaced atomically, files whose content is unchanged are not rewritten, and each
+replaced file is first kept in a history of backups inside the target folder. The first version
+replaced, usually the one installed with the game, is kept permanently.
+"""
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from lut_core import format_ff_post_process_ini
+
+INI_NAME = "ff_post_process.ini"
+BACKUP_FOLDER = "ffm_backups"
+BACKUP_HISTORY = 10
+# A game reading the file may briefly lock it on Windows, the replace is retried meanwhile
+REPLACE_ATTEMPTS = 5
+REPLACE_RETRY_DELAY = 0.1
+ORIGINAL_BACKUP = "original"
+
+def _get_umask():
+    # Reading the umask sets it, this is done once before any deploy thread runs
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Mode of the new files, as open() would create them
+NEW_FILE_MODE = 0o666 & ~_get_umask()
+
+def encode_text(text):
+    """Get the bytes of a text file as written in text mode, with the platform line endings."""
+    return text.replace("\n", os.linesep).encode("utf-8")
+
+def get_deploy_files(lut_name, lut_text, ini=True):
+    """Get the (file name, bytes) pairs to deploy for a LUT, the LUT first so the INI never points to a missing file."""
+    files = [(lut_name, encode_text(lut_text))]
+    if ini:
+        files.append((INI_NAME, encode_text(format_ff_post_process_ini(lut_name))))
+    return files
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def file_hash(file_path):
+    """Get the content hash of a file, or None if it does not exist."""
+    try:
+        with open(file_path, "rb") as file:
+            return content_hash(file.read())
+    except FileNotFoundError:
+        return None
+
+def is_unchanged(file_path, data):
+    """Check whether a file already holds data, comparing the sizes before the hashes."""
+    try:
+        if os.path.getsize(file_path) != len(data):
+            return False
+    except OSError:
+        return False
+    return file_hash(file_path) == content_hash(data)
+
+def write_atomic(file_path, data):
+    """Write a file through a temporary file in the same folder renamed over it, so readers never see a partial file.
+
+    The file keeps the mode of the file it replaces, or gets the default mode of new files.
+    """
+    folder = os.path.dirname(file_path) or "."
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = NEW_FILE_MODE
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix="." + os.path.basename(file_path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, mode)
+        for attempt in range(REPLACE_ATTEMPTS):
+            try:
+                os.replace(temp_path, file_path)
+                return
+            except PermissionError:
+                if attempt == REPLACE_ATTEMPTS - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def get_original_backup(folder, file_name):
+    """Get the path of the permanent backup of the first replaced version of a file."""
+    stem, extension = os.path.splitext(file_name)
+    return os.path.join(folder, BACKUP_FOLDER, f"{stem}.{ORIGINAL_BACKUP}{extension}")
+
+def get_backups(folder, file_name):
+    """Get the timestamped backups of a file kept in folder, oldest first, without the original one."""
+    backup_folder = os.path.join(folder, BACKUP_FOLDER)
+    stem, extension = os.path.splitext(file_name)
+    try:
+        names = os.listdir(backup_folder)
+    except FileNotFoundError:
+        return []
+    # The timestamps in the names sort chronologically
+    return [os.path.join(backup_folder, name) for name in sorted(names)
+            if name.startswith(stem + ".") and name.endswith(extension) and len(name) == len(stem) + len(extension) + 23]
+
+def backup_file(file_path, history=BACKUP_HISTORY):
+    """Copy a file to the backup folder next to it, keeping the newest history backups.
+
+    The first backup of a file is its original version and is never removed, the next ones get
+    timestamped names.
+    """
+    folder, file_name = os.path.split(file_path)
+    backup_folder = os.path.join(folder, BACKUP_FOLDER)
+    os.makedirs(backup_folder, exist_ok=True)
+    original_path = get_original_backup(folder, file_name)
+    if not os.path.exists(original_path):
+        shutil.copyfile(file_path, original_path)
+        return original_path
+    stem, extension = os.path.splitext(file_name)
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    backup_path = os.path.join(backup_folder, f"{stem}.{timestamp}{extension}")
+    shutil.copyfile(file_path, backup_path)
+    for old_backup in get_backups(folder, file_name)[:-history] if history > 0 else []:
+        os.remove(old_backup)
+    return backup_path
+
+def deploy_file(folder, file_name, data, history=BACKUP_HISTORY):
+    """Write one file into folder unless it already holds data, backing up the replaced version.
+
+    Return "unchanged" or "written", and the backup path (None if nothing was replaced).
+    """
+    file_path = os.path.join(folder, file_name)
+    if is_unchanged(file_path, data):
+        return "unchanged", None
+    backup_path = backup_file(file_path, history) if history > 0 and os.path.isfile(file_path) else None
+    write_atomic(file_path, data)
+    return "written", backup_path
+
+def deploy_target(folder, files, history=BACKUP_HISTORY):
+    """Deploy the (file name, bytes) pairs into one folder, in order, reporting errors instead of raising them."""
+    result = {"target": folder, "written": [], "unchanged": [], "backups": [], "error": None}
+    try:
+        if not os.path.isdir(folder):
+            raise FileNotFoundError(f"Target folder not found: {folder}")
+        for file_name, data in files:
+            status, backup_path = deploy_file(folder, file_name, data, history)
+            result[status].append(file_name)
+            if backup_path:
+                result["backups"].append(backup_path)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def deploy(targets, files, history=BACKUP_HISTORY, jobs=None):
+    """Deploy the (file name, bytes) pairs to every target folder concurrently, returning one result per target."""
+    targets = list(dict.fromkeys(os.path.abspath(target) for target in targets))
+    if not targets:
+        return []
+    jobs = max(1, min(jobs or len(targets), len(targets)))
+    if jobs == 1:
+        return [deploy_target(target, files, history) for target in targets]
+    # Writing files waits on the disk, threads are enough
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(lambda target: deploy_target(target, files, history), targets))
+
+def format_deploy_result(result):
+    """Get a one line summary of the deployment to one target."""
+    if result["error"]:
+        return f"Error deploying to {result['target']}: {result['error']}"
+    parts = []
+    if result["written"]:
+        parts.append("wrote " + ", ".join(result["written"]))
+    if result["unchanged"]:
+        parts.append("unchanged " + ", ".join(result["unchanged"]))
+    if result["backups"]:
+        parts.append(f"{len(result['backups'])} backup(s) kept")
+    return f"{result['target']}: " + "; ".join(parts)
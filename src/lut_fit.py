@@ -0,0 +1,89 @@
+"""Find the preset parameters that reproduce an existing LUT."""
+import numpy as np
+
+from lut_core import DEADZONE_RANGE, MAX_OUTPUT_RANGE, POWER_BOOST_RANGE
+
+COARSE_STEPS = (31, 51, 21)
+COARSE_POINTS = 101
+REFINE_CANDIDATES = 4
+REFINE_TOLERANCE = 1e-4
+
+def model_output(x, deadzone, max_output, power_boost):
+    """Get the output of generateCustomLut at the inputs x (0 to 1), before rounding.
+
+    The parameters broadcast against x, so a whole grid of parameters can be evaluated at once.
+    The formula does not depend on the LUT size once x is normalized:
+    d + (s - d) * (x + g * (x^2 - x)) with g = -power_boost / 10, limited to 100%.
+    """
+    g = -np.asarray(power_boost) / 10
+    y = deadzone + (max_output - deadzone) * (x + g * (x * x - x))
+    return np.minimum(y, 100) * 0.01
+
+def _residuals(x, y, deadzone, max_output, power_boost):
+    """Get the RMS error of each parameter set, the parameters having one more axis than x."""
+    deltas = model_output(x, deadzone[..., None], max_output[..., None], power_boost[..., None]) - y
+    return np.sqrt(np.mean(deltas * deltas, axis=-1))
+
+def _refine(x, y, start, steps, bounds):
+    """Pattern search around a starting point, halving the steps when no neighbour is better."""
+    offsets = np.stack(np.meshgrid(*[[-1, 0, 1]] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+    best = np.array(start, dtype=np.float64)
+    steps = np.array(steps, dtype=np.float64)
+    best_error = _residuals(x, y, *best[:, None])[0]
+    while steps.max() > REFINE_TOLERANCE:
+        candidates = np.clip(best + offsets * steps, bounds[:, 0], bounds[:, 1])
+        errors = _residuals(x, y, *candidates.T)
+        i = int(errors.argmin())
+        if errors[i] < best_error:
+            best = candidates[i]
+            best_error = errors[i]
+        else:
+            steps /= 2
+    return best, best_error
+
+def fit_lut(lut, increment=0.5):
+    """Find the deadzone, max_output and power_boost values whose LUT is closest to the given one.
+
+    A coarse grid over the slider ranges is evaluated in one vectorized pass on a subset of the points,
+    then the best candidates are refined on all the points. With an increment, the result is snapped
+    to the slider steps. Return a dict with the "preset" and its "rms_error" and "max_abs_error".
+    """
+    # Saved LUTs always start with 0.000|0.00000 whatever the deadzone, so x = 0 is not fitted
+    fitted = lut.x > 0
+    x = np.asarray(lut.x[fitted], dtype=np.float64)
+    y = np.asarray(lut.y[fitted], dtype=np.float64)
+    if len(x) == 0:
+        raise ValueError("Cannot fit a LUT without points above x = 0.")
+    bounds = np.array([DEADZONE_RANGE, MAX_OUTPUT_RANGE, POWER_BOOST_RANGE])
+
+    # Coarse search on a subset of the points, the whole grid at once
+    subset = np.unique(np.linspace(0, len(x) - 1, COARSE_POINTS).round().astype(int))
+    axes = [np.linspace(low, high, count) for (low, high), count in zip(bounds, COARSE_STEPS)]
+    grid = np.meshgrid(*axes, indexing="ij")
+    errors = _residuals(x[subset], y[subset], *grid).ravel()
+    starts = np.stack([axis.ravel() for axis in grid], axis=-1)[np.argsort(errors)[:REFINE_CANDIDATES]]
+
+    # Local refinement of the best candidates on all the points
+    steps = [(high - low) / (count - 1) for (low, high), count in zip(bounds, COARSE_STEPS)]
+    best, best_error = min((_refine(x, y, start, steps, bounds) for start in starts), key=lambda result: result[1])
+
+    if increment:
+        # The best snapped preset is one of the slider steps around the continuous optimum
+        corners = [np.unique(np.clip([np.floor(value / increment) * increment, np.ceil(value / increment) * increment], low, high))
+                   for value, (low, high) in zip(best, bounds)]
+        candidates = np.stack(np.meshgrid(*corners, indexing="ij"), axis=-1).reshape(-1, 3)
+        errors = _residuals(x, y, *candidates.T)
+        best = candidates[int(errors.argmin())]
+
+    deltas = model_output(x, *best) - y
+    return {
+        "preset": {"deadzone": float(best[0]), "max_output": float(best[1]), "power_boost": float(best[2])},
+        "rms_error": float(np.sqrt(np.mean(deltas * deltas))),
+        "max_abs_error": float(np.abs(deltas).max())
+    }
+
+def format_fit(name, fit):
+    """Get a one line summary of a fit."""
+    preset = fit["preset"]
+    return (f"{name}: deadzone {preset['deadzone']:g}, max output {preset['max_output']:g}, power boost {preset['power_boost']:g}, "
+            f"RMS {fit['rms_error'] * 100:.3f}%, max error {fit['max_abs_error'] * 100:.3f}%")
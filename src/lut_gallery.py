@@ -0,0 +1,113 @@
+"""Render the chart of every preset to PNG or SVG images without the GUI, across worker processes."""
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from lut_batch import find_presets
+from lut_core import read_preset
+from lut_model import LutModel, PREVIEW_SIZE
+from tracing import init_worker, tracer
+
+IMAGE_FORMATS = ("png", "svg")
+
+# Chart of the current process, built once by _init_worker and reused for every image
+_worker_chart = None
+
+def create_chart(image_format="png", dpi=None):
+    """Create a chart drawn with Agg, sized like the app chart, to be reused for many images.
+
+    For PNG images the axes, grid and ticks are rendered once here, and only the curve, markers,
+    legend and title are drawn over them for each image. SVG images are drawn entirely each time.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from lut_chart import CHART_DPI, CHART_SIZE, LutChart
+
+    figure = Figure(figsize=CHART_SIZE, dpi=dpi or CHART_DPI)
+    FigureCanvasAgg(figure)
+    chart = LutChart(figure, figure.add_subplot(), use_blit=image_format == "png")
+    if chart.use_blit:
+        chart.canvas.draw()
+    return chart
+
+def render_preset(chart, preset_path, image_path, lut_size=PREVIEW_SIZE, title=True):
+    """Draw the chart of a preset, as the app does, and save it to image_path."""
+    preset = read_preset(preset_path)
+    model = LutModel(preset["deadzone"], preset["max_output"], preset["power_boost"], preview_size=lut_size)
+    if chart.set_lut(model.preview, model.max_output, model.deadzone, None, model.analysis):
+        chart.update_legend()
+    chart.ax.set_title(os.path.splitext(os.path.basename(preset_path))[0] if title else "")
+    if not chart.use_blit:
+        chart.figure.savefig(image_path)
+        return
+
+    from PIL import Image
+
+    canvas = chart.canvas
+    canvas.restore_region(chart.background)
+    for artist in chart.dynamic_artists + [chart.ax.get_legend(), chart.ax.title]:
+        if artist.get_visible():
+            chart.ax.draw_artist(artist)
+    Image.fromarray(np.asarray(canvas.buffer_rgba())).save(image_path, format="png")
+
+def get_image_path(preset_path, presets_dir, output_dir, image_format):
+    """Get the image path of a preset, mirroring its position in the presets tree."""
+    relative_path = os.path.splitext(os.path.relpath(preset_path, presets_dir))[0]
+    return os.path.join(output_dir, relative_path + "." + image_format)
+
+def _init_worker(image_format, dpi):
+    global _worker_chart
+    _worker_chart = create_chart(image_format, dpi)
+
+def _init_pool_worker(image_format, dpi, trace_dir):
+    init_worker(trace_dir)
+    _init_worker(image_format, dpi)
+
+def _render_task(task):
+    """Render a single preset inside a worker, reporting errors instead of raising them."""
+    preset_path, image_path, lut_size, title = task
+    try:
+        os.makedirs(os.path.dirname(image_path) or ".", exist_ok=True)
+        render_preset(_worker_chart, preset_path, image_path, lut_size, title)
+        return preset_path, None
+    except Exception as e:
+        return preset_path, str(e)
+
+def render_gallery(presets_dir, output_dir, image_format="png", lut_size=PREVIEW_SIZE, jobs=None, dpi=None, title=True):
+    """Write the chart image of every preset in presets_dir, spreading the rendering across processes."""
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    preset_paths = find_presets(presets_dir)
+    tasks = [(preset_path, get_image_path(preset_path, presets_dir, output_dir, image_format), lut_size, title) for preset_path in preset_paths]
+    jobs = jobs or os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+
+    start_time = time.perf_counter()
+    if jobs == 1:
+        _init_worker(image_format, dpi)
+        results = [_render_task(task) for task in tasks]
+    else:
+        chunk_size = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_pool_worker, initargs=(image_format, dpi, tracer.get_worker_dir())) as executor:
+            results = list(executor.map(_render_task, tasks, chunksize=chunk_size))
+    elapsed = time.perf_counter() - start_time
+
+    errors = [(preset_path, error) for preset_path, error in results if error]
+    return {
+        "presets": len(results),
+        "rendered": len(results) - len(errors),
+        "errors": errors,
+        "jobs": jobs,
+        "elapsed": elapsed
+    }
+
+def format_gallery_summary(summary):
+    """Get a one line summary of a gallery rendering."""
+    rate = summary["rendered"] / summary["elapsed"] if summary["elapsed"] > 0 else 0.0
+    return (f"Rendered {summary['rendered']} of {summary['presets']} presets in {summary['elapsed']:.2f} s "
+            f"using {summary['jobs']} worker(s): {rate:.1f} images/s")
@@ -0,0 +1,196 @@
+"""Read .lut files in bulk, validating their content, and convert them to and from the binary format."""
+import mmap
+import os
+import warnings
+
+import numpy as np
+
+from lut_binary import BINARY_EXTENSION, is_binary_lut, read_lut_binary, write_lut_binary
+from lut_core import format_lut_file, generateCustomLut, Lut, read_preset, round_half_even
+from tracing import traced
+
+MMAP_THRESHOLD = 8 * 1024 * 1024
+MMAP_CHUNK_SIZE = 4 * 1024 * 1024
+COMMENT_PREFIXES = ("#", ";")
+MAX_REPORTED_ERRORS = 10
+
+class LutParseError(ValueError):
+    """Raised when a LUT file contains malformed lines."""
+
+    def __init__(self, source, errors):
+        self.source = source
+        self.errors = errors
+        details = "\n".join(f"  line {line_number}: {reason}: {line.strip()!r}" for line_number, line, reason in errors[:MAX_REPORTED_ERRORS])
+        if len(errors) > MAX_REPORTED_ERRORS:
+            details += f"\n  ... and {len(errors) - MAX_REPORTED_ERRORS} more"
+        super().__init__(f"Invalid LUT {source} ({len(errors)} error(s)):\n{details}")
+
+def _parse_bulk(source, encoding=None):
+    """Parse a file path or a list of lines with the numpy reader, returning None if it needs line by line parsing."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # empty input
+            values = np.loadtxt(source, dtype=np.float64, delimiter="|", comments="#", ndmin=2, encoding=encoding)
+    except ValueError:
+        return None
+    if values.shape[0] == 0 or values.shape[1] != 2 or not np.isfinite(values).all():
+        return None
+    return np.ascontiguousarray(values[:, 0]), np.ascontiguousarray(values[:, 1])
+
+def _parse_lines(text, first_line):
+    """Parse a chunk line by line, returning the points, their (line number, line) and the malformed lines."""
+    x_values = []
+    y_values = []
+    sources = []
+    errors = []
+    for line_number, raw_line in enumerate(text.split("\n"), first_line):
+        line = raw_line
+        for prefix in COMMENT_PREFIXES:
+            line = line.split(prefix, 1)[0]
+        line = line.strip()
+        if not line:
+            continue
+        parts = line.split("|")
+        if len(parts) != 2:
+            errors.append((line_number, raw_line, 'expected "x|y"'))
+            continue
+        try:
+            x = float(parts[0])
+            y = float(parts[1])
+        except ValueError:
+            errors.append((line_number, raw_line, "invalid number"))
+            continue
+        if not (np.isfinite(x) and np.isfinite(y)):
+            errors.append((line_number, raw_line, "value is not finite"))
+            continue
+        x_values.append(x)
+        y_values.append(y)
+        sources.append((line_number, raw_line))
+    return np.array(x_values, dtype=np.float64), np.array(y_values, dtype=np.float64), sources, errors
+
+def _parse_chunks(get_chunks, source):
+    """Parse the (text, first line number) chunks returned by get_chunks into a Lut."""
+    x_parts = []
+    y_parts = []
+    errors = []
+    for text, first_line in get_chunks():
+        parsed = _parse_bulk(text.split("\n"))
+        if parsed is None:
+            x, y, _, chunk_errors = _parse_lines(text, first_line)
+            errors.extend(chunk_errors)
+            parsed = (x, y)
+        x_parts.append(parsed[0])
+        y_parts.append(parsed[1])
+    if errors:
+        raise LutParseError(source, errors)
+
+    x = np.concatenate(x_parts) if x_parts else np.empty(0)
+    y = np.concatenate(y_parts) if y_parts else np.empty(0)
+    if x.size == 0:
+        raise LutParseError(source, [(1, "", "no points found")])
+
+    decreasing = np.flatnonzero(x[1:] < x[:-1]) + 1
+    if decreasing.size:
+        # Line numbers are only needed to report the error, so they are found with a second, slower pass
+        sources = []
+        for text, first_line in get_chunks():
+            sources.extend(_parse_lines(text, first_line)[2])
+        raise LutParseError(source, [sources[index] + (f"x value {x[index]:g} is lower than the previous one {x[index - 1]:g}",) for index in decreasing])
+    return Lut(x, y)
+
+def parse_lut(text, source="<string>"):
+    """Parse the content of a .lut file into a Lut."""
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    return _parse_chunks(lambda: [(text, 1)], source)
+
+def _decode(data, source, first_line=1):
+    """Decode UTF-8 LUT content, raising a LutParseError on the line holding an invalid byte."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        line_start = data.rfind(b"\n", 0, e.start) + 1
+        line_end = data.find(b"\n", e.start)
+        # Binary files have arbitrarily long lines, only their start is reported
+        line = data[line_start:min(line_end if line_end >= 0 else len(data), line_start + 80)].decode("utf-8", "replace")
+        raise LutParseError(source, [(first_line + data.count(b"\n", 0, e.start), line, "not UTF-8 text")])
+
+def _mmap_chunks(mapped, chunk_size, source):
+    """Split a memory-mapped file into chunks ending on a line break."""
+    start = 3 if mapped[:3] == b"\xef\xbb\xbf" else 0
+    first_line = 1
+    size = len(mapped)
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            line_break = mapped.rfind(b"\n", start, end)
+            end = line_break + 1 if line_break >= start else size
+        text = _decode(mapped[start:end], source, first_line)
+        yield text, first_line
+        first_line += text.count("\n")
+        start = end
+
+@traced
+def read_lut(file_path, use_mmap=None, chunk_size=MMAP_CHUNK_SIZE):
+    """Read a .lut file, or a binary LUT file, into a Lut, memory-mapping it when it is large."""
+    if is_binary_lut(file_path):
+        return read_lut_binary(file_path)
+    size = os.path.getsize(file_path)
+    if use_mmap is None:
+        use_mmap = size >= MMAP_THRESHOLD
+    if not use_mmap or size == 0:
+        parsed = _parse_bulk(file_path, encoding="utf-8-sig")
+        if parsed is not None and not np.any(parsed[0][1:] < parsed[0][:-1]):
+            return Lut(*parsed)
+        # Parse again line by line to report the malformed lines
+        with open(file_path, "rb") as file:
+            return parse_lut(_decode(file.read(), file_path), source=file_path)
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return _parse_chunks(lambda: _mmap_chunks(mapped, chunk_size, file_path), file_path)
+
+@traced
+def write_lut(file_path, lut):
+    """Write a LUT to a .lut file, as Save LUT does."""
+    with open(file_path, "w") as file:
+        file.write(format_lut_file(lut))
+
+def get_text_changes(lut):
+    """Get how the .lut text written by Save LUT differs from a LUT, as messages, an empty list if it keeps every point."""
+    changes = []
+    zero = lut.x == 0
+    if not zero.any():
+        changes.append("a 0.000|0.00000 point is added")
+    elif zero.sum() > 1 or np.any(lut.y[zero] != 0):
+        changes.append(f"the point at 0 (output {lut.y[zero][0]:g}) is written as 0.000|0.00000")
+    non_zero = ~zero
+    if not (np.array_equal(round_half_even(lut.x[non_zero], 3), lut.x[non_zero])
+            and np.array_equal(round_half_even(lut.y[non_zero], 5), lut.y[non_zero])):
+        changes.append("the values are rounded to 3 decimals for the input and 5 for the output")
+    return changes
+
+def convert_lut_file(file_path, output_path=None, dtype=np.float64, overwrite=False):
+    """Convert a .lut file to the binary format or a binary file to a .lut file.
+
+    The binary file keeps the parsed values exactly. The .lut text written from a binary file is
+    byte for byte the one Save LUT writes for the same LUT, not the original text: return the
+    output path and the changes that text makes to the LUT (see get_text_changes). An existing
+    output file is only replaced with overwrite.
+    """
+    binary = is_binary_lut(file_path)
+    if output_path is None:
+        output_path = os.path.splitext(file_path)[0] + (".lut" if binary else BINARY_EXTENSION)
+    if not overwrite and os.path.exists(output_path):
+        raise FileExistsError(f"{output_path} already exists")
+    lut = read_lut(file_path)
+    if binary:
+        write_lut(output_path, lut)
+        return output_path, get_text_changes(lut)
+    write_lut_binary(output_path, lut, dtype)
+    return output_path, []
+
+def read_lut_or_preset(file_path, lut_size=1000):
+    """Read a .lut file, or generate the LUT of a preset .json file."""
+    if file_path.lower().endswith(".json"):
+        preset = read_preset(file_path)
+        return generateCustomLut(lut_size, preset["deadzone"], preset["max_output"], preset["power_boost"])
+    return read_lut(file_path)
@@ -0,0 +1,104 @@
+"""Headless model of the edited LUT: its parameters and the LUTs, statistics and text derived from them."""
+from lut_analysis import analyze_lut, analyze_parameters
+from lut_core import format_lut_file, LutCache
+
+PARAMETERS = ("deadzone", "max_output", "power_boost")
+LUT_SIZE = 1000
+PREVIEW_SIZE = 100
+
+class LutModel:
+    """Own the slider parameters and derive the LUT, its statistics and its .lut text only when needed.
+
+    Derived values are computed on first access and kept until a parameter changes. Listeners added
+    with subscribe() are called with the model and the names of the changed parameters.
+    """
+
+    def __init__(self, deadzone=0.0, max_output=100.0, power_boost=0.0, lut_size=LUT_SIZE, preview_size=PREVIEW_SIZE, lut_cache=None):
+        self.lut_size = lut_size
+        self.preview_size = preview_size
+        self.lut_cache = lut_cache if lut_cache is not None else LutCache()
+        self.parameters = {"deadzone": float(deadzone), "max_output": float(max_output), "power_boost": float(power_boost)}
+        self.version = 0
+        self.listeners = []
+        self._derived = {}
+
+    @property
+    def deadzone(self):
+        return self.parameters["deadzone"]
+
+    @property
+    def max_output(self):
+        return self.parameters["max_output"]
+
+    @property
+    def power_boost(self):
+        return self.parameters["power_boost"]
+
+    def values(self):
+        """Get the deadzone, max output and power boost values."""
+        return tuple(self.parameters[name] for name in PARAMETERS)
+
+    def set(self, **values):
+        """Set some parameters, notifying the listeners if any changed, and return the names of the changed ones."""
+        changed = []
+        for name, value in values.items():
+            if name not in self.parameters:
+                raise ValueError(f"Unknown LUT parameter: {name}")
+            value = float(value)
+            if self.parameters[name] != value:
+                self.parameters[name] = value
+                changed.append(name)
+        if changed:
+            self.version += 1
+            self._derived.clear()
+            for listener in list(self.listeners):
+                listener(self, changed)
+        return changed
+
+    def subscribe(self, listener):
+        """Call listener(model, changed_names) after every parameter change."""
+        self.listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def _derive(self, key, compute):
+        value = self._derived.get(key)
+        if value is None:
+            value = self._derived[key] = compute()
+        return value
+
+    def get_lut(self, lut_size=None):
+        """Get the LUT of the current parameters with lut_size intervals (default: the saved LUT size)."""
+        lut_size = self.lut_size if lut_size is None else lut_size
+        return self._derive(("lut", lut_size), lambda: self.lut_cache.get(lut_size, *self.values()))
+
+    def get_stats(self, lut_size=None):
+        """Get the analysis of the points of the LUT with lut_size intervals, see lut_analysis.analyze_lut."""
+        lut_size = self.lut_size if lut_size is None else lut_size
+        return self._derive(("stats", lut_size), lambda: analyze_lut(self.get_lut(lut_size)))
+
+    @property
+    def lut(self):
+        """Get the LUT written by Save LUT."""
+        return self.get_lut()
+
+    @property
+    def preview(self):
+        """Get the coarser LUT drawn on the chart."""
+        return self.get_lut(self.preview_size)
+
+    @property
+    def stats(self):
+        return self.get_stats()
+
+    @property
+    def analysis(self):
+        """Get the exact clipping point, deadzone intercept, slopes and monotonicity, whatever the LUT size."""
+        return self._derive("analysis", lambda: analyze_parameters(*self.values()))
+
+    @property
+    def text(self):
+        """Get the content of the .lut file of the LUT."""
+        return self._derive("text", lambda: format_lut_file(self.lut))
@@ -0,0 +1,138 @@
+"""LUT text panel rendering only the visible rows of the LUT arrays."""
+import tkinter as tk
+
+from tkinter import font as tkfont
+from tkinter import ttk
+
+import numpy as np
+
+class LutPanel(ttk.Frame):
+    """Show the LUT values, and optionally the comparison values, formatting only the rows on screen."""
+
+    def __init__(self, master, height=10, width=20):
+        super().__init__(master)
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.compare_y = None
+        self.top_row = 0
+        self.visible_rows = height
+        self.all_selected = False
+
+        self.text = tk.Text(self, height=height, width=width, state=tk.DISABLED, wrap=tk.NONE)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.line_height = max(1, tkfont.Font(font=self.text.cget("font")).metrics("linespace"))
+
+        self.menu = tk.Menu(self, tearoff=0)
+        self.menu.add_command(label="Copy", command=self.copy)
+        self.menu.add_command(label="Copy All", command=self.copy_all)
+
+        self.text.bind("<Configure>", self.on_resize)
+        self.text.bind("<MouseWheel>", self.on_mousewheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll(3))
+        self.text.bind("<Up>", lambda event: self.scroll(-1))
+        self.text.bind("<Down>", lambda event: self.scroll(1))
+        self.text.bind("<Prior>", lambda event: self.scroll(-self.visible_rows))
+        self.text.bind("<Next>", lambda event: self.scroll(self.visible_rows))
+        self.text.bind("<Home>", lambda event: self.scroll_to(0))
+        self.text.bind("<End>", lambda event: self.scroll_to(self.row_count()))
+        self.text.bind("<Control-a>", self.select_all)
+        self.text.bind("<Control-c>", self.copy)
+        self.text.bind("<<Copy>>", self.copy)
+        self.text.bind("<Button-1>", self.clear_select_all, add="+")
+        self.text.bind("<Button-3>", self.show_menu)
+
+    def on_mousewheel(self, event):
+        """Scroll 3 rows per wheel notch, and at least 3 rows for the small deltas of macOS and touchpads."""
+        if event.delta:
+            notches = max(1, abs(event.delta) // 120)
+            self.scroll(-3 * notches if event.delta > 0 else 3 * notches)
+
+    def set_lut(self, lut, compare_y=None):
+        """Show a LUT, with the comparison values resampled on its grid if given."""
+        # The first row is always written as 0.000|0.00000, the other rows skip x = 0
+        non_zero = lut.x != 0.000
+        self.x = np.concatenate(([0.0], lut.x[non_zero]))
+        self.y = np.concatenate(([0.0], lut.y[non_zero]))
+        self.compare_y = None if compare_y is None else np.concatenate((compare_y[:1], compare_y[non_zero]))
+        self.all_selected = False
+        self.scroll_to(self.top_row)
+
+    def row_count(self):
+        return len(self.x)
+
+    def format_rows(self, start, stop):
+        """Format the rows between start and stop."""
+        x = self.x[start:stop].tolist()
+        y = self.y[start:stop].tolist()
+        if self.compare_y is None:
+            return list(map("{:.3f}|{:.5f}".format, x, y))
+        return list(map("{:.3f}|{:.5f} - {:.5f}".format, x, y, self.compare_y[start:stop].tolist()))
+
+    def get_text(self):
+        """Get the whole LUT text."""
+        return "\n".join(self.format_rows(0, self.row_count()))
+
+    def render(self):
+        """Replace the text with the visible rows and update the scrollbar."""
+        stop = min(self.top_row + self.visible_rows, self.row_count())
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, "\n".join(self.format_rows(self.top_row, stop)))
+        if self.all_selected:
+            self.text.tag_add(tk.SEL, 1.0, tk.END)
+        self.text.config(state=tk.DISABLED)
+        total = max(self.row_count(), 1)
+        self.scrollbar.set(self.top_row / total, stop / total)
+
+    def scroll_to(self, row):
+        self.top_row = int(max(0, min(row, self.row_count() - self.visible_rows)))
+        self.render()
+        return "break"
+
+    def scroll(self, rows):
+        return self.scroll_to(self.top_row + rows)
+
+    def yview(self, *args):
+        """Handle the scrollbar commands."""
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * self.row_count()))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def on_resize(self, event):
+        visible_rows = max(1, event.height // self.line_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.scroll_to(self.top_row)
+
+    def select_all(self, event=None):
+        self.all_selected = True
+        self.text.tag_add(tk.SEL, 1.0, tk.END)
+        return "break"
+
+    def clear_select_all(self, event=None):
+        self.all_selected = False
+
+    def copy(self, event=None):
+        """Copy the selected rows, or the whole LUT when everything is selected."""
+        if self.all_selected:
+            return self.copy_all()
+        try:
+            selection = self.text.get(tk.SEL_FIRST, tk.SEL_LAST)
+        except tk.TclError:
+            return "break"
+        self.clipboard_clear()
+        self.clipboard_append(selection)
+        return "break"
+
+    def copy_all(self, event=None):
+        self.clipboard_clear()
+        self.clipboard_append(self.get_text())
+        return "break"
+
+    def show_menu(self, event):
+        self.menu.tk_popup(event.x_root, event.y_root)
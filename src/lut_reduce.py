@@ -0,0 +1,88 @@
+"""Simplify a LUT to few breakpoints, within a maximum interpolation error of the full curve."""
+import numpy as np
+
+from lut_compare import resample
+from lut_core import Lut
+
+DEFAULT_MAX_ERROR = 0.0005
+REACH_WINDOW = 64
+
+def get_file_curve(lut):
+    """Get the x and y arrays of the curve written to a .lut file: 0|0, then the points with x > 0."""
+    non_zero = lut.x != 0.000
+    return np.concatenate(([0.0], lut.x[non_zero])), np.concatenate(([0.0], lut.y[non_zero]))
+
+def find_key_points(x, y):
+    """Get the indices that are always kept: the endpoints, the deadzone intercept and the clipping knee.
+
+    The deadzone intercept is the first point after 0|0, where the output jumps to the deadzone.
+    The clipping knee is the first point at the maximum output, when the curve stays flat after it.
+    Points sharing the same x, as in LUTs finer than the 3 decimals of the file, are vertical
+    steps: the first and last point of each step are kept as well.
+    """
+    last = len(x) - 1
+    keys = {0, last, min(1, last)}
+    peak = y.max()
+    knee = int(np.argmax(y >= peak))
+    if knee < last and np.all(y[knee:] == peak):
+        keys.add(knee)
+    same_x = np.diff(x) == 0
+    keys.update(np.flatnonzero(same_x & ~np.concatenate(([False], same_x[:-1]))).tolist())
+    keys.update((np.flatnonzero(same_x & ~np.concatenate((same_x[1:], [False]))) + 1).tolist())
+    return sorted(keys)
+
+def _furthest_reach(x, y, start, stop, max_error):
+    """Get the furthest index up to stop whose chord from start passes within max_error of every point in between."""
+    reach = start + 1
+    low = -np.inf
+    high = np.inf
+    first = start + 1
+    window = REACH_WINDOW
+    while first <= stop:
+        end = min(first + window, stop + 1)
+        dx = x[first:end] - x[start]
+        dy = y[first:end] - y[start]
+        # Slopes of the chords from start, and the cone of slopes passing within max_error of each point
+        slopes = dy / dx
+        lows = np.maximum.accumulate(np.maximum((dy - max_error) / dx, low))
+        highs = np.minimum.accumulate(np.minimum((dy + max_error) / dx, high))
+        # A chord is valid when its slope is in the cone of all the points before its end
+        previous_lows = np.concatenate(([low], lows[:-1]))
+        previous_highs = np.concatenate(([high], highs[:-1]))
+        valid = np.flatnonzero((slopes >= previous_lows) & (slopes <= previous_highs))
+        if valid.size:
+            reach = first + int(valid[-1])
+        if lows[-1] > highs[-1]:
+            break
+        low = lows[-1]
+        high = highs[-1]
+        first = end
+        window *= 2
+    return reach
+
+def reduce_lut(lut, max_error=DEFAULT_MAX_ERROR):
+    """Simplify a LUT for a .lut file, keeping the linear interpolation within max_error (output units, 0 to 1).
+
+    The reduction works on the curve as written to the file and read by the games, so the returned
+    LUT starts with 0|0. Between the key points, each segment reaches as far as the error allows.
+    Return a dict with the reduced "lut", its number of "points", the "original_points" and the
+    achieved "max_error" against the full-resolution curve.
+    """
+    x, y = get_file_curve(lut)
+    kept = []
+    keys = find_key_points(x, y)
+    for start, stop in zip(keys[:-1], keys[1:]):
+        i = start
+        while i < stop:
+            i = _furthest_reach(x, y, i, stop, max_error) if stop - i > 1 and x[stop] != x[i] else stop
+            kept.append(i)
+    kept = [keys[0]] + kept
+    reduced = Lut(x[kept], y[kept])
+    error = float(np.abs(resample(reduced, x) - y).max()) if len(x) else 0.0
+    return {"lut": reduced, "points": len(reduced), "original_points": len(x), "max_error": error}
+
+def format_reduction(name, reduction):
+    """Get a one line summary of a LUT reduction."""
+    saved = 1 - reduction["points"] / reduction["original_points"]
+    return (f"{name}: {reduction['points']} points instead of {reduction['original_points']} ({saved * 100:.0f}% fewer), "
+            f"max error {reduction['max_error'] * 100:.4f}%")
@@ -0,0 +1,186 @@
+"""Replay recorded force feedback signals through LUTs and measure what they do to the real load."""
+import mmap
+import os
+import re
+
+import numpy as np
+
+from lut_analysis import get_deadzone_intercept
+from lut_reduce import get_file_curve
+
+CHUNK_SAMPLES = 1 << 16
+# Rough size of a CSV line, to read about as many samples per chunk as from binary files
+CSV_BYTES_PER_SAMPLE = 64
+CSV_CHUNK_SIZE = CHUNK_SAMPLES * CSV_BYTES_PER_SAMPLE
+CSV_EXTENSIONS = (".csv", ".txt")
+# Resolution of the distributions, used for the percentiles
+HISTOGRAM_RESOLUTION = 1000
+HISTOGRAM_BINS = 20
+PERCENTILES = (50, 95, 99)
+
+def _csv_header(first_line, delimiter):
+    """Get the column names of a CSV file, or None if its first line is data."""
+    if re.search(r"[A-DF-Za-df-z_]", first_line):
+        return [name.strip().strip('"') for name in first_line.split(delimiter)]
+    return None
+
+def read_csv_chunks(file_path, column=0, delimiter=",", chunk_size=CSV_CHUNK_SIZE):
+    """Read one column of a CSV file as float arrays, memory-mapping it and parsing it chunk by chunk.
+
+    column is an index or, when the file has a header line, a column name.
+    """
+    if os.path.getsize(file_path) == 0:
+        return
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        start = 3 if mapped[:3] == b"\xef\xbb\xbf" else 0
+        line_end = mapped.find(b"\n", start)
+        first_line = mapped[start:line_end if line_end >= 0 else len(mapped)].decode("utf-8")
+        header = _csv_header(first_line, delimiter)
+        if header is not None:
+            if not isinstance(column, int):
+                if column not in header:
+                    raise ValueError(f"Column {column!r} not found in {file_path}, available: {', '.join(header)}")
+                column = header.index(column)
+            start = line_end + 1 if line_end >= 0 else len(mapped)
+        elif not isinstance(column, int):
+            raise ValueError(f"{file_path} has no header line, the column must be an index")
+
+        size = len(mapped)
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                line_break = mapped.rfind(b"\n", start, end)
+                end = line_break + 1 if line_break >= start else size
+            lines = mapped[start:end].decode("utf-8").splitlines()
+            start = end
+            values = np.loadtxt(lines, dtype=np.float64, delimiter=delimiter, usecols=column, ndmin=1)
+            if values.size:
+                yield values
+
+def read_binary_chunks(file_path, dtype=np.float32, channels=1, channel=0, chunk_size=CHUNK_SAMPLES):
+    """Read one channel of a raw little-endian sample file as float arrays, memory-mapped."""
+    dtype = np.dtype(dtype).newbyteorder("<")
+    frame_size = dtype.itemsize * channels
+    frames = os.path.getsize(file_path) // frame_size
+    if frames == 0:
+        return
+    samples = np.memmap(file_path, dtype=dtype, mode="r", shape=(frames, channels))[:, channel]
+    for start in range(0, frames, chunk_size):
+        yield samples[start:start + chunk_size].astype(np.float64)
+
+def read_signal_chunks(file_path, column=0, delimiter=",", dtype=np.float32, channels=1, channel=0, chunk_size=CHUNK_SAMPLES):
+    """Read a recorded signal as float arrays of about chunk_size samples, from a CSV file or a raw binary file."""
+    if file_path.lower().endswith(CSV_EXTENSIONS):
+        return read_csv_chunks(file_path, column, delimiter, chunk_size * CSV_BYTES_PER_SAMPLE)
+    return read_binary_chunks(file_path, dtype, channels, channel, chunk_size)
+
+class _Distribution:
+    """Streaming statistics of absolute force values, with a fine histogram for the percentiles."""
+
+    def __init__(self):
+        self.histogram = np.zeros(HISTOGRAM_RESOLUTION + 1, dtype=np.int64)
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.peak = 0.0
+
+    def add(self, values):
+        self.histogram += np.bincount(np.minimum(values * HISTOGRAM_RESOLUTION, HISTOGRAM_RESOLUTION).astype(np.intp),
+                                      minlength=HISTOGRAM_RESOLUTION + 1)
+        self.total += float(values.sum())
+        self.total_squares += float(np.dot(values, values))
+        self.peak = max(self.peak, float(values.max()))
+
+    def report(self, count):
+        cumulative = np.cumsum(self.histogram)
+        percentiles = {f"p{p}": float(np.searchsorted(cumulative, count * p / 100)) / HISTOGRAM_RESOLUTION for p in PERCENTILES}
+        # The last fine bin only holds the values at or above 100%
+        coarse = self.histogram[:-1].reshape(HISTOGRAM_BINS, -1).sum(axis=1)
+        coarse[-1] += self.histogram[-1]
+        return dict(percentiles, mean=self.total / count, rms=(self.total_squares / count) ** 0.5, peak=self.peak,
+                    histogram=coarse.tolist())
+
+def _lut_grids(curves):
+    """Get the LUT curves as a shared x grid and a matrix of y when they all share one, otherwise (None, curves)."""
+    x = curves[0][0]
+    if all(np.array_equal(curve_x, x) for curve_x, _ in curves) and np.all(np.diff(x) > 0):
+        return x, np.vstack([curve_y for _, curve_y in curves])
+    return None, curves
+
+def replay(chunks, named_luts, scale=1.0, sample_rate=1000.0):
+    """Apply every LUT to a signal in one pass over its chunks, as the games do, and measure the results.
+
+    The absolute force divided by scale, clamped to 1, is the LUT input, the sign passing through
+    unchanged. named_luts are (name, lut) pairs. Return a dict with the "samples", the "duration" in seconds, the "input"
+    distribution with the share of "saturated" samples (at or above full scale), and one dict per
+    LUT in "luts" with its output distribution, the share of samples "clipped" at 100% output, the
+    share and "deadzone_time" of the inputs inside the deadzone that the LUT compensates
+    (below its output just after 0), and its "peak_output".
+    """
+    names = [name for name, _ in named_luts]
+    # The curves as written to the .lut files: 0|0, then the jump to the deadzone
+    curves = [get_file_curve(lut) for _, lut in named_luts]
+    grid_x, grid_y = _lut_grids(curves)
+    # Evenly spaced grids, as generated, find the interval of each sample without a search
+    uniform = grid_x is not None and np.allclose(np.diff(grid_x), (grid_x[-1] - grid_x[0]) / (len(grid_x) - 1), rtol=1e-6, atol=0)
+    deadzones = [get_deadzone_intercept(lut.x, lut.y) for _, lut in named_luts]
+    input_distribution = _Distribution()
+    output_distributions = [_Distribution() for _ in named_luts]
+    clipped = np.zeros(len(named_luts), dtype=np.int64)
+    in_deadzone = np.zeros(len(named_luts), dtype=np.int64)
+    saturated = 0
+    count = 0
+
+    for chunk in chunks:
+        if not np.all(np.isfinite(chunk)):
+            bad = count + int(np.flatnonzero(~np.isfinite(chunk))[0])
+            raise ValueError(f"The signal has a non-finite sample ({chunk[bad - count]}) at sample {bad}.")
+        x = np.abs(chunk) / scale
+        saturated += int(np.count_nonzero(x >= 1.0))
+        x = np.minimum(x, 1.0)
+        input_distribution.add(x)
+        count += len(x)
+        if grid_x is not None:
+            # One search for all the LUTs, then a gather and a blend per LUT row
+            if uniform:
+                index = np.minimum(((x - grid_x[0]) * ((len(grid_x) - 1) / (grid_x[-1] - grid_x[0]))).astype(np.intp), len(grid_x) - 2)
+            else:
+                index = np.clip(np.searchsorted(grid_x, x, side="right") - 1, 0, len(grid_x) - 2)
+            fraction = (x - grid_x[index]) / (grid_x[index + 1] - grid_x[index])
+            outputs = grid_y[:, index] * (1.0 - fraction) + grid_y[:, index + 1] * fraction
+        else:
+            outputs = np.vstack([np.interp(x, curve_x, curve_y) for curve_x, curve_y in grid_y])
+        for row, output in enumerate(outputs):
+            output_distributions[row].add(output)
+            clipped[row] += np.count_nonzero(output >= 1.0)
+            in_deadzone[row] += np.count_nonzero(x < deadzones[row])
+
+    if count == 0:
+        raise ValueError("The signal has no samples.")
+    luts = []
+    for row, name in enumerate(names):
+        luts.append({
+            "name": name,
+            "output": output_distributions[row].report(count),
+            "clipped": clipped[row] / count,
+            "deadzone": in_deadzone[row] / count,
+            "deadzone_time": in_deadzone[row] / sample_rate,
+            "peak_output": output_distributions[row].peak
+        })
+    return {
+        "samples": count,
+        "duration": count / sample_rate,
+        "input": dict(input_distribution.report(count), saturated=saturated / count),
+        "luts": luts
+    }
+
+def format_distribution(distribution):
+    return " ".join(f"p{p} {distribution[f'p{p}'] * 100:.1f}%" for p in PERCENTILES) + f", RMS {distribution['rms'] * 100:.1f}%"
+
+def format_replay(report):
+    """Get the summary lines of a replay report."""
+    lines = [f"{report['samples']:,} samples ({report['duration']:.1f} s), input {format_distribution(report['input'])}, "
+             f"peak {report['input']['peak'] * 100:.1f}%, saturated {report['input']['saturated'] * 100:.2f}%"]
+    for lut in report["luts"]:
+        lines.append(f"{lut['name']}: output {format_distribution(lut['output'])}, peak {lut['peak_output'] * 100:.1f}%, "
+                     f"clipped {lut['clipped'] * 100:.2f}%, in deadzone {lut['deadzone'] * 100:.2f}% ({lut['deadzone_time']:.1f} s)")
+    return lines
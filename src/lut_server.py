@@ -0,0 +1,347 @@
+"""Local HTTP/JSON service generating, fitting and comparing LUTs and listing presets, built on asyncio.
+
+Endpoints:
+    GET  /                  the endpoints and the server statistics
+    GET  /lut               the LUT of deadzone, max_output and power_boost, optionally simplified
+                            within max_error (%), as .lut text or, with format=binary, as a .lutb file
+    POST /fit               the preset closest to the .lut or .lutb file sent as the body
+    POST /compare           the metrics of the LUT sent as the body against the LUT of the parameters
+    GET  /presets           the presets matching search, folder, where conditions, or the nearest to near=d,m,p
+
+Responses are cached per parameter set (and per body for /fit and /compare), and concurrent requests
+for the same uncached response wait for a single computation.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import time
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from lut_binary import MAGIC, pack_lut_binary, parse_lut_binary
+from lut_compare import compare_luts
+from lut_core import DEADZONE_RANGE, format_lut_file, generateCustomLut, MAX_OUTPUT_RANGE, POWER_BOOST_RANGE, snap_value
+from lut_fit import fit_lut
+from lut_io import parse_lut
+from lut_reduce import reduce_lut
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+RESPONSE_CACHE_SIZE = 1024
+MAX_LUT_SIZE = 100000
+MAX_BODY_SIZE = 16 * 1024 * 1024
+MAX_HEADERS = 100
+PRESETS_LIMIT = 500
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+TEXT_TYPE = "text/plain; charset=utf-8"
+BINARY_TYPE = "application/octet-stream"
+JSON_TYPE = "application/json"
+
+class HttpError(Exception):
+    """Raised to answer a request with an error status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def json_response(value, status=200):
+    return status, JSON_TYPE, json.dumps(value).encode("utf-8")
+
+def format_response(status, content_type, body, keep_alive):
+    """Get the bytes of an HTTP/1.1 response."""
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+def get_number(query, name, default=None, minimum=None, maximum=None, convert=float):
+    """Get a finite number from the query parameters, raising a 400 error if it is invalid."""
+    text = query.get(name)
+    if text is None or text == "":
+        if default is None:
+            raise HttpError(400, f"Missing parameter: {name}")
+        return default
+    try:
+        value = convert(text)
+    except ValueError:
+        raise HttpError(400, f"Invalid {name}: {text!r}")
+    if not math.isfinite(value) or (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise HttpError(400, f"{name} out of range: {text}")
+    return value
+
+def get_parameters(query):
+    """Get the normalized (deadzone, max_output, power_boost, lut_size) of a request, with the defaults and ranges of the sliders."""
+    return (snap_value(get_number(query, "deadzone", 0.0, *DEADZONE_RANGE)),
+            snap_value(get_number(query, "max_output", 100.0, *MAX_OUTPUT_RANGE)),
+            snap_value(get_number(query, "power_boost", 0.0, *POWER_BOOST_RANGE)),
+            get_number(query, "lut_size", 1000, 1, MAX_LUT_SIZE, int))
+
+async def read_line(reader):
+    """Read one line of a request head, raising a 400 error if it exceeds the stream limit."""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HttpError(400, "Request line or header too long")
+
+def parse_request_line(line):
+    """Get the (method, target, version) of a request line, raising a 400 error if it is malformed."""
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise HttpError(400, f"Invalid request line: {line.strip()[:100]!r}")
+    return tuple(parts)
+
+def get_content_length(headers):
+    """Get the body size of a request, raising a 400 error if it is invalid, or a 413 error if it is too large."""
+    text = headers.get("content-length") or "0"
+    if not (text.isascii() and text.isdigit()):
+        raise HttpError(400, f"Invalid Content-Length: {text[:100]!r}")
+    length = int(text)
+    if length > MAX_BODY_SIZE:
+        raise HttpError(413, f"The body exceeds {MAX_BODY_SIZE} bytes")
+    return length
+
+def parse_body_lut(body):
+    """Read the LUT sent as a request body, in the .lut text or the binary format."""
+    if not body:
+        raise HttpError(400, "The request body must hold a .lut or .lutb file")
+    if body.startswith(MAGIC):
+        return parse_lut_binary(body, "<request body>")
+    return parse_lut(body.decode("utf-8"), "<request body>")
+
+class Query(dict):
+    """Query parameters, giving the first value of each name, or all of them with get_all."""
+
+    def __init__(self, values):
+        super().__init__((name, value[0]) for name, value in values.items())
+        self.values_lists = values
+
+    def get_all(self, name):
+        return self.values_lists.get(name, [])
+
+class ResponseCache:
+    """Keep the most recent successful responses, computing each missing one only once for concurrent requests."""
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._responses = OrderedDict()
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._responses)
+
+    async def get(self, key, compute):
+        """Get the response of key, awaiting compute() on a miss."""
+        response = self._responses.get(key)
+        if response is not None:
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return response
+        task = self._pending.get(key)
+        if task is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            task = self._pending[key] = asyncio.ensure_future(compute())
+            task.add_done_callback(lambda task: self._finish(key, task))
+        # A client leaving must not cancel the computation awaited by the others
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        del self._pending[key]
+        if not task.cancelled() and task.exception() is None and self.maxsize > 0:
+            self._responses[key] = task.result()
+            if len(self._responses) > self.maxsize:
+                self._responses.popitem(last=False)
+
+class LutServer:
+    """Serve the endpoints, running the computations in worker threads so the event loop keeps accepting requests."""
+
+    def __init__(self, presets_dir="presets", db_path=None, cache_size=RESPONSE_CACHE_SIZE, jobs=None):
+        from preset_catalog import CATALOG_FILE
+        self.presets_dir = presets_dir
+        self.db_path = db_path or CATALOG_FILE
+        self.cache = ResponseCache(cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=jobs)
+        # The SQLite connection of the catalog belongs to the only thread using it
+        self.catalog_executor = ThreadPoolExecutor(max_workers=1)
+        self.catalog = None
+        self.requests = 0
+        self.errors = 0
+        self.started = time.time()
+        self.routes = {
+            "/": {"GET": self.get_index},
+            "/lut": {"GET": self.get_lut},
+            "/fit": {"POST": self.post_fit},
+            "/compare": {"POST": self.post_compare},
+            "/presets": {"GET": self.get_presets}
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        if self.catalog is not None:
+            self.catalog_executor.submit(self.catalog.close).result()
+        self.catalog_executor.shutdown(wait=False)
+
+    async def run(self, function, *args, executor=None):
+        return await asyncio.get_running_loop().run_in_executor(executor or self.executor, function, *args)
+
+    async def get_index(self, query, body):
+        return json_response({
+            "endpoints": ["GET /lut", "POST /fit", "POST /compare", "GET /presets"],
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "cached": len(self.cache),
+            "uptime": time.time() - self.started
+        })
+
+    async def get_lut(self, query, body):
+        parameters = get_parameters(query)
+        output_format = query.get("format", "text")
+        if output_format not in ("text", "binary"):
+            raise HttpError(400, f"Invalid format: {output_format!r}, expected text or binary")
+        max_error = get_number(query, "max_error", minimum=0.0) if query.get("max_error") else None
+
+        def compute():
+            lut = generateCustomLut(parameters[3], *parameters[:3])
+            if max_error is not None:
+                lut = reduce_lut(lut, max_error / 100)["lut"]
+            if output_format == "binary":
+                return 200, BINARY_TYPE, pack_lut_binary(lut)
+            return 200, TEXT_TYPE, format_lut_file(lut).encode("utf-8")
+        return await self.cache.get(("lut", parameters, output_format, max_error), lambda: self.run(compute))
+
+    async def post_fit(self, query, body):
+        exact = query.get("exact", "0") not in ("", "0", "false")
+
+        def compute():
+            return json_response(fit_lut(parse_body_lut(body), increment=None if exact else 0.5))
+        return await self.cache.get(("fit", hashlib.sha256(body).digest(), exact), lambda: self.run(compute))
+
+    async def post_compare(self, query, body):
+        parameters = get_parameters(query)
+
+        def compute():
+            comparison = compare_luts(generateCustomLut(parameters[3], *parameters[:3]), parse_body_lut(body))
+            return json_response(comparison["metrics"][0])
+        return await self.cache.get(("compare", parameters, hashlib.sha256(body).digest()), lambda: self.run(compute))
+
+    async def get_presets(self, query, body):
+        from preset_catalog import parse_conditions
+        try:
+            conditions = [condition for text in query.get_all("where") for condition in parse_conditions(text)]
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        near = query.get("near")
+        if near is not None:
+            try:
+                near = [float(value) for value in near.split(",")]
+            except ValueError:
+                near = []
+            if len(near) != 3:
+                raise HttpError(400, "near must be deadzone,max_output,power_boost")
+        limit = get_number(query, "limit", PRESETS_LIMIT, 1, None, int)
+
+        def search():
+            from preset_catalog import PresetCatalog
+            if self.catalog is None:
+                self.catalog = PresetCatalog(self.presets_dir, self.db_path)
+            # Only the changed files are read again
+            self.catalog.refresh()
+            if near is not None:
+                rows = self.catalog.nearest(*near, count=limit)
+            else:
+                rows = self.catalog.query(query.get("search"), query.get("folder"), conditions, limit)
+            return json_response({"presets": [dict(row) for row in rows], "count": self.catalog.count()})
+        # The library changes on disk, the presets are searched again for every request
+        return await self.run(search, executor=self.catalog_executor)
+
+    async def handle_request(self, method, target, body):
+        """Get the (status, content type, body) response of a request."""
+        url = urlsplit(target)
+        methods = self.routes.get(url.path.rstrip("/") or "/")
+        if methods is None:
+            raise HttpError(404, f"Unknown endpoint: {url.path}")
+        handler = methods.get(method)
+        if handler is None:
+            raise HttpError(405, f"{url.path} only accepts {', '.join(methods)}")
+        query = Query(parse_qs(url.query, keep_blank_values=True))
+        try:
+            return await handler(query, body)
+        except HttpError:
+            raise
+        except ValueError as e:
+            # Invalid LUT bodies and parameter combinations
+            raise HttpError(400, str(e))
+
+    async def handle_connection(self, reader, writer):
+        """Answer the requests of one connection, keeping it open between requests unless asked otherwise."""
+        try:
+            while True:
+                request_line = b""
+                keep_alive = False
+                try:
+                    request_line = await read_line(reader)
+                    if not request_line.strip():
+                        break
+                    method, target, version = parse_request_line(request_line)
+                    headers = {}
+                    while True:
+                        line = await read_line(reader)
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        if len(headers) >= MAX_HEADERS:
+                            raise HttpError(400, "Too many headers")
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    if "transfer-encoding" in headers:
+                        raise HttpError(411, "Send the body with a Content-Length")
+                    length = get_content_length(headers)
+                    # Only a request read entirely leaves the connection usable for the next one
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                    body = await reader.readexactly(length) if length > 0 else b""
+                    self.requests += 1
+                    response = await self.handle_request(method, target, body)
+                except HttpError as e:
+                    self.errors += 1
+                    response = json_response({"error": str(e)}, e.status)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    raise
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Error handling {request_line[:200]!r}: {e}")
+                    response = json_response({"error": str(e)}, 500)
+                    keep_alive = False
+                writer.write(format_response(*response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening, returning the asyncio server."""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, presets_dir="presets", db_path=None, cache_size=RESPONSE_CACHE_SIZE, jobs=None):
+    """Run the server until cancelled."""
+    lut_server = LutServer(presets_dir, db_path, cache_size, jobs)
+    server = await lut_server.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving on http://{address[0]}:{address[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        lut_server.close()
@@ -0,0 +1,87 @@
+"""Generate the LUTs of a whole grid of parameters and store them as one compressed array file."""
+import os
+import time
+import zipfile
+
+import numpy as np
+
+from lut_core import generateCustomLut, generateCustomLutArrays
+from lut_io import write_lut
+
+CHUNK_VALUES = 1 << 16  # values computed at once, small enough to stay in the CPU cache
+
+def parameter_axis(start, stop, step):
+    """Get the values from start to stop included, every step."""
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return np.round(start + np.arange(count, dtype=np.float64) * step, 6)
+
+def iter_sweep(lut_size, deadzones, max_outputs, power_boosts, chunk_size=None):
+    """Generate the LUT outputs of every parameter combination, chunk by chunk.
+
+    The combinations are ordered like np.meshgrid(deadzones, max_outputs, power_boosts, indexing="ij").
+    Yield (start, y) where y holds one row of lut_size + 1 outputs per combination from start on.
+    """
+    grid = np.stack(np.meshgrid(deadzones, max_outputs, power_boosts, indexing="ij"), axis=-1).reshape(-1, 3)
+    chunk_size = chunk_size or max(1, CHUNK_VALUES // (lut_size + 1))
+    for start in range(0, len(grid), chunk_size):
+        chunk = grid[start:start + chunk_size]
+        _, y = generateCustomLutArrays(lut_size, chunk[:, 0:1], chunk[:, 1:2], chunk[:, 2:3])
+        yield start, y
+
+def _write_npy(archive, name, array):
+    with archive.open(name + ".npy", "w", force_zip64=True) as file:
+        np.lib.format.write_array(file, np.asanyarray(array))
+
+def write_sweep(file_path, lut_size, deadzones, max_outputs, power_boosts, dtype=np.float32, chunk_size=None, compresslevel=1):
+    """Write the LUTs of the parameter grid to a compressed .npz file, streaming the chunks.
+
+    The file holds "y" of shape (deadzones, max_outputs, power_boosts, lut_size + 1), the inputs "x",
+    the parameter axes "deadzone", "max_output" and "power_boost", and "lut_size". It loads with np.load.
+    Compression dominates the run time, so the fastest deflate level is the default; 0 stores without compression.
+    Return a summary dict with the number of curves, points, bytes written and the elapsed time.
+    """
+    deadzones = np.asarray(deadzones, dtype=np.float64)
+    max_outputs = np.asarray(max_outputs, dtype=np.float64)
+    power_boosts = np.asarray(power_boosts, dtype=np.float64)
+    dtype = np.dtype(dtype)
+    shape = (len(deadzones), len(max_outputs), len(power_boosts), lut_size + 1)
+    x, _ = generateCustomLutArrays(lut_size, 0, 100, 0)
+
+    start_time = time.perf_counter()
+    compression = zipfile.ZIP_DEFLATED if compresslevel else zipfile.ZIP_STORED
+    with zipfile.ZipFile(file_path, "w", compression=compression, compresslevel=compresslevel or None) as archive:
+        for name, array in (("x", x), ("deadzone", deadzones), ("max_output", max_outputs), ("power_boost", power_boosts), ("lut_size", lut_size)):
+            _write_npy(archive, name, array)
+        # The outputs are written chunk by chunk, so only one chunk is ever in memory
+        with archive.open("y.npy", "w", force_zip64=True) as file:
+            np.lib.format.write_array_header_1_0(file, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape})
+            for _, y in iter_sweep(lut_size, deadzones, max_outputs, power_boosts, chunk_size):
+                file.write(y.astype(dtype, copy=False).tobytes())
+    elapsed = time.perf_counter() - start_time
+
+    curves = shape[0] * shape[1] * shape[2]
+    return {"curves": curves, "points": curves * shape[3], "bytes_written": os.path.getsize(file_path), "elapsed": elapsed}
+
+def nearest_grid_point(point, deadzones, max_outputs, power_boosts):
+    """Get the grid values closest to a (deadzone, max_output, power_boost) point."""
+    return tuple(float(axis[np.abs(np.asarray(axis) - value).argmin()]) for value, axis in zip(point, (deadzones, max_outputs, power_boosts)))
+
+def get_lut_file_name(deadzone, max_output, power_boost):
+    return f"deadzone_{deadzone:g}_max_output_{max_output:g}_power_boost_{power_boost:g}.lut"
+
+def write_sweep_luts(output_dir, lut_size, points, deadzones, max_outputs, power_boosts):
+    """Write the .lut file of each selected point, snapped to the grid, and return their paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    file_paths = []
+    for point in points:
+        deadzone, max_output, power_boost = nearest_grid_point(point, deadzones, max_outputs, power_boosts)
+        file_path = os.path.join(output_dir, get_lut_file_name(deadzone, max_output, power_boost))
+        write_lut(file_path, generateCustomLut(lut_size, deadzone, max_output, power_boost))
+        file_paths.append(file_path)
+    return file_paths
+
+def format_sweep_summary(summary):
+    """Get a human readable throughput summary of a sweep."""
+    elapsed = max(summary["elapsed"], 1e-9)
+    return (f"Generated {summary['curves']:,} curves ({summary['points']:,} points) in {summary['elapsed']:.3f} s: "
+            f"{summary['curves'] / elapsed:,.0f} curves/s, {summary['bytes_written'] / 1e6:.2f} MB written")
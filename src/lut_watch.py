@@ -0,0 +1,270 @@
+"""Keep the .lut and ff_post_process.ini outputs of preset trees up to date as the presets change."""
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+from lut_batch import find_preset_stats, get_output_folder
+from lut_core import format_ff_post_process_ini, format_lut_file, generateCustomLut, read_preset
+
+MANIFEST_FILE = ".ffm_manifest"
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+class PresetSync:
+    """Regenerate the outputs of changed presets only, tracking what was written in a manifest.
+
+    A preset whose size and mtime did not change is skipped after a stat. Otherwise its content hash
+    is compared with the manifest, and its outputs are written only when their content changed or
+    the file on disk is missing or was modified by someone else.
+    """
+
+    def __init__(self, presets_dirs, output_dir, lut_size=1000, manifest_path=None):
+        self.presets_dirs = [os.path.abspath(presets_dir) for presets_dir in presets_dirs]
+        self.output_dir = output_dir
+        self.lut_size = lut_size
+        self.manifest_path = manifest_path or os.path.join(output_dir, MANIFEST_FILE)
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading manifest, regenerating everything: {e}")
+            return {}
+        return manifest.get("presets", {}) if manifest.get("lut_size") == self.lut_size else {}
+
+    def save_manifest(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"lut_size": self.lut_size, "presets": self.manifest}, f)
+        os.replace(temp_path, self.manifest_path)
+
+    def get_presets_dir(self, preset_path):
+        for presets_dir in self.presets_dirs:
+            if preset_path.startswith(presets_dir + os.sep):
+                return presets_dir
+        return None
+
+    def sync(self, preset_paths=None):
+        """Bring the outputs up to date and return the counts of the cycle.
+
+        With preset_paths, only those presets are checked (changed, created or deleted ones);
+        otherwise the whole trees are scanned.
+        """
+        start_time = time.perf_counter()
+        summary = {"presets": 0, "regenerated": 0, "skipped": 0, "unchanged": 0, "removed": 0, "errors": []}
+        if preset_paths is None:
+            stats = {}
+            for presets_dir in self.presets_dirs:
+                stats.update(find_preset_stats(presets_dir))
+            removed = [preset_path for preset_path in self.manifest if preset_path not in stats]
+        else:
+            stats = {}
+            removed = []
+            for preset_path in map(os.path.abspath, preset_paths):
+                try:
+                    stats[preset_path] = os.stat(preset_path)
+                except FileNotFoundError:
+                    if preset_path in self.manifest:
+                        removed.append(preset_path)
+
+        changed = bool(removed)
+        for preset_path in removed:
+            del self.manifest[preset_path]
+        summary["removed"] = len(removed)
+
+        for preset_path, stat in sorted(stats.items()):
+            presets_dir = self.get_presets_dir(preset_path)
+            if presets_dir is None:
+                continue
+            summary["presets"] += 1
+            try:
+                changed |= self.sync_preset(preset_path, presets_dir, stat, summary)
+            except Exception as e:
+                summary["errors"].append((preset_path, str(e)))
+
+        if changed:
+            self.save_manifest()
+        summary["elapsed"] = time.perf_counter() - start_time
+        return summary
+
+    def sync_preset(self, preset_path, presets_dir, stat, summary):
+        """Bring the outputs of one preset up to date, returning whether the manifest changed."""
+        entry = self.manifest.get(preset_path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size and self.outputs_intact(entry):
+            summary["unchanged"] += 1
+            return False
+
+        with open(preset_path, "rb") as f:
+            preset_hash = hash_bytes(f.read())
+        if entry and entry["hash"] == preset_hash and self.outputs_intact(entry):
+            # Touched but not modified, as after a checkout
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            summary["skipped"] += len(entry["outputs"])
+            return True
+
+        preset = read_preset(preset_path)
+        lut = generateCustomLut(self.lut_size, preset["deadzone"], preset["max_output"], preset["power_boost"])
+        lut_name = os.path.splitext(os.path.basename(preset_path))[0] + ".lut"
+        output_folder = get_output_folder(preset_path, presets_dir, self.output_dir)
+        contents = {
+            os.path.join(output_folder, lut_name): format_lut_file(lut),
+            os.path.join(output_folder, "ff_post_process.ini"): format_ff_post_process_ini(lut_name)
+        }
+
+        previous_outputs = entry["outputs"] if entry else {}
+        outputs = {}
+        for output_path, content in contents.items():
+            content_hash = hash_bytes(content.encode())
+            previous = previous_outputs.get(output_path)
+            if previous and previous["hash"] == content_hash and self.output_intact(output_path, previous):
+                outputs[output_path] = previous
+                summary["skipped"] += 1
+                continue
+            os.makedirs(output_folder, exist_ok=True)
+            with open(output_path, "w") as file:
+                file.write(content)
+            outputs[output_path] = {"hash": content_hash, "mtime_ns": os.stat(output_path).st_mtime_ns}
+            summary["regenerated"] += 1
+
+        self.manifest[preset_path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": preset_hash, "outputs": outputs}
+        return True
+
+    def output_intact(self, output_path, output):
+        """Check that an output file is still the one written, without reading it."""
+        try:
+            return os.stat(output_path).st_mtime_ns == output["mtime_ns"]
+        except FileNotFoundError:
+            return False
+
+    def outputs_intact(self, entry):
+        return all(self.output_intact(output_path, output) for output_path, output in entry["outputs"].items())
+
+def format_cycle(summary):
+    """Get a one line summary of a sync cycle."""
+    text = (f"{summary['presets']} preset(s) checked in {summary['elapsed'] * 1000:.1f} ms: "
+            f"{summary['regenerated']} file(s) regenerated, {summary['skipped']} identical file(s) skipped, "
+            f"{summary['unchanged']} unchanged preset(s), {summary['removed']} removed")
+    if summary["errors"]:
+        text += f", {len(summary['errors'])} error(s)"
+    return text
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """Report the files changed in directory trees, using the Linux inotify API through ctypes."""
+
+    def __init__(self, directories):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        for directory in directories:
+            self.add_tree(directory)
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux") and ctypes.util.find_library("c") is not None
+
+    def add_tree(self, directory):
+        for folder, _, _ in os.walk(directory):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = folder
+
+    def read(self, timeout):
+        """Wait for changes, returning the changed .json paths and whether a full scan is needed."""
+        paths = set()
+        rescan = False
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return paths, rescan
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return paths, rescan
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                rescan = True
+                continue
+            folder = self.watches.get(wd)
+            if folder is None:
+                continue
+            if mask & IN_DELETE_SELF:
+                del self.watches[wd]
+                rescan = True
+            elif mask & IN_ISDIR:
+                # A folder appeared or moved: watch it and look at everything it holds
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(os.path.join(folder, os.fsdecode(name)))
+                rescan = True
+            elif name.lower().endswith(b".json"):
+                paths.add(os.path.join(folder, os.fsdecode(name)))
+        return paths, rescan
+
+    def close(self):
+        os.close(self.fd)
+
+def report_cycle(summary, report=print):
+    for preset_path, error in summary["errors"]:
+        report(f"Error processing {preset_path}: {error}")
+    report(format_cycle(summary))
+
+def watch(preset_sync, interval=1.0, debounce=0.2, use_inotify=None, report=print):
+    """Sync once, then sync again on every change until interrupted.
+
+    Changes come from inotify when available, otherwise from a stat-only scan every interval seconds.
+    """
+    report_cycle(preset_sync.sync(), report)
+    use_inotify = InotifyWatcher.available() if use_inotify is None else use_inotify
+    if not use_inotify:
+        report(f"Polling every {interval:g} s")
+        while True:
+            time.sleep(interval)
+            summary = preset_sync.sync()
+            # Every preset with a new mtime or size is reported, even when all its files were skipped
+            if summary["presets"] > summary["unchanged"] or summary["removed"]:
+                report_cycle(summary, report)
+
+    watcher = InotifyWatcher(preset_sync.presets_dirs)
+    report("Watching with inotify")
+    try:
+        while True:
+            paths, rescan = watcher.read(None)
+            # Editors save in several steps, so wait until the events stop before syncing
+            while True:
+                more_paths, more_rescan = watcher.read(debounce)
+                if not more_paths and not more_rescan:
+                    break
+                paths |= more_paths
+                rescan |= more_rescan
+            report_cycle(preset_sync.sync(None if rescan else paths), report)
+    finally:
+        watcher.close()
@@ -0,0 +1,159 @@
+"""Searchable index of a preset library, kept in a local SQLite database and refreshed by mtime."""
+import os
+import re
+import sqlite3
+
+from lut_batch import find_preset_stats
+from lut_core import DEADZONE_RANGE, MAX_OUTPUT_RANGE, POWER_BOOST_RANGE, read_preset
+
+CATALOG_FILE = "PresetCatalog.db"
+PARAMETERS = ("deadzone", "max_output", "power_boost")
+# Slider ranges, used to weigh the parameters equally in similarity searches
+PARAMETER_SPANS = {parameter: high - low for parameter, (low, high) in zip(PARAMETERS, (DEADZONE_RANGE, MAX_OUTPUT_RANGE, POWER_BOOST_RANGE))}
+OPERATORS = ("<=", ">=", "<", ">", "=")
+CONDITION_PATTERN = re.compile(r"^\s*(deadzone|max[ _]output|power[ _]boost)\s*(<=|>=|<|>|=)\s*(-?\d+(?:\.\d*)?|-?\.\d+)\s*$", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    deadzone REAL NOT NULL,
+    max_output REAL NOT NULL,
+    power_boost REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS presets_deadzone ON presets (deadzone);
+CREATE INDEX IF NOT EXISTS presets_max_output ON presets (max_output);
+CREATE INDEX IF NOT EXISTS presets_power_boost ON presets (power_boost);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def escape_like(text):
+    """Escape the LIKE wildcards of a text matched literally."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def parse_condition(text):
+    """Parse a condition such as "deadzone >= 5" into a (parameter, operator, value) tuple."""
+    match = CONDITION_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"Invalid condition {text!r}, expected for example \"deadzone >= 5\" or \"power boost > 0\".")
+    return match.group(1).lower().replace(" ", "_"), match.group(2), float(match.group(3))
+
+def parse_conditions(text):
+    """Parse comma separated conditions, such as "deadzone >= 5, deadzone <= 10, power boost > 0"."""
+    return [parse_condition(part) for part in text.split(",") if part.strip()]
+
+class PresetCatalog:
+    """Index the presets of a folder tree by name, folder and parameters.
+
+    Only the presets whose size or mtime changed since the last refresh are read again. The
+    database records the folder it indexes and starts over when opened for another one.
+    """
+
+    def __init__(self, presets_dir="./presets", db_path=CATALOG_FILE):
+        self.presets_dir = os.path.abspath(presets_dir)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        self.set_root()
+
+    def set_root(self):
+        """Clear the index if it was built for another presets folder, its paths being relative to it."""
+        root = os.path.normcase(self.presets_dir)
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+        if row is not None and row["value"] == root:
+            return
+        with self.connection:
+            self.connection.execute("DELETE FROM presets")
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (root,))
+
+    def close(self):
+        self.connection.close()
+
+    def refresh(self):
+        """Update the index from the files on disk, returning the counts of added, updated, removed and failed presets."""
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "errors": []}
+        stats = find_preset_stats(self.presets_dir) if os.path.isdir(self.presets_dir) else {}
+        known = {row["path"]: (row["mtime_ns"], row["size"]) for row in self.connection.execute("SELECT path, mtime_ns, size FROM presets")}
+
+        rows = []
+        for file_path, stat in stats.items():
+            path = os.path.relpath(file_path, self.presets_dir).replace(os.sep, "/")
+            previous = known.pop(path, None)
+            if previous == (stat.st_mtime_ns, stat.st_size):
+                counts["unchanged"] += 1
+                continue
+            try:
+                preset = read_preset(file_path)
+            except Exception as e:
+                counts["errors"].append((file_path, str(e)))
+                continue
+            folder, file_name = path.rpartition("/")[::2]
+            rows.append((path, os.path.splitext(file_name)[0], folder, stat.st_mtime_ns, stat.st_size,
+                         preset["deadzone"], preset["max_output"], preset["power_boost"]))
+            counts["updated" if previous else "added"] += 1
+
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO presets VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            # Whatever was not found on disk anymore was deleted, as well as the presets that failed to load
+            removed = list(known) + [os.path.relpath(file_path, self.presets_dir).replace(os.sep, "/") for file_path, _ in counts["errors"]]
+            self.connection.executemany("DELETE FROM presets WHERE path = ?", [(path,) for path in removed])
+        counts["removed"] = len(known)
+        return counts
+
+    def get_path(self, path):
+        """Get the file path of a preset from its catalog path."""
+        return os.path.join(self.presets_dir, *path.split("/"))
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM presets").fetchone()[0]
+
+    def query(self, text=None, folder=None, conditions=(), limit=None):
+        """Get the presets matching all the filters, sorted by folder and name.
+
+        text matches part of the name or folder, folder selects a folder and its sub-folders and
+        conditions is a list of (parameter, operator, value) tuples, see parse_conditions.
+        """
+        clauses = []
+        parameters = []
+        if text:
+            clauses.append("(name LIKE ? ESCAPE '\\' OR folder LIKE ? ESCAPE '\\')")
+            pattern = "%" + escape_like(text) + "%"
+            parameters += [pattern, pattern]
+        if folder:
+            folder = folder.strip("/").replace(os.sep, "/")
+            clauses.append("(folder = ? OR folder LIKE ? ESCAPE '\\')")
+            parameters += [folder, escape_like(folder) + "/%"]
+        for parameter, operator, value in conditions:
+            if parameter not in PARAMETERS or operator not in OPERATORS:
+                raise ValueError(f"Invalid condition: {parameter} {operator} {value}")
+            clauses.append(f"{parameter} {operator} ?")
+            parameters.append(value)
+
+        sql = "SELECT * FROM presets"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY folder, name"
+        if limit:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return self.connection.execute(sql, parameters).fetchall()
+
+    def nearest(self, deadzone, max_output, power_boost, count=5):
+        """Get the presets closest to the given values, each parameter scaled by its slider range."""
+        distance = " + ".join(f"(({parameter} - ?) / {PARAMETER_SPANS[parameter]}) * (({parameter} - ?) / {PARAMETER_SPANS[parameter]})" for parameter in PARAMETERS)
+        parameters = [deadzone, deadzone, max_output, max_output, power_boost, power_boost, count]
+        sql = f"SELECT *, {distance} AS distance FROM presets ORDER BY distance, folder, name LIMIT ?"
+        return self.connection.execute(sql, parameters).fetchall()
+
+def format_preset_row(row):
+    """Get a one line description of a preset row."""
+    text = f"{row['path']}: deadzone {row['deadzone']:g}, max output {row['max_output']:g}, power boost {row['power_boost']:g}"
+    if "distance" in row.keys():
+        text += f" (distance {row['distance'] ** 0.5:.3f})"
+    return text
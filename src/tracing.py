@@ -0,0 +1,272 @@
+"""Opt-in timing of the hot paths, with per-span histograms and Chrome trace-event export.
+
+Tracing is enabled by the FFM_TRACE environment variable (set to the trace file path, or to 1 for
+ffm_trace.json) or by the --trace option of the GUI and of ffm_cli. The trace file opens in
+chrome://tracing or https://ui.perfetto.dev. When tracing is disabled a traced call only costs one
+extra call and an attribute check, about 0.2 us.
+
+Only the main process writes the report and the trace file. The workers of process pools created
+with get_worker_initializer write their spans to files that the main process merges when it finishes.
+"""
+import atexit
+import functools
+import glob
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from collections import deque
+
+ENV_VAR = "FFM_TRACE"
+DEFAULT_TRACE_FILE = "ffm_trace.json"
+# Upper bounds of the histogram buckets, in milliseconds
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+
+class SpanStats:
+    """Duration histogram of one span name."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS_MS)
+
+    def add(self, duration_ms):
+        self.count += 1
+        self.total += duration_ms
+        self.max = max(self.max, duration_ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if duration_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, fraction):
+        """Get the upper bound of the bucket holding the given fraction of the durations."""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+class Tracer:
+    """Record timed spans as trace events and duration histograms."""
+
+    def __init__(self, max_events=1000000):
+        self.enabled = False
+        self.output_path = None
+        self.events = deque(maxlen=max_events)
+        self.stats = {}
+        self._start = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._thread_names = {}
+        # Events of the worker processes, as (pid, events, thread names)
+        self.worker_events = []
+        self.worker_dir = None
+        self.is_worker = False
+
+    def enable(self, output_path=DEFAULT_TRACE_FILE):
+        """Start recording, writing the trace and printing the report when the program exits."""
+        if not self.enabled:
+            atexit.register(self.finish)
+        self.enabled = True
+        self.output_path = output_path
+
+    def get_worker_dir(self):
+        """Get the folder the pool workers write their spans to, None if tracing is disabled."""
+        if self.enabled and self.worker_dir is None:
+            self.worker_dir = tempfile.mkdtemp(prefix="ffm_trace_")
+        return self.worker_dir if self.enabled else None
+
+    def get_worker_initializer(self):
+        """Get the (initializer, initargs) of a process pool whose workers record their spans for this tracer."""
+        return init_worker, (self.get_worker_dir(),)
+
+    def start_worker(self, worker_dir):
+        """Record the spans of this worker process into worker_dir, without any report or trace file."""
+        self.clear()
+        self.worker_events = []
+        self.enabled = worker_dir is not None
+        self.output_path = None
+        self.is_worker = True
+        self._pid = os.getpid()
+        if self.enabled:
+            # Workers exit through multiprocessing, which runs its finalizers but not always atexit
+            multiprocessing.util.Finalize(self, self.write_worker_file, args=(worker_dir,), exitpriority=10)
+
+    def write_worker_file(self, worker_dir):
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self._thread_names)
+            stats = {name: [span_stats.count, span_stats.total, span_stats.max, span_stats.buckets] for name, span_stats in self.stats.items()}
+        if not stats:
+            return
+        with open(os.path.join(worker_dir, f"{self._pid}.json"), "w") as f:
+            json.dump({"pid": self._pid, "events": events, "threads": thread_names, "stats": stats}, f)
+
+    def merge_worker_files(self):
+        """Add the spans written by the workers to this tracer, and remove their files."""
+        if self.worker_dir is None:
+            return
+        for file_path in sorted(glob.glob(os.path.join(self.worker_dir, "*.json"))):
+            try:
+                with open(file_path, "r") as f:
+                    worker = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error reading worker trace {file_path}: {e}")
+                continue
+            with self._lock:
+                self.worker_events.append((worker["pid"], [tuple(event) for event in worker["events"]],
+                                           {int(tid): name for tid, name in worker["threads"].items()}))
+                for name, (count, total, maximum, buckets) in worker["stats"].items():
+                    stats = self.stats.get(name)
+                    if stats is None:
+                        stats = self.stats[name] = SpanStats()
+                    stats.count += count
+                    stats.total += total
+                    stats.max = max(stats.max, maximum)
+                    stats.buckets = [a + b for a, b in zip(stats.buckets, buckets)]
+        shutil.rmtree(self.worker_dir, ignore_errors=True)
+        self.worker_dir = None
+
+    def record(self, name, start_ns, end_ns):
+        duration_ms = (end_ns - start_ns) / 1e6
+        tid = threading.get_ident()
+        with self._lock:
+            if tid not in self._thread_names:
+                self._thread_names[tid] = threading.current_thread().name
+            self.events.append((name, start_ns, end_ns, tid))
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats()
+            stats.add(duration_ms)
+
+    def span(self, name):
+        """Get a context manager timing its block under the given name."""
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+            self.stats.clear()
+            self.worker_events.clear()
+
+    def get_trace(self):
+        """Get the recorded spans, with those of the merged workers, as a Chrome trace-event document."""
+        with self._lock:
+            processes = [(self._pid, list(self.events), dict(self._thread_names))] + list(self.worker_events)
+        trace_events = []
+        # perf_counter is system-wide, the spans of every process share the time base of this one
+        for pid, events, thread_names in processes:
+            trace_events.extend({
+                "name": name,
+                "cat": "ffm",
+                "ph": "X",
+                "ts": (start_ns - self._start) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": pid,
+                "tid": tid
+            } for name, start_ns, end_ns, tid in events)
+            for tid in {event[3] for event in events}:
+                trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                                     "args": {"name": thread_names.get(tid, str(tid))}})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, file_path):
+        with open(file_path, "w") as f:
+            json.dump(self.get_trace(), f)
+
+    def format_report(self):
+        """Get a table of the span durations, one row per span name."""
+        lines = [f"{'span':<48} {'count':>7} {'total ms':>10} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9}"]
+        with self._lock:
+            stats = sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True)
+        for name, span_stats in stats:
+            lines.append(f"{name:<48} {span_stats.count:>7} {span_stats.total:>10.2f} {span_stats.total / span_stats.count:>9.3f} "
+                         f"{span_stats.percentile(0.5):>8.2f} {span_stats.percentile(0.95):>8.2f} {span_stats.max:>9.3f}")
+        return "\n".join(lines)
+
+    def finish(self):
+        """Print the report and write the trace file, in the main process only."""
+        if self.is_worker:
+            return
+        self.merge_worker_files()
+        if not self.stats:
+            return
+        print(self.format_report())
+        if self.output_path:
+            try:
+                self.export_chrome_trace(self.output_path)
+                print(f"Trace written to: {self.output_path}")
+            except OSError as e:
+                print(f"Error writing trace file: {e}")
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+tracer = Tracer()
+
+def traced(function=None, name=None):
+    """Decorate a function so that its calls are recorded as spans while tracing is enabled."""
+    if function is None:
+        return lambda function: traced(function, name)
+    span_name = name or function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not tracer.enabled:
+            return function(*args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            tracer.record(span_name, start, time.perf_counter_ns())
+    return wrapper
+
+def init_worker(worker_dir):
+    """Initializer of the process pool workers, see Tracer.get_worker_initializer."""
+    tracer.start_worker(worker_dir)
+
+def enable_from_env():
+    """Enable tracing if the FFM_TRACE environment variable is set, in the main process only.
+
+    Spawned workers import this module again and inherit the variable, they are enabled by
+    init_worker instead.
+    """
+    value = os.environ.get(ENV_VAR)
+    if value and value != "0" and multiprocessing.parent_process() is None:
+        tracer.enable(DEFAULT_TRACE_FILE if value == "1" else value)
+
+enable_from_env()
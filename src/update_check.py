@@ -0,0 +1,97 @@
+"""Check the latest released version without blocking the caller, caching the answer on disk."""
+import json
+import os
+import threading
+import time
+
+from concurrent.futures import Future
+
+from tracing import traced
+
+RELEASES_URL = "https://api.github.com/repos/Luke460/force-feedback-manager/releases/latest"
+
+class UpdateChecker:
+    """Get the latest release tag, revalidating a cached answer with ETag / If-None-Match."""
+
+    def __init__(self, url=RELEASES_URL, cache_path="UpdateCache.json", timeout=5.0, ttl=6 * 3600, offline=False):
+        self.url = url
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.ttl = ttl
+        self.offline = offline
+        self._lock = threading.Lock()
+
+    def read_cache(self):
+        """Get the cached answer for this url, or an empty dict."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading update cache: {e}")
+            return {}
+        return cache if cache.get("url") == self.url else {}
+
+    def write_cache(self, cache):
+        if not self.cache_path:
+            return
+        cache["url"] = self.url
+        try:
+            with open(self.cache_path, "w") as f:
+                json.dump(cache, f, indent=4)
+        except OSError as e:
+            print(f"Error writing update cache: {e}")
+
+    @traced
+    def check(self, force=False):
+        """Get the latest release tag, or None if it cannot be found.
+
+        A cached answer younger than the TTL is returned without any request, unless force is set.
+        Otherwise the cached ETag is sent so that an unchanged release costs a 304 response only.
+        """
+        with self._lock:
+            cache = self.read_cache()
+            if self.offline:
+                return cache.get("tag_name")
+            if not force and cache.get("tag_name") and time.time() - cache.get("checked_at", 0) < self.ttl:
+                return cache["tag_name"]
+
+            import requests
+
+            headers = {"Accept": "application/vnd.github+json"}
+            if cache.get("etag") and cache.get("tag_name"):
+                headers["If-None-Match"] = cache["etag"]
+            try:
+                response = requests.get(self.url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"Error checking the latest version: {e}")
+                return cache.get("tag_name")
+
+            if response.status_code == 304:
+                cache["checked_at"] = time.time()
+                self.write_cache(cache)
+                return cache.get("tag_name")
+            if response.status_code == 200:
+                try:
+                    tag_name = response.json()["tag_name"]
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"Error reading the latest version: {e}")
+                    return cache.get("tag_name")
+                self.write_cache({"tag_name": tag_name, "etag": response.headers.get("ETag"), "checked_at": time.time()})
+                return tag_name
+            print(f"Unexpected response checking the latest version: {response.status_code}")
+            return cache.get("tag_name")
+
+    def check_in_background(self, force=False):
+        """Run check in a daemon thread and return a Future with its result."""
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(self.check(force))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="update-check", daemon=True).start()
+        return future
@@ -0,0 +1,97 @@
+"""Check the binary LUT round trip and the .lut text written back from binary files."""
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lut_binary import pack_lut_binary, parse_lut_binary, read_lut_binary, write_lut_binary
+from lut_core import format_lut_file, generateCustomLut
+from lut_deploy import encode_text
+from lut_io import convert_lut_file, get_text_changes, parse_lut, read_lut, write_lut
+
+HAND_MADE = "0.000|0.05000\n0.25|0.3\n1|1\n"
+
+class BinaryLutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def get_luts(self):
+        return [generateCustomLut(1000, 5.0, 110.0, 3.0), generateCustomLut(7, 12.5, 100.0, 10.0),
+                parse_lut(HAND_MADE), parse_lut("0.1|0.123456789\n0.5|0.5\n")]
+
+    def test_binary_round_trip_is_lossless(self):
+        for lut in self.get_luts():
+            for dtype in (np.float64, np.float32):
+                with self.subTest(lut=str(lut)[:30], dtype=dtype):
+                    try:
+                        data = pack_lut_binary(lut, dtype)
+                    except ValueError:
+                        self.assertIs(dtype, np.float32)
+                        continue
+                    loaded = parse_lut_binary(data)
+                    if dtype is np.float64:
+                        self.assertTrue(np.array_equal(loaded.x, lut.x) and np.array_equal(loaded.y, lut.y))
+                    self.assertEqual(str(loaded), str(lut))
+
+                    path = self.get_path("round_trip.lutb")
+                    write_lut_binary(path, lut, dtype)
+                    for use_mmap in (True, False):
+                        self.assertEqual(str(read_lut_binary(path, use_mmap=use_mmap)), str(lut))
+
+    def test_text_from_binary_is_the_save_lut_text(self):
+        for lut in self.get_luts():
+            with self.subTest(lut=str(lut)[:30]):
+                binary_path = self.get_path("lut.lutb")
+                write_lut_binary(binary_path, lut)
+                output_path, _ = convert_lut_file(binary_path, overwrite=True)
+                with open(output_path, "rb") as f:
+                    self.assertEqual(f.read(), encode_text(format_lut_file(lut)))
+
+    def test_saved_lut_converts_back_unchanged(self):
+        lut_path = self.get_path("saved.lut")
+        write_lut(lut_path, generateCustomLut(1000, 5.0, 110.0, 3.0))
+        with open(lut_path, "rb") as f:
+            saved = f.read()
+        binary_path, changes = convert_lut_file(lut_path)
+        self.assertEqual(changes, [])
+        os.remove(lut_path)
+        self.assertEqual(convert_lut_file(binary_path), (lut_path, []))
+        with open(lut_path, "rb") as f:
+            self.assertEqual(f.read(), saved)
+
+    def test_text_changes_are_reported(self):
+        generated = generateCustomLut(1000, 5.0, 110.0, 3.0)
+        self.assertEqual(get_text_changes(parse_lut(format_lut_file(generated))), [])
+        self.assertEqual(get_text_changes(generateCustomLut(1000, 0.0, 110.0, 3.0)), [])
+        # Save LUT writes the deadzone of a generated LUT as a jump from 0|0
+        self.assertEqual(len(get_text_changes(generated)), 1)
+        self.assertEqual(len(get_text_changes(parse_lut(HAND_MADE))), 1)
+        self.assertEqual(len(get_text_changes(parse_lut("0.5|0.5\n1|1\n"))), 1)
+        self.assertEqual(len(get_text_changes(parse_lut("0|0\n0.1|0.123456789\n"))), 1)
+
+    def test_existing_output_is_not_replaced(self):
+        lut_path = self.get_path("hand.lut")
+        with open(lut_path, "w") as f:
+            f.write(HAND_MADE)
+        binary_path, _ = convert_lut_file(lut_path)
+        with self.assertRaises(FileExistsError):
+            convert_lut_file(binary_path)
+        with open(lut_path, "r") as f:
+            self.assertEqual(f.read(), HAND_MADE)
+        output_path, changes = convert_lut_file(binary_path, overwrite=True)
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(str(read_lut(output_path)), "0.000|0.00000\n0.250|0.30000\n1.000|1.00000")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Pin the vectorized LUT generation to the text of the original point by point loop."""
+import itertools
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lut_core import format_lut_file, generateCustomLut, Lut, LutCache
+
+def baseline_points(lutSize, deadZone, gain, power_boost):
+    """The generateCustomLut loop of the original application, unchanged."""
+    l = lutSize
+    d = deadZone
+    s = gain
+    g = -power_boost/10
+    points = []
+    for i in range(l + 1):
+        x = i
+        y = x + (d * ((l - x) / l)) - (l - s) * (x / l) + (((((l / 2) - x) ** 2) / l) - (l / 4)) * ((g * 100) / l) * ((s / 100) - (d / 100))
+        y = min(y, 100) # limit lut value
+        points.append((round((i * 1.0) / (l * 1.0), 3), round(y * 0.01, 5)))
+    return points
+
+def baseline_text(points):
+    return "\n".join(f"{x:.3f}|{y:.5f}" for x, y in points)
+
+def baseline_file(points):
+    """The content written by Save LUT in the original application."""
+    lut_content = ["0.000|0.00000"]  # First value
+    lut_content += [f"{x:.3f}|{y:.5f}" for x, y in points if x != 0.000]
+    return "\n".join(lut_content)
+
+def get_parameter_sets(count=300, seed=1):
+    """Get the slider corners and steps, and random values in and around the slider ranges."""
+    parameter_sets = [(1000,) + values for values in itertools.product((0.0, 0.5, 15.0, 30.0), (50.0, 99.5, 100.0, 150.0), (0.0, 0.5, 5.0, 10.0))]
+    rng = random.Random(seed)
+    for _ in range(count):
+        parameter_sets.append((rng.choice((1, 2, 3, 10, 100, 999, 1000, 1001, 2000)), rng.uniform(-5.0, 35.0),
+                               rng.uniform(40.0, 160.0), rng.uniform(0.0, 12.0)))
+    return parameter_sets
+
+class GenerateCustomLutTest(unittest.TestCase):
+
+    def test_text_matches_the_baseline_loop(self):
+        for parameters in get_parameter_sets():
+            with self.subTest(parameters=parameters):
+                points = baseline_points(*parameters)
+                lut = generateCustomLut(*parameters)
+                self.assertEqual(str(lut), baseline_text(points))
+                self.assertEqual(format_lut_file(lut), baseline_file(points))
+
+    def test_arrays_are_the_rounded_values(self):
+        lut = generateCustomLut(1000, 5.0, 110.0, 3.0)
+        points = baseline_points(1000, 5.0, 110.0, 3.0)
+        self.assertEqual(len(lut), len(points))
+        self.assertEqual(list(zip(lut.x.tolist(), lut.y.tolist())), points)
+
+class LutCacheTest(unittest.TestCase):
+
+    def test_cached_luts_cannot_be_modified(self):
+        cache = LutCache()
+        lut = cache.get(10, 5.0, 100.0, 0.0)
+        with self.assertRaises(ValueError):
+            lut.addPoint(2.0, 2.0)
+        with self.assertRaises(ValueError):
+            lut.y[0] = 1.0
+        copy = lut.copy()
+        copy.addPoint(2.0, 2.0)
+        self.assertEqual(len(copy), 12)
+        self.assertIs(cache.get(10, 5.0, 100.0, 0.0), lut)
+        self.assertEqual(str(lut), str(generateCustomLut(10, 5.0, 100.0, 0.0)))
+
+    def test_new_luts_grow(self):
+        lut = Lut()
+        for i in range(40):
+            lut.addPoint(i / 40, i / 40)
+        self.assertEqual(len(lut), 40)
+        self.assertEqual(lut.points[-1], (39 / 40, 39 / 40))
+
+if __name__ == "__main__":
+    unittest.main()
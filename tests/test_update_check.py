@@ -0,0 +1,117 @@
+"""Run UpdateChecker against a local stand-in of the releases API."""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from update_check import UpdateChecker
+
+class ReleasesHandler(BaseHTTPRequestHandler):
+    """Answer /latest with the current release of the server, and /slow after a delay."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/slow":
+            time.sleep(server.delay)
+        etag = f'"{server.tag_name}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = json.dumps({"tag_name": server.tag_name}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class UpdateCheckTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ReleasesHandler)
+        self.server.tag_name = "v1.0.0"
+        self.server.delay = 1.0
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "UpdateCache.json")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def make_checker(self, path="/latest", **kwargs):
+        return UpdateChecker(url=self.base_url + path, cache_path=self.cache_path, **kwargs)
+
+    def test_caches_the_answer_within_the_ttl(self):
+        checker = self.make_checker(ttl=3600)
+        self.assertEqual(checker.check(), "v1.0.0")
+        self.server.tag_name = "v2.0.0"
+        self.assertEqual(checker.check(), "v1.0.0")
+        self.assertEqual(len(self.server.requests), 1)
+        with open(self.cache_path) as f:
+            cache = json.load(f)
+        self.assertEqual((cache["tag_name"], cache["etag"]), ("v1.0.0", '"v1.0.0"'))
+
+    def test_revalidates_with_the_etag_after_the_ttl(self):
+        checker = self.make_checker(ttl=0)
+        self.assertEqual(checker.check(), "v1.0.0")
+        checked_at = checker.read_cache()["checked_at"]
+        self.assertEqual(checker.check(), "v1.0.0")
+        self.assertEqual(self.server.requests[1], ("/latest", '"v1.0.0"'))
+        self.assertGreaterEqual(checker.read_cache()["checked_at"], checked_at)
+
+        self.server.tag_name = "v2.0.0"
+        self.assertEqual(checker.check(), "v2.0.0")
+        self.assertEqual(checker.read_cache()["etag"], '"v2.0.0"')
+
+    def test_force_ignores_the_ttl(self):
+        checker = self.make_checker(ttl=3600)
+        checker.check()
+        self.server.tag_name = "v2.0.0"
+        self.assertEqual(checker.check(force=True), "v2.0.0")
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_timeout_returns_the_cached_answer(self):
+        self.make_checker("/slow").write_cache({"tag_name": "v0.9.0", "etag": None, "checked_at": 0})
+        checker = self.make_checker("/slow", timeout=0.2, ttl=0)
+        start = time.perf_counter()
+        self.assertEqual(checker.check(), "v0.9.0")
+        self.assertLess(time.perf_counter() - start, self.server.delay)
+
+    def test_timeout_without_cache_returns_none(self):
+        checker = self.make_checker("/slow", timeout=0.2)
+        self.assertIsNone(checker.check())
+
+    def test_offline_mode_sends_no_request(self):
+        self.assertIsNone(self.make_checker(offline=True).check())
+        self.make_checker().check()
+        self.server.tag_name = "v2.0.0"
+        self.assertEqual(self.make_checker(offline=True, ttl=0).check(force=True), "v1.0.0")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_cache_of_another_url_is_ignored(self):
+        self.make_checker().check()
+        self.assertEqual(self.make_checker("/other", offline=True).read_cache(), {})
+
+    def test_check_in_background(self):
+        future = self.make_checker().check_in_background()
+        self.assertEqual(future.result(timeout=5), "v1.0.0")
+
+if __name__ == "__main__":
+    unittest.main()